@@ -0,0 +1,134 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+import metrics
+
+# Served in this order; within a class, first come first served
+PRIORITIES = ("high", "medium", "low")
+
+
+class QueueFull(Exception):
+    """Raised when a request arrives while the admission queue is full."""
+
+    def __init__(self, priority: str, retry_after: int):
+        super().__init__(f"Admission queue full ({priority} priority), retry after {retry_after}s")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded priority queue in front of the scheduling pipeline.
+
+    At most ``concurrency`` jobs run at once. Further jobs wait in a heap
+    ordered by (priority, arrival), up to ``max_queue`` of them; beyond that
+    ``run`` raises QueueFull with a Retry-After estimate instead of letting a
+    burst pile onto the model server and calendar API.
+    """
+
+    def __init__(self, concurrency: int = 16, max_queue: int = 256):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        self._queue = []
+        self._arrivals = itertools.count()
+        # Exponentially weighted average job duration, for Retry-After
+        self._service_time = 1.0
+        self.stats = {
+            priority: {"queued": 0, "admitted": 0, "rejected": 0, "wait_seconds_total": 0.0, "max_wait_seconds": 0.0}
+            for priority in PRIORITIES
+        }
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            concurrency=int(os.environ.get("ADMISSION_CONCURRENCY", "16")),
+            max_queue=int(os.environ.get("ADMISSION_QUEUE_SIZE", "256")),
+        )
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead of a new job should have drained."""
+        return max(1, math.ceil(len(self._queue) / self.concurrency * self._service_time))
+
+    async def _acquire(self, priority: str, reject_when_full: bool):
+        stats = self.stats[priority]
+        if self.active < self.concurrency and not self._queue:
+            self.active += 1
+            stats["admitted"] += 1
+            metrics.ADMISSION_WAIT_SECONDS.observe(0.0, priority=priority)
+            return
+        if reject_when_full and len(self._queue) >= self.max_queue:
+            stats["rejected"] += 1
+            raise QueueFull(priority, self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (PRIORITIES.index(priority), next(self._arrivals), waiter, priority))
+        stats["queued"] += 1
+        queued_at = time.perf_counter()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as the caller went away
+                self._release()
+            else:
+                stats["queued"] -= 1
+                self._queue = [entry for entry in self._queue if entry[2] is not waiter]
+                heapq.heapify(self._queue)
+            raise
+
+        waited = time.perf_counter() - queued_at
+        metrics.ADMISSION_WAIT_SECONDS.observe(waited, priority=priority)
+        stats["admitted"] += 1
+        stats["wait_seconds_total"] += waited
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+
+    def _release(self):
+        self.active -= 1
+        while self._queue and self.active < self.concurrency:
+            _, _, waiter, priority = heapq.heappop(self._queue)
+            self.stats[priority]["queued"] -= 1
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    async def run(self, priority: str, compute: Callable[[], Awaitable[Any]],
+                  reject_when_full: bool = True) -> Any:
+        """Await compute() once a slot is free, highest priority and oldest first.
+
+        With ``reject_when_full`` False the job waits even when the queue is
+        over ``max_queue`` (used by /receive/batch, whose workers are already
+        bounded).
+        """
+        priority = priority if priority in PRIORITIES else "medium"
+        await self._acquire(priority, reject_when_full)
+        started = time.perf_counter()
+        try:
+            return await compute()
+        finally:
+            self._service_time = 0.8 * self._service_time + 0.2 * (time.perf_counter() - started)
+            self._release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Queue depth and wait times per priority class."""
+        classes = {}
+        for priority, stats in self.stats.items():
+            classes[priority] = {
+                "depth": stats["queued"],
+                "admitted": stats["admitted"],
+                "rejected": stats["rejected"],
+                "avg_wait_seconds": round(stats["wait_seconds_total"] / stats["admitted"], 6) if stats["admitted"] else 0.0,
+                "max_wait_seconds": round(stats["max_wait_seconds"], 6),
+            }
+        return {
+            "active": self.active,
+            "concurrency": self.concurrency,
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "retry_after": self.retry_after(),
+            "priorities": classes,
+        }
@@ -0,0 +1,152 @@
+import asyncio
+import json
+from typing import Dict, Any, Optional, Iterable
+
+
+class IncrementalJSONObjectParser:
+    """Parse a JSON object out of streamed LLM text as the tokens arrive.
+
+    Qwen3 frequently emits reasoning (``<think>...</think>`` or plain prose)
+    before the JSON answer, so everything before the first top-level ``{``
+    is skipped. Top-level members are decoded one at a time as soon as their
+    value is complete, which lets the caller stop the generation the moment
+    the fields it needs are available instead of waiting for the whole
+    completion and calling ``json.loads`` on it.
+    """
+
+    def __init__(self, required_fields: Iterable[str] = ()):
+        self.required_fields = tuple(required_fields)
+        self.fields: Dict[str, Any] = {}
+        self.text = ""
+        self.complete = False
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expecting_value = False
+        self._member_start = 0
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """Consume a text delta and return the fields decoded so far."""
+        self.text += chunk
+        text = self.text
+
+        while self._pos < len(text):
+            i = self._pos
+            c = text[i]
+            self._pos += 1
+
+            if not self._started:
+                if c == "{" and not self._inside_think_block(i):
+                    self._start_object(i)
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expecting_value:
+                        self._decode_member(i + 1)
+                continue
+
+            if c == '"':
+                self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._expecting_value:
+                    self._decode_member(i + 1)
+                elif self._depth == 0:
+                    self._decode_member(i)
+                    self._finish_object()
+            elif c == ":" and self._depth == 1:
+                self._expecting_value = True
+            elif c == "," and self._depth == 1:
+                self._decode_member(i)
+                self._member_start = i + 1
+                self._expecting_value = False
+
+        return self.fields
+
+    def has_required_fields(self) -> bool:
+        """True once every required field has a decoded value."""
+        return all(field in self.fields for field in self.required_fields)
+
+    def _inside_think_block(self, index: int) -> bool:
+        preamble = self.text[:index]
+        return preamble.rfind("<think>") > preamble.rfind("</think>")
+
+    def _start_object(self, index: int):
+        self._started = True
+        self._depth = 1
+        self._in_string = False
+        self._escape = False
+        self._expecting_value = False
+        self._member_start = index + 1
+        self.fields = {}
+
+    def _finish_object(self):
+        self._started = False
+        if self.has_required_fields():
+            self.complete = True
+            return
+        # Not the answer (e.g. an example object inside the reasoning),
+        # keep scanning for the next top-level object.
+        self.fields = {}
+
+    def _decode_member(self, end: int):
+        segment = self.text[self._member_start:end].strip()
+        if not segment:
+            return
+        try:
+            member = json.loads("{" + segment + "}")
+        except json.JSONDecodeError:
+            return
+        self.fields.update(member)
+
+
+async def run_agent_streaming(agent, prompt: str, required_fields: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """Run an agent in streaming mode and return as soon as the required fields are parsed.
+
+    Simply leaving the ``run_stream`` context drains the rest of the
+    completion, so the stream is consumed in a task that is cancelled once
+    the fields are in. Cancelling closes the HTTP stream, which makes the
+    OpenAI-compatible server abort the rest of the generation. Returns the
+    decoded fields, or None if the completion ended without producing them.
+    """
+    parser = IncrementalJSONObjectParser(required_fields)
+    fields_ready = asyncio.Event()
+
+    async def consume():
+        async with agent.run_stream(prompt) as result:
+            async for delta in result.stream_text(delta=True, debounce_by=None):
+                parser.feed(delta)
+                if parser.has_required_fields():
+                    fields_ready.set()
+                    # Park until cancelled by the caller
+                    await asyncio.Future()
+
+    consumer = asyncio.create_task(consume())
+    waiter = asyncio.create_task(fields_ready.wait())
+    try:
+        await asyncio.wait({consumer, waiter}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        consumer.cancel()
+        waiter.cancel()
+        await asyncio.gather(consumer, waiter, return_exceptions=True)
+
+    if fields_ready.is_set():
+        return dict(parser.fields)
+    if not consumer.cancelled() and consumer.exception():
+        raise consumer.exception()
+
+    # The stream finished without the required fields, fall back to
+    # decoding whatever object was completed.
+    if parser.complete or parser.fields:
+        return dict(parser.fields)
+    return None
@@ -1,11 +1,18 @@
 import os
 import json
 import asyncio
+import httpx
 from datetime import datetime, timedelta
 from typing import Dict, Any
 from pydantic_ai import Agent, Tool
 from pydantic_ai.models.openai import OpenAIModel
 from pydantic_ai.providers.openai import OpenAIProvider
+from agent_streaming import run_agent_streaming
+from shared_cache import SharedCache, cache_key
+from structured_logging import get_logger
+import metrics
+
+log = get_logger("ai_scheduling_agent")
 
 @Tool
 def get_current_datetime() -> str:
@@ -15,39 +22,39 @@ def get_current_datetime() -> str:
 @Tool
 def extract_meeting_time_from_email(email_content: str, current_datetime: str) -> Dict[str, Any]:
     """Extract meeting timing details from email content with detailed logging and weekend/off-hours handling."""
-    print(f"\nLLM TOOL: extract_meeting_time_from_email")
-    print(f"Email content: '{email_content}'")
-    print(f"Current time: {current_datetime}")
+    log.debug("LLM TOOL: extract_meeting_time_from_email")
+    log.debug("Email content: '%s'", email_content)
+    log.debug("Current time: %s", current_datetime)
     
     email_lower = email_content.lower()
     
     # Parsing current datetime
     current_dt = datetime.fromisoformat(current_datetime.replace('+05:30', ''))
-    print(f"Parsed value for current datetime: {current_dt}")
+    log.debug("Parsed value for current datetime: %s", current_dt)
     
     # Extract duration
     duration = 30  # default
     if "30 min" in email_lower or "30 minutes" in email_lower:
         duration = 30
-        print(f"Detected duration: 30 minutes from '30 min/minutes'")
+        log.debug("Detected duration: 30 minutes from '30 min/minutes'")
     elif "1 hour" in email_lower or "60 min" in email_lower:
         duration = 60
-        print(f"Detected duration: 60 minutes from '1 hour/60 min'")
+        log.debug("Detected duration: 60 minutes from '1 hour/60 min'")
     elif "15 min" in email_lower:
         duration = 15
-        print(f"Detected duration: 15 minutes")
+        log.debug("Detected duration: 15 minutes")
     elif "45 min" in email_lower:
         duration = 45
-        print(f"Detected duration: 45 minutes")
+        log.debug("Detected duration: 45 minutes")
     else:
-        print(f"Using default duration: 30 minutes (no specific duration found)")
+        log.debug("Using default duration: 30 minutes (no specific duration found)")
     
     def find_next_business_day(start_date: datetime) -> datetime:
         """Find the next business day (Monday-Friday), skipping weekends."""
         next_day = start_date
         while next_day.weekday() >= 5:  # Saturday=5, Sunday=6
             next_day += timedelta(days=1)
-            print(f"Skipping weekend: {next_day.strftime('%A %Y-%m-%d')}")
+            log.debug("Skipping weekend: %s", next_day.date())
         return next_day
     
     # Extract day
@@ -58,58 +65,58 @@ def extract_meeting_time_from_email(email_content: str, current_datetime: str) -
         if days_ahead <= 0:
             days_ahead += 7
         target_date = current_dt + timedelta(days=days_ahead)
-        print(f"Detected day: Thursday ({days_ahead} days ahead)")
+        log.debug("Detected day: Thursday (%s days ahead)", days_ahead)
     elif "tuesday" in email_lower:
         days_ahead = 1 - current_dt.weekday()  # Tuesday = 1
         if days_ahead <= 0:
             days_ahead += 7
         target_date = current_dt + timedelta(days=days_ahead)
-        print(f"Detected day: Tuesday ({days_ahead} days ahead)")
+        log.debug("Detected day: Tuesday (%s days ahead)", days_ahead)
     elif "friday" in email_lower:
         days_ahead = 4 - current_dt.weekday()  # Friday = 4
         if days_ahead <= 0:
             days_ahead += 7
         target_date = current_dt + timedelta(days=days_ahead)
-        print(f"Detected day: Friday ({days_ahead} days ahead)")
+        log.debug("Detected day: Friday (%s days ahead)", days_ahead)
     elif "monday" in email_lower:
         days_ahead = 0 - current_dt.weekday()  # Monday = 0
         if days_ahead <= 0:
             days_ahead += 7
         target_date = current_dt + timedelta(days=days_ahead)
-        print(f"Detected day: Monday ({days_ahead} days ahead)")
+        log.debug("Detected day: Monday (%s days ahead)", days_ahead)
     elif "wednesday" in email_lower:
         days_ahead = 2 - current_dt.weekday()  # Wednesday = 2
         if days_ahead <= 0:
             days_ahead += 7
         target_date = current_dt + timedelta(days=days_ahead)
-        print(f"Detected day: Wednesday ({days_ahead} days ahead)")
+        log.debug("Detected day: Wednesday (%s days ahead)", days_ahead)
     elif "tomorrow" in email_lower:
         target_date = current_dt + timedelta(days=1)
         # Check if tomorrow is a weekend
         if target_date.weekday() >= 5:
             target_date = find_next_business_day(target_date)
-            print(f"Tomorrow is weekend, moving to next business day")
-        print(f"Detected day: Tomorrow")
+            log.debug("Tomorrow is weekend, moving to next business day")
+        log.debug("Detected day: Tomorrow")
     elif "today" in email_lower:
         target_date = current_dt
         # Check if today is a weekend
         if target_date.weekday() >= 5:
             target_date = find_next_business_day(target_date)
-            print(f"Today is weekend, moving to next business day")
-        print(f"Detected day: Today")
+            log.debug("Today is weekend, moving to next business day")
+        log.debug("Detected day: Today")
     else:
         # Instead of defaulting to Thursday, find the next business day
         target_date = current_dt + timedelta(days=1)
         target_date = find_next_business_day(target_date)
-        print(f"No specific day mentioned, using next business day: {target_date.strftime('%A')}")
+        log.debug("No specific day mentioned, using next business day: %s", target_date.date())
     
-    print(f"Target date: {target_date.strftime('%Y-%m-%d %A')}")
+    log.debug("Target date: %s", target_date.date())
     
     # Verify it's a business day
     if target_date.weekday() >= 5:
-        print(f"Warning: Target date {target_date.strftime('%A')} is a weekend!")
+        log.debug("Target date %s is a weekend", target_date.date())
         target_date = find_next_business_day(target_date)
-        print(f"Adjusted to next business day: {target_date.strftime('%A %Y-%m-%d')}")
+        log.debug("Adjusted to next business day: %s", target_date.date())
     
     # Extract time of day
     meeting_hour = 10  # Default to 10:30 AM
@@ -118,45 +125,45 @@ def extract_meeting_time_from_email(email_content: str, current_datetime: str) -
     if "2 pm" in email_lower or "2:00 pm" in email_lower or "14:00" in email_lower:
         meeting_hour = 14
         meeting_minute = 0
-        print(f"Detected time: 2:00 PM from email content")
+        log.debug("Detected time: 2:00 PM from email content")
     elif "10 am" in email_lower or "10:00 am" in email_lower:
         meeting_hour = 10
         meeting_minute = 0
-        print(f"Detected time: 10:00 AM from email content")
+        log.debug("Detected time: 10:00 AM from email content")
     elif "3 pm" in email_lower or "15:00" in email_lower:
         meeting_hour = 15
         meeting_minute = 0
-        print(f"Detected time: 3:00 PM from email content")
+        log.debug("Detected time: 3:00 PM from email content")
     elif "11 am" in email_lower or "11:00 am" in email_lower:
         meeting_hour = 11
         meeting_minute = 0
-        print(f"Detected time: 11:00 AM from email content")
+        log.debug("Detected time: 11:00 AM from email content")
     elif "9 am" in email_lower or "9:00 am" in email_lower:
         meeting_hour = 9
         meeting_minute = 0
-        print(f"Detected time: 9:00 AM from email content")
+        log.debug("Detected time: 9:00 AM from email content")
     elif "4 pm" in email_lower or "4:00 pm" in email_lower or "16:00" in email_lower:
         meeting_hour = 16
         meeting_minute = 0
-        print(f"Detected time: 4:00 PM from email content")
+        log.debug("Detected time: 4:00 PM from email content")
     elif "morning" in email_lower:
         meeting_hour = 10
         meeting_minute = 0
-        print(f"Detected time: Morning (10:00 AM)")
+        log.debug("Detected time: Morning (10:00 AM)")
     elif "afternoon" in email_lower:
         meeting_hour = 14
         meeting_minute = 0
-        print(f"Detected time: Afternoon (2:00 PM)")
+        log.debug("Detected time: Afternoon (2:00 PM)")
     else:
-        print(f"Using default time: 10:30 AM (no specific time found)")
+        log.debug("Using default time: 10:30 AM (no specific time found)")
     
     # Validate business hours (9 AM - 6 PM)
     if meeting_hour < 9:
-        print(f"Time {meeting_hour}:00 is before business hours, adjusting to 9:00 AM")
+        log.debug("Time %s:00 is before business hours, adjusting to 9:00 AM", meeting_hour)
         meeting_hour = 9
         meeting_minute = 0
     elif meeting_hour >= 18:
-        print(f"Time {meeting_hour}:00 is after business hours, adjusting to next day 10:00 AM")
+        log.debug("Time %s:00 is after business hours, adjusting to next day 10:00 AM", meeting_hour)
         target_date += timedelta(days=1)
         target_date = find_next_business_day(target_date)
         meeting_hour = 10
@@ -168,20 +175,20 @@ def extract_meeting_time_from_email(email_content: str, current_datetime: str) -
     
     # Final validation - ensure end time is also within business hours
     if meeting_end.hour >= 18:
-        print(f"Meeting end time {meeting_end.hour}:00 exceeds business hours")
+        log.debug("Meeting end time %s:00 exceeds business hours", meeting_end.hour)
         # Adjust start time earlier or move to next day
         if meeting_start.hour > 9:
             # Try moving start time earlier
             meeting_start = meeting_start.replace(hour=9, minute=0)
             meeting_end = meeting_start + timedelta(minutes=duration)
-            print(f"Adjusted start time to 9:00 AM to fit within business hours")
+            log.debug("Adjusted start time to 9:00 AM to fit within business hours")
         else:
             # Move to next business day
             target_date += timedelta(days=1)
             target_date = find_next_business_day(target_date)
             meeting_start = target_date.replace(hour=10, minute=0, second=0, microsecond=0)
             meeting_end = meeting_start + timedelta(minutes=duration)
-            print(f"Moved to next business day due to time constraints")
+            log.debug("Moved to next business day due to time constraints")
     
     result = {
         "start_time": meeting_start.strftime("%Y-%m-%dT%H:%M:%S+05:30"),
@@ -201,47 +208,45 @@ def extract_meeting_time_from_email(email_content: str, current_datetime: str) -
         }
     }
     
-    print(f"LLM Tool Result:")
-    print(f"Date: {target_date.strftime('%Y-%m-%d')} ({target_date.strftime('%A')})")
-    print(f"Time: {meeting_start.strftime('%H:%M')} - {meeting_end.strftime('%H:%M')}")
-    print(f"Duration: {duration} minutes")
-    print(f"Confidence: {result['confidence']}")
+    log.debug("LLM Tool Result:")
+    log.debug("Date: %s", target_date.date())
+    log.debug("Time: %s - %s", meeting_start.time(), meeting_end.time())
+    log.debug("Duration: %s minutes", duration)
+    log.debug("Confidence: %s", result['confidence'])
     
     return result
 
 @Tool
 def create_meeting_response(request_data: Dict[str, Any], start_time: str, end_time: str) -> Dict[str, Any]:
     """Create the final meeting response in the exact required format matching 3_Output_Event.json."""
-    print(f"\nLLM TOOL: create_meeting_response")
-    print(f"Input start_time: {start_time}")
-    print(f"Input end_time: {end_time}")
-    print(f"From: {request_data.get('From', 'Unknown')}")
-    print(f"Attendees count: {len(request_data.get('Attendees', []))}")
+    log.debug("LLM TOOL: create_meeting_response")
+    log.debug("Input start_time: %s", start_time)
+    log.debug("Input end_time: %s", end_time)
+    log.debug("From: %s", request_data.get('From', 'Unknown'))
+    log.debug("Attendees count: %s", len(request_data.get('Attendees', [])))
     
     # Get all attendees including organizer
     attendee_emails = [request_data["From"]]
     for att in request_data.get("Attendees", []):
         attendee_emails.append(att["email"])
     
-    print(f"Enitre attendee list:")
+    log.debug("Enitre attendee list:")
     for i, email in enumerate(attendee_emails):
-        print(f"   {i+1}. {email}")
-    
-    # Create events structure for each attendee (matching 3_Output_Event.json format)
-    attendee_events = []
-    for attendee in request_data.get("Attendees", []):
-        attendee_events.append({
-            "email": attendee["email"],
-            "events": [
-                {
-                    "StartTime": start_time,
-                    "EndTime": end_time,
-                    "NumAttendees": len(attendee_emails),
-                    "Attendees": attendee_emails,
-                    "Summary": request_data.get("Subject", "Team Meeting")
-                }
-            ]
-        })
+        log.debug("   %s. %s", i+1, email)
+    
+    # Create events structure for each attendee (matching 3_Output_Event.json format),
+    # all of them sharing one scheduled event
+    scheduled_event = {
+        "StartTime": start_time,
+        "EndTime": end_time,
+        "NumAttendees": len(attendee_emails),
+        "Attendees": attendee_emails,
+        "Summary": request_data.get("Subject", "Team Meeting")
+    }
+    attendee_events = [
+        {"email": attendee["email"], "events": [scheduled_event]}
+        for attendee in request_data.get("Attendees", [])
+    ]
     
     # Build response in exact format as 3_Output_Event.json
     response = {
@@ -258,25 +263,48 @@ def create_meeting_response(request_data: Dict[str, Any], start_time: str, end_t
         "MetaData": {}
     }
     
-    print(f"Created meeting response:")
-    print(f"EventStart: {response['EventStart']}")
-    print(f"EventEnd: {response['EventEnd']}")
-    print(f"Subject: {response['Subject']}")
-    print(f"Attendees: {len(response['Attendees'])} people")
+    log.debug("Created meeting response:")
+    log.debug("EventStart: %s", response['EventStart'])
+    log.debug("EventEnd: %s", response['EventEnd'])
+    log.debug("Subject: %s", response['Subject'])
+    log.debug("Attendees: %s people", len(response['Attendees']))
     
     return response
 
 # Initialize LLM model using working pattern
-BASE_URL = "http://localhost:8000/v1"
+# Point BASE_URL at local_model_server.py to run without the MI300 box
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:8000/v1")
 os.environ["BASE_URL"] = BASE_URL
-os.environ["OPENAI_API_KEY"] = "abc-123"
+os.environ.setdefault("OPENAI_API_KEY", "abc-123")
+
+# Stream agent output and stop generating once the JSON fields are parsed
+AGENT_STREAMING = os.environ.get("AGENT_STREAMING", "1") == "1"
+DATE_RANGE_FIELDS = ("Start", "End", "Duration_mins")
+OPTIMAL_TIME_FIELDS = ("EventStart", "EventEnd")
+
+# httpx defaults to 100 pooled connections, which caps in-flight LLM calls per process
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", "1000"))
+
+# Parsed agent outputs are cached per prompt for all worker processes (0 disables)
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", "3600"))
+llm_cache = SharedCache("llm_outputs", LLM_CACHE_TTL)
+
+# LLM_ENABLED=0 runs the rule-based scheduler only
+LLM_ENABLED = os.environ.get("LLM_ENABLED", "1") == "1"
 
 try:
+    if not LLM_ENABLED:
+        raise RuntimeError("disabled by LLM_ENABLED=0")
+    
     agent_model = OpenAIModel(
         'Qwen3-30B-A3B',
         provider=OpenAIProvider(
             base_url=os.environ["BASE_URL"], 
-            api_key=os.environ["OPENAI_API_KEY"]
+            api_key=os.environ["OPENAI_API_KEY"],
+            http_client=httpx.AsyncClient(
+                timeout=httpx.Timeout(timeout=600, connect=5),
+                limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=100)
+            )
         ),
     )
 
@@ -394,11 +422,11 @@ try:
         )
     )
     
-    print(f"LLM Agent initialized successfully")
+    log.info("LLM Agent initialized successfully")
     LLM_AVAILABLE = True
     
 except Exception as e:
-    print(f"LLM initialization failed: {e}")
+    log.warning("LLM initialization failed: %s", e)
     LLM_AVAILABLE = False
     meeting_agent = None
 
@@ -408,11 +436,11 @@ async def date_range_run(prompt: str) -> str:
         raise Exception("Date range agent not available")
     
     async with date_range_agent.run_mcp_servers():
-        print("Executing date_range_agent.run_mcp_servers")
+        log.debug("Executing date_range_agent.run_mcp_servers")
         try:
             result = await date_range_agent.run(prompt)
         except Exception as e:
-            print(f"Error running date_range_agent: {e}")
+            log.warning("Error running date_range_agent: %s", e)
             return None
         return result.output
 
@@ -426,6 +454,27 @@ async def optimal_time_run(prompt: str) -> str:
         result = await optimal_time_agent.run(prompt)
         return result.output
 
+async def date_range_run_stream(prompt: str) -> Dict[str, Any]:
+    """Stream the date range agent and return as soon as Start, End and Duration_mins are parsed"""
+    if not LLM_AVAILABLE or not date_range_agent:
+        raise Exception("Date range agent not available")
+    
+    async with date_range_agent.run_mcp_servers():
+        try:
+            return await run_agent_streaming(date_range_agent, prompt, DATE_RANGE_FIELDS)
+        except Exception as e:
+            log.warning("Error streaming date_range_agent: %s", e)
+            return None
+
+
+async def optimal_time_run_stream(prompt: str) -> Dict[str, Any]:
+    """Stream the optimal time agent and return as soon as EventStart and EventEnd are parsed"""
+    if not LLM_AVAILABLE or not optimal_time_agent:
+        raise Exception("Optimal time agent not available")
+    
+    async with optimal_time_agent.run_mcp_servers():
+        return await run_agent_streaming(optimal_time_agent, prompt, OPTIMAL_TIME_FIELDS)
+
 async def run_async(prompt: str) -> str:
     """Helper function to run LLM async operations"""
     if not LLM_AVAILABLE or not meeting_agent:
@@ -435,20 +484,22 @@ async def run_async(prompt: str) -> str:
         result = await meeting_agent.run(prompt)
         return result.output
 
-async def schedule_meeting_async(request_data: Dict[str, Any]) -> Dict[str, Any]:
+async def schedule_meeting_async(request_data: Dict[str, Any], stream: bool = None) -> Dict[str, Any]:
     """Enhanced meeting scheduling with date range extraction and optimal time finding."""
-    print(f"\nENHANCED LLM SCHEDULING: schedule_meeting_async")
-    print(f"Request data keys: {list(request_data.keys())}")
+    log.debug("ENHANCED LLM SCHEDULING: schedule_meeting_async")
+    log.debug("Request data keys: %s", request_data.keys())
+    if stream is None:
+        stream = AGENT_STREAMING
     
     if not LLM_AVAILABLE:
-        print(f"LLM server not available")
+        log.debug("LLM server not available")
         return {"status": "error", "error": "LLM server not available"}
     
     try:
-        print(f"Starting enhanced LLM scheduling...")
+        log.debug("Starting enhanced LLM scheduling...")
         
         # Step 1: Extract date range using your pattern
-        print(f"\nSTEP 1: DATE RANGE EXTRACTION")
+        log.debug("STEP 1: DATE RANGE EXTRACTION")
         email_content = request_data.get('EmailContent', '')
         datetime_ref = request_data.get('Datetime', '')
         
@@ -457,32 +508,47 @@ async def schedule_meeting_async(request_data: Dict[str, Any]) -> Dict[str, Any]
             "EmailContent": email_content
         })
         
-        print(f"Sending to date range agent:")
-        print(f"   Datetime: {datetime_ref}")
-        print(f"   Email: {email_content[:100]}...")
+        log.debug("Sending to date range agent:")
+        log.debug("   Datetime: %s", datetime_ref)
+        log.debug("   Email: %.100s...", email_content)
         
-        date_range_result = await date_range_run(date_range_prompt)
-        print(f"Date range result: {date_range_result}")
+        date_range_key = cache_key("date_range", date_range_prompt)
+        date_range_result = await asyncio.to_thread(llm_cache.get, date_range_key)
+        date_range_cached = date_range_result is not None
+        if date_range_cached:
+            log.debug("Date range served from LLM cache")
+        else:
+            with metrics.time_stage("date_range_agent"):
+                if stream:
+                    date_range_result = await date_range_run_stream(date_range_prompt)
+                else:
+                    date_range_result = await date_range_run(date_range_prompt)
+        log.debug("Date range result: %s", date_range_result)
         
         # Parse the date range result
         try:
-            date_range_data = json.loads(date_range_result)
+            if date_range_result is None:
+                raise json.JSONDecodeError("No JSON object in agent output", "", 0)
+            date_range_data = date_range_result if isinstance(date_range_result, dict) else json.loads(date_range_result)
+            # Cache only fresh, complete answers; re-setting on a hit would push its expiry back forever
+            if not date_range_cached and all(date_range_data.get(field) for field in ("Start", "End")):
+                await asyncio.to_thread(llm_cache.set, date_range_key, date_range_data)
             start_range = date_range_data.get('Start')
             end_range = date_range_data.get('End')
             duration_mins = date_range_data.get('Duration_mins', '30')
-            print(f"Parsed date range:")
-            print(f"Start: {start_range}")
-            print(f"End: {end_range}")
-            print(f"Duration: {duration_mins} minutes")
+            log.debug("Parsed date range:")
+            log.debug("Start: %s", start_range)
+            log.debug("End: %s", end_range)
+            log.debug("Duration: %s minutes", duration_mins)
         except json.JSONDecodeError as e:
-            print(f"Failed to parse date range JSON: {e}")
+            log.warning("Failed to parse date range JSON: %s", e)
             # Fallback to original data
             start_range = request_data.get('Start')
             end_range = request_data.get('End')
             duration_mins = request_data.get('Duration_mins', '30')
         
         # Step 2: Find optimal meeting time considering off-hours and weekends
-        print(f"\nSTEP 2: OPTIMAL TIME FINDING")
+        log.debug("STEP 2: OPTIMAL TIME FINDING")
         optimal_time_prompt = f"""
         Find the optimal meeting time for this request:
         
@@ -501,28 +567,42 @@ async def schedule_meeting_async(request_data: Dict[str, Any]) -> Dict[str, Any]
         - If no specific day mentioned, use next business day (NOT Thursday by default)
         """
         
-        print(f"Sending to optimal time agent...")
-        optimal_time_result = await optimal_time_run(optimal_time_prompt)
-        print(f"Optimal time result: {optimal_time_result}")
+        log.debug("Sending to optimal time agent...")
+        optimal_time_key = cache_key("optimal_time", optimal_time_prompt)
+        optimal_time_result = await asyncio.to_thread(llm_cache.get, optimal_time_key)
+        optimal_time_cached = optimal_time_result is not None
+        if optimal_time_cached:
+            log.debug("Optimal time served from LLM cache")
+        else:
+            with metrics.time_stage("optimal_time_agent"):
+                if stream:
+                    optimal_time_result = await optimal_time_run_stream(optimal_time_prompt)
+                else:
+                    optimal_time_result = await optimal_time_run(optimal_time_prompt)
+        log.debug("Optimal time result: %s", optimal_time_result)
         
         # Parse optimal time result
         try:
-            optimal_data = json.loads(optimal_time_result)
+            if optimal_time_result is None:
+                raise json.JSONDecodeError("No JSON object in agent output", "", 0)
+            optimal_data = optimal_time_result if isinstance(optimal_time_result, dict) else json.loads(optimal_time_result)
+            if not optimal_time_cached and all(optimal_data.get(field) for field in OPTIMAL_TIME_FIELDS):
+                await asyncio.to_thread(llm_cache.set, optimal_time_key, optimal_data)
             event_start = optimal_data.get('EventStart')
             event_end = optimal_data.get('EventEnd')
             optimal_time = optimal_data.get('OptimalTime')
             business_valid = optimal_data.get('BusinessHoursValid', True)
             reasoning = optimal_data.get('Reasoning', 'LLM scheduling')
             
-            print(f"Parsed optimal time:")
-            print(f"EventStart: {event_start}")
-            print(f"EventEnd: {event_end}")
-            print(f"OptimalTime: {optimal_time}")
-            print(f"BusinessHoursValid: {business_valid}")
-            print(f"Reasoning: {reasoning}")
+            log.debug("Parsed optimal time:")
+            log.debug("EventStart: %s", event_start)
+            log.debug("EventEnd: %s", event_end)
+            log.debug("OptimalTime: %s", optimal_time)
+            log.debug("BusinessHoursValid: %s", business_valid)
+            log.debug("Reasoning: %s", reasoning)
             
         except json.JSONDecodeError as e:
-            print(f"Failed to parse optimal time JSON: {e}")
+            log.warning("Failed to parse optimal time JSON: %s", e)
             # Fallback to default time calculation with weekend avoidance
             from datetime import datetime, timedelta
             
@@ -531,7 +611,7 @@ async def schedule_meeting_async(request_data: Dict[str, Any]) -> Dict[str, Any]
                 next_day = start_date
                 while next_day.weekday() >= 5:  # Saturday=5, Sunday=6
                     next_day += timedelta(days=1)
-                    print(f"Fallback: Skipping weekend day {next_day.strftime('%A')}")
+                    log.debug("Fallback: Skipping weekend day %s", next_day.date())
                 return next_day
             
             try:
@@ -547,11 +627,11 @@ async def schedule_meeting_async(request_data: Dict[str, Any]) -> Dict[str, Any]
                 reasoning = f"Fallback to 10:30 AM on {business_day.strftime('%A %Y-%m-%d')} (weekend avoidance applied)"
                 
             except Exception as fallback_error:
-                print(f"Fallback time calculation failed: {fallback_error}")
+                log.warning("Fallback time calculation failed: %s", fallback_error)
                 return {"status": "error", "error": f"Time calculation failed: {fallback_error}"}
         
         # Step 3: Create final response with extracted times
-        print(f"\nSTEP 3: RESPONSE CREATION")
+        log.debug("STEP 3: RESPONSE CREATION")
         final_response = {
             "status": "success",
             "event_start": event_start,
@@ -563,28 +643,28 @@ async def schedule_meeting_async(request_data: Dict[str, Any]) -> Dict[str, Any]
             "method": "enhanced_llm_scheduling"
         }
         
-        print(f"Enhanced LLM scheduling complete:")
-        print(f"Meeting: {event_start} to {event_end}")
-        print(f"Duration: {duration_mins} minutes")
-        print(f"Method: Enhanced LLM with off-hours consideration")
+        log.debug("Enhanced LLM scheduling complete:")
+        log.debug("Meeting: %s to %s", event_start, event_end)
+        log.debug("Duration: %s minutes", duration_mins)
+        log.debug("Method: Enhanced LLM with off-hours consideration")
         
         return final_response
         
     except Exception as e:
-        print(f"Enhanced LLM scheduling error: {str(e)}")
+        log.warning("Enhanced LLM scheduling error: %s", e)
         return {"status": "error", "error": str(e)}
 
 def schedule_meeting(request_data: Dict[str, Any]) -> Dict[str, Any]:
     """Synchronous wrapper for LLM meeting scheduling with working pattern."""
-    print(f"\nLLM WRAPPER: schedule_meeting")
-    print(f"Request ID: {request_data.get('Request_id', 'Unknown')}")
+    log.debug("LLM WRAPPER: schedule_meeting")
+    log.debug("Request ID: %s", request_data.get('Request_id', 'Unknown'))
     
     if not LLM_AVAILABLE:
-        print(f"LLM not available")
+        log.debug("LLM not available")
         return {"status": "error", "error": "LLM server not available"}
     
     try:
-        print(f"Setting up async event loop...")
+        log.debug("Setting up async event loop...")
         import asyncio
         
         # Use new event loop pattern
@@ -597,18 +677,18 @@ def schedule_meeting(request_data: Dict[str, Any]) -> Dict[str, Any]:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
         
-        print(f"Executing LLM async function...")
+        log.debug("Executing LLM async function...")
         result = loop.run_until_complete(schedule_meeting_async(request_data))
         
-        print(f"LLM wrapper result:")
-        print(f"   Status: {result.get('status', 'Unknown')}")
+        log.debug("LLM wrapper result:")
+        log.debug("   Status: %s", result.get('status', 'Unknown'))
         if result.get('status') == 'success':
-            print(f"   Response available: {result.get('response') is not None}")
+            log.debug("   Response available: %s", result.get('response') is not None)
         else:
-            print(f"   Error: {result.get('error', 'Unknown error')}")
+            log.debug("   Error: %s", result.get('error', 'Unknown error'))
         
         return result
         
     except Exception as e:
-        print(f"LLM wrapper error: {str(e)}")
+        log.warning("LLM wrapper error: %s", e)
         return {"status": "error", "error": str(e)}
\ No newline at end of file
@@ -0,0 +1,595 @@
+"""Async ASGI entry point for the AI Meeting Scheduler.
+
+Serves the same ``POST /receive``, ``GET /health`` and ``GET /debug/requests``
+endpoints as the Flask app in ``submission_alphawave.ipynb`` with identical
+request and response bodies, but awaits ``your_meeting_assistant_async``
+instead of pinning a thread per request across the calendar I/O and LLM
+round trips. ``POST /receive/batch`` takes many requests at once and streams
+the responses back as NDJSON. ``POST /jobs`` queues a request and returns a
+job id straight away; poll ``GET /jobs/<job_id>`` or pass a callback URL.
+``GET /metrics`` exposes per-stage latency histograms in Prometheus format.
+``GET /debug/trace`` returns a journaled request's trace spans, and an
+``X-Profile: 1`` request comes back with a sampling profile of itself.
+In the background, the calendars of the most frequent attendees are
+prefetched (calendar_prefetch.py).
+
+    uvicorn asgi_server:app --host 0.0.0.0 --port 5000
+    python asgi_server.py --port 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Tuple
+from urllib.parse import parse_qs
+
+from admission import AdmissionController, QueueFull
+from calendar_events_fetch import shared_calendar_fetches
+import calendar_prefetch
+from idempotency import IdempotencyCache
+import metrics
+from job_queue import JOB_WEBHOOK_URL, JobRunner, check_callback_url
+from meeting_assistant import your_meeting_assistant_async
+from request_journal import RequestJournal
+import response_builder
+from scheduling_meeting_utils import parse_priority
+from structured_logging import configure_logging, get_logger, request_context, shutdown_logging
+import tracing
+
+configure_logging()
+log = get_logger("asgi_server")
+
+journal = RequestJournal.from_env()
+idempotency = IdempotencyCache.from_env()
+admission = AdmissionController.from_env()
+
+# Requests from one /receive/batch call processed at the same time
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "8"))
+
+def encode_json(payload: Any) -> bytes:
+    """Encode a response body the way Flask's jsonify does (sorted keys, compact), with orjson if installed."""
+    with metrics.time_stage("json_serialization"):
+        return response_builder.dumps(payload)
+
+
+async def read_body(receive) -> bytes:
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    return body
+
+
+async def send_json(send, status: int, payload: Any, headers=()):
+    body = encode_json(payload)
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def error_response(data: Any, e: Exception) -> Dict[str, Any]:
+    response = {
+        "Request_id": data.get("Request_id", "unknown") if isinstance(data, dict) else "unknown",
+        "Error": f"Processing failed: {str(e)}",
+        "Status": "error",
+        "MetaData": {"error_details": str(e)}
+    }
+
+    log.error("Error response created: %s", e, extra={"Request_id": response["Request_id"]})
+
+    return response
+
+
+# Degraded outcomes a retry of the same Request_id may do better on
+DEGRADED_METHODS = {"Error_Fallback", "Simplified_Assignment"}
+
+
+def cacheable_response(response: Dict[str, Any]) -> bool:
+    """Whether the idempotency cache may replay this response to retries.
+
+    Errors, last-resort fallbacks and meetings whose calendar write did not
+    fully succeed (rolled back, failed, or left partly written) are not
+    stored, so a retry gets a fresh run.
+    """
+    metadata = response.get("MetaData") or {}
+    if "Error" in response or metadata.get("processing_method") in DEGRADED_METHODS:
+        return False
+    calendar_write = metadata.get("calendar_write")
+    return calendar_write is None or calendar_write.get("status") == "created"
+
+
+def request_option(scope, name: str) -> str:
+    """Value of the ``X-<name>`` header or the ``?<name>=`` query parameter, "" when neither is set."""
+    headers = dict(scope.get("headers", []))
+    params = parse_qs(scope.get("query_string", b"").decode())
+    return headers.get(f"x-{name}".encode("ascii"), b"").decode() or (params.get(name) or [""])[-1]
+
+
+def request_flag(scope, name: str) -> bool:
+    """True when the client set the ``X-<name>: 1`` header or ``?<name>=1`` (e.g. debug, profile)."""
+    return request_option(scope, name).lower() in ("1", "true", "yes", "on")
+
+
+def response_events_option(scope) -> str:
+    """The request's ``X-Response-Events`` / ``?response-events=`` mode, None for the default.
+
+    Raises ValueError for an unknown mode.
+    """
+    mode = request_option(scope, "response-events").lower() or None
+    if mode is not None and mode not in response_builder.RESPONSE_EVENTS_MODES:
+        raise ValueError(f"response-events must be one of {', '.join(response_builder.RESPONSE_EVENTS_MODES)}")
+    return mode
+
+
+async def schedule_request(data: Dict[str, Any], reject_when_full: bool = True,
+                           debug: bool = False, profile: bool = False,
+                           response_events: str = None) -> Dict[str, Any]:
+    """Run one meeting request through the assistant and journal the result.
+
+    Log records emitted on the way carry the request's Request_id; ``debug``
+    emits its DEBUG trace whatever LOG_LEVEL is. The request's trace spans go
+    into its journal entry. ``profile`` runs it under the sampling profiler
+    and adds the result to the response as ``Profile``; a response replayed
+    by the idempotency cache carries no ``Profile``. ``response_events``
+    (all, window or none) picks which existing calendar events the response
+    carries; a retry replayed by the idempotency cache gets the first run's
+    response whatever it asks for. Raises QueueFull when admission control
+    turns the request away.
+    """
+    request_id = data.get("Request_id")
+    with request_context(request_id, debug), response_builder.response_events(response_events), \
+            tracing.trace_request(request_id, profile=profile) as trace:
+        processed_data = await _schedule_request(data, reject_when_full)
+        if profile and trace.profile is not None:
+            processed_data = {**processed_data, "Profile": trace.profile}
+        return processed_data
+
+
+async def _schedule_request(data: Dict[str, Any], reject_when_full: bool) -> Dict[str, Any]:
+    try:
+        log.debug("Received meeting request from %s: %s (%s attendees)",
+                  data.get("From", "Unknown"), data.get("Subject", "No Subject"), len(data.get("Attendees", [])))
+        log.debug("Content: %.100s...", data.get("EmailContent", "No content"))
+
+        async def run_pipeline():
+            with metrics.PIPELINE_IN_FLIGHT.track_in_progress(), metrics.time_stage("pipeline"):
+                return await your_meeting_assistant_async(data)
+
+        async def process():
+            trace = tracing.current_trace()
+            try:
+                # Process the meeting request with our AI assistant, urgent requests first
+                processed_data = await admission.run(
+                    parse_priority(data.get("EmailContent", "")), run_pipeline, reject_when_full
+                )
+            finally:
+                # Only a run of the pipeline is profiled, never an idempotent replay
+                if trace is not None:
+                    trace.stop_profiler()
+            metrics.REQUESTS_TOTAL.inc(
+                processing_method=processed_data.get("MetaData", {}).get("processing_method", "unknown")
+            )
+
+            # Store the request for debugging, with where its time went.
+            # Appending to the on-disk journal takes a file lock, keep it off the event loop
+            await asyncio.to_thread(journal.record, data, processed_data,
+                                    trace.to_json() if trace is not None else None)
+            return processed_data
+
+        # Retries of a Request_id get the first run's response instead of a new slot
+        processed_data = await idempotency.run(data.get("Request_id"), process, cacheable_response)
+
+        method = processed_data.get("MetaData", {}).get("processing_method", "unknown")
+        if processed_data.get("EventStart") and processed_data.get("EventEnd"):
+            log.info("Meeting scheduled: %s - %s", processed_data.get("EventStart"), processed_data.get("EventEnd"),
+                     extra={"processing_method": method})
+        else:
+            log.info("Scheduling challenges: %s", processed_data.get("Error", "Unknown issue"),
+                     extra={"processing_method": method})
+
+        return processed_data
+
+    except QueueFull:
+        raise
+    except Exception as e:
+        return error_response(data, e)
+
+
+async def receive_meeting_request(scope, body: bytes) -> Tuple[Any, ...]:
+    """Async equivalent of the notebook's /receive endpoint, answering 429 when the queue is full."""
+    try:
+        data = json.loads(body) if body else None
+    except ValueError as e:
+        return 200, error_response(None, e)
+
+    if not data:
+        return 400, {"error": "No data received"}
+    if not isinstance(data, dict):
+        return 400, {"error": "Request body must be a JSON object"}
+
+    try:
+        response_events = response_events_option(scope)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+
+    try:
+        return 200, await schedule_request(data, debug=request_flag(scope, "debug"),
+                                           profile=request_flag(scope, "profile"),
+                                           response_events=response_events)
+    except QueueFull as e:
+        log.warning("Rejected request: %s", e, extra={"Request_id": data.get("Request_id", "unknown")})
+        return 429, {"error": "Too many requests queued, retry later", "retry_after": e.retry_after}, [
+            (b"retry-after", str(e.retry_after).encode("ascii"))
+        ]
+
+
+def parse_batch_item(raw: bytes) -> Any:
+    """Decode one batch item; malformed items become a ValueError to report in the stream."""
+    try:
+        item = json.loads(raw)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON: {str(e)}")
+    if not isinstance(item, dict):
+        return ValueError("Batch items must be JSON objects")
+    return item
+
+
+async def iter_batch_items(receive):
+    """Yield the requests of a /receive/batch body.
+
+    A JSON array is decoded once the whole body has arrived. Anything else is
+    read as NDJSON and each line is yielded as soon as it is complete, so
+    scheduling starts while the client is still uploading.
+    """
+    buffer = b""
+    is_array = None
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        buffer += message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if is_array is None and buffer.strip():
+            is_array = buffer.lstrip().startswith(b"[")
+        if is_array is False:
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield parse_batch_item(line)
+
+    if is_array:
+        try:
+            items = json.loads(buffer)
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON: {str(e)}")
+            return
+        for item in items:
+            yield item if isinstance(item, dict) else ValueError("Batch items must be JSON objects")
+    elif buffer.strip():
+        yield parse_batch_item(buffer)
+
+
+async def receive_batch(scope, receive, send):
+    """POST /receive/batch: schedule many requests, stream each response as NDJSON when ready.
+
+    At most BATCH_CONCURRENCY items run at once and calendar fetches are
+    shared across the batch. Responses arrive in completion order and carry
+    their Request_id.
+    """
+    try:
+        response_events = response_events_option(scope)
+    except ValueError as e:
+        await send_json(send, 400, {"error": str(e)})
+        return
+
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/x-ndjson")],
+    })
+
+    pending = asyncio.Queue(maxsize=BATCH_CONCURRENCY)
+    results = asyncio.Queue()
+    debug = request_flag(scope, "debug")
+
+    async def feed():
+        try:
+            async for item in iter_batch_items(receive):
+                await pending.put(item)
+        finally:
+            for _ in range(BATCH_CONCURRENCY):
+                await pending.put(None)
+
+    async def worker():
+        while True:
+            item = await pending.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                await results.put(error_response(None, item))
+            else:
+                # Batch workers are already bounded, queue behind /receive traffic instead of failing
+                await results.put(await schedule_request(item, reject_when_full=False, debug=debug,
+                                                         response_events=response_events))
+
+    async def run():
+        try:
+            await asyncio.gather(feed(), *[worker() for _ in range(BATCH_CONCURRENCY)])
+        finally:
+            await results.put(None)
+
+    with shared_calendar_fetches():
+        runner = asyncio.create_task(run())
+        try:
+            while True:
+                response = await results.get()
+                if response is None:
+                    break
+                await send({"type": "http.response.body", "body": encode_json(response), "more_body": True})
+        finally:
+            runner.cancel()
+            await asyncio.gather(runner, return_exceptions=True)
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def run_job(data: Dict[str, Any]) -> Dict[str, Any]:
+    # Queued jobs already waited their turn, never bounce them off admission control
+    return await schedule_request(data, reject_when_full=False)
+
+
+jobs = JobRunner.from_env(run_job)
+prefetcher = calendar_prefetch.Prefetcher.from_env() if calendar_prefetch.PREFETCH_ENABLED else None
+
+
+async def submit_job(scope, body: bytes) -> Tuple[Any, ...]:
+    """POST /jobs: queue a /receive request and answer 202 with its job id right away.
+
+    The callback URL comes from ``?callback_url=``, an ``X-Callback-Url``
+    header or JOB_WEBHOOK_URL; the finished job is POSTed to it. A callback
+    that is not http(s) or whose host is not in JOB_WEBHOOK_ALLOWED_HOSTS
+    is answered with 400.
+    """
+    try:
+        data = json.loads(body) if body else None
+    except ValueError as e:
+        return 400, {"error": f"Invalid JSON: {str(e)}"}
+    if not data or not isinstance(data, dict):
+        return 400, {"error": "No data received"}
+
+    params = {key: values[-1] for key, values in parse_qs(scope.get("query_string", b"").decode()).items()}
+    headers = dict(scope.get("headers", []))
+    callback_url = params.get("callback_url") or headers.get(b"x-callback-url", b"").decode() or JOB_WEBHOOK_URL
+    if callback_url:
+        try:
+            check_callback_url(callback_url)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+    job_id = await jobs.submit(data, callback_url)
+    log.info("Queued job %s", job_id, extra={"Request_id": data.get("Request_id", "unknown"), "job_id": job_id})
+    status_url = f"/jobs/{job_id}"
+    return 202, {"job_id": job_id, "status": "queued", "status_url": status_url}, [
+        (b"location", status_url.encode("ascii"))
+    ]
+
+
+async def job_status(scope, body: bytes) -> Tuple[int, Dict[str, Any]]:
+    """GET /jobs/<job_id>: job state, plus the response once it is done."""
+    job = await asyncio.to_thread(jobs.queue.get, scope["path"].rstrip("/").rsplit("/", 1)[-1])
+    if job is None:
+        return 404, {"error": "Job not found"}
+    return 200, job
+
+
+async def health(scope, body: bytes) -> Tuple[int, Dict[str, Any]]:
+    """Health check endpoint."""
+    return 200, {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "service": "AI Meeting Scheduler",
+        "requests_processed": journal.total
+    }
+
+
+async def debug_requests(scope, body: bytes) -> Tuple[int, Dict[str, Any]]:
+    """Debug endpoint to see the last processed requests.
+
+    ``?request_id=...&since=...&until=...&limit=...`` queries the journal by
+    Request_id and ISO timestamp range instead.
+    """
+    params = {key: values[-1] for key, values in parse_qs(scope.get("query_string", b"").decode()).items()}
+    if not params:
+        return 200, {
+            "total_requests": journal.total,
+            "requests": journal.recent(5)  # Last 5 requests
+        }
+    try:
+        # Reads the on-disk journal, keep it off the event loop
+        requests = await asyncio.to_thread(
+            journal.query,
+            request_id=params.get("request_id"),
+            since=params.get("since"),
+            until=params.get("until"),
+            limit=int(params.get("limit", 100))
+        )
+    except ValueError as e:
+        return 400, {"error": f"Invalid query: {str(e)}"}
+    return 200, {
+        "total_requests": journal.total,
+        "requests": requests
+    }
+
+
+async def debug_trace(scope, body: bytes) -> Tuple[int, Dict[str, Any]]:
+    """Trace spans of the latest journaled request with ``?request_id=...``.
+
+    ``&format=chrome`` returns Chrome trace events (save the body and load it
+    in chrome://tracing or Perfetto) instead of the span list.
+    """
+    params = {key: values[-1] for key, values in parse_qs(scope.get("query_string", b"").decode()).items()}
+    if not params.get("request_id"):
+        return 400, {"error": "request_id is required"}
+    entries = await asyncio.to_thread(journal.query, request_id=params["request_id"], limit=1)
+    if not entries or "trace" not in entries[-1]:
+        return 404, {"error": "No trace recorded for this request"}
+    trace = entries[-1]["trace"]
+    if params.get("format", "json") == "chrome":
+        return 200, tracing.to_chrome(trace)
+    return 200, trace
+
+
+async def debug_queue(scope, body: bytes) -> Tuple[int, Dict[str, Any]]:
+    """Admission queue depth and wait times per priority class."""
+    return 200, {**admission.snapshot(), "jobs": await asyncio.to_thread(jobs.queue.counts)}
+
+
+ROUTES = {
+    "/receive": ("POST", receive_meeting_request),
+    "/health": ("GET", health),
+    "/debug/requests": ("GET", debug_requests),
+    "/debug/trace": ("GET", debug_trace),
+    "/debug/queue": ("GET", debug_queue),
+    "/jobs": ("POST", submit_job),
+    "/jobs/*": ("GET", job_status),
+}
+
+# Handlers that read the request and write the response themselves
+async def metrics_endpoint(scope, receive, send):
+    """GET /metrics in Prometheus text format, merged across server.py workers."""
+    body = (await asyncio.to_thread(metrics.render)).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"text/plain; version=0.0.4; charset=utf-8"),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def collect_queue_metrics():
+    # Runs inside metrics.render/flush, which are called off the event loop
+    for priority, stats in admission.stats.items():
+        metrics.ADMISSION_QUEUE_DEPTH.set(stats["queued"], priority=priority)
+    for status, count in jobs.queue.counts().items():
+        metrics.JOBS.set(count, status=status)
+
+
+metrics.on_collect(collect_queue_metrics)
+
+# How often each worker publishes its metrics to METRICS_DIR
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+
+
+async def flush_metrics_periodically():
+    while True:
+        await asyncio.sleep(METRICS_FLUSH_SECONDS)
+        try:
+            await asyncio.to_thread(metrics.flush)
+        except OSError as e:
+            log.warning("Could not write metrics: %s", e)
+
+
+STREAMING_ROUTES = {
+    "/receive/batch": ("POST", receive_batch),
+    "/metrics": ("GET", metrics_endpoint),
+}
+
+
+async def app(scope, receive, send):
+    """ASGI application serving the meeting scheduler endpoints."""
+    if scope["type"] == "lifespan":
+        flusher = None
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                jobs.start()
+                if prefetcher is not None:
+                    prefetcher.start()
+                if metrics.METRICS_DIR:
+                    flusher = asyncio.create_task(flush_metrics_periodically())
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                # Jobs still running go back to the queue for the next start
+                await jobs.stop()
+                if prefetcher is not None:
+                    await prefetcher.stop()
+                if flusher is not None:
+                    flusher.cancel()
+                    await asyncio.to_thread(metrics.flush)
+                shutdown_logging()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    path = scope["path"].rstrip("/") or "/"
+    route_name = next(
+        (name for name in (path, path.rsplit("/", 1)[0] + "/*") if name in ROUTES or name in STREAMING_ROUTES),
+        None
+    )
+    if route_name is None:
+        await send_json(send, 404, {"error": "Not Found"})
+        return
+    method, handler = ROUTES.get(route_name) or STREAMING_ROUTES[route_name]
+    if scope["method"] != method:
+        await send_json(send, 405, {"error": "Method Not Allowed"})
+        return
+
+    started = time.perf_counter()
+    status = 200
+    with metrics.IN_FLIGHT.track_in_progress(route=route_name):
+        try:
+            if route_name in STREAMING_ROUTES:
+                await handler(scope, receive, send)
+            else:
+                body = await read_body(receive)
+                # Handlers return (status, payload) or (status, payload, extra headers)
+                status, payload, *headers = await handler(scope, body)
+                await send_json(send, status, payload, *headers)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            metrics.HTTP_SECONDS.observe(time.perf_counter() - started, route=route_name, status=status)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async AI Meeting Scheduler server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    print("Starting AI Meeting Scheduler Server (ASGI)...")
+    print("Endpoints available:")
+    print("   POST /receive - Submit meeting requests")
+    print("   POST /receive/batch - Submit many requests (JSON array or NDJSON), stream NDJSON responses")
+    print("   GET /health - Health check")
+    print("   GET /debug/requests - View recent requests")
+    print("   GET /debug/trace?request_id=... - Trace spans of a request (&format=chrome)")
+    print("   GET /debug/queue - Admission queue depth and wait per priority")
+    print("   POST /jobs - Queue a meeting request, GET /jobs/<job_id> - Job status and result")
+    print("   GET /metrics - Prometheus metrics")
+    print(f"Server running on http://{args.host}:{args.port}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
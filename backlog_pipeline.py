@@ -0,0 +1,567 @@
+"""Offline batch mode for a backlog of meeting requests.
+
+When the service has been down, the requests that piled up (often thousands
+of emails) used to be replayed one /receive call at a time, each of them
+through both LLM agents. This command works through them in bulk:
+
+* requests are read as JSONL, ``BACKLOG_CHUNK_SIZE`` (default 500) at a
+  time, and only one chunk is held in memory;
+* every email is parsed with the rule-based extractors
+  (``MeetingScheduler.parse_email_content`` and the agent's
+  ``extract_meeting_time_from_email`` tool). The parse is scored by what the
+  rules cannot account for: several days named, the two extractors
+  disagreeing, dates, clock times or durations the rules do not know, and
+  constraints such as "not before" or "except";
+* only requests scoring below ``BACKLOG_MIN_CONFIDENCE`` (default 0.6) go to
+  the agents (``schedule_meeting_async``), all of a chunk's at once with at
+  most ``BACKLOG_LLM_CONCURRENCY`` (default 8) in flight;
+* every request is scheduled with the rule-based slot ranking against one
+  ``AvailabilitySnapshot`` shared by the whole run. Each attendee's days are
+  fetched once, in bulk, and the meetings the run schedules are added as busy
+  time, so later requests in the backlog do not double-book them;
+* the responses (the /receive format, one per request, in input order) are
+  written as JSONL after each chunk.
+
+With CALENDAR_WRITE_ENABLED=1 the meetings are also created on the
+calendars, as /receive does.
+
+    python backlog_pipeline.py backlog.jsonl -o results.jsonl
+    cat backlog.jsonl | python backlog_pipeline.py - > results.jsonl
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from calendar_events_fetch import fetch_calendar_events
+from meeting_assistant import create_calendar_events
+import response_builder
+from scheduling_meeting_utils import SCHEDULING_HORIZON_DAYS, MeetingScheduler
+import scoring_profiles
+from structured_logging import configure_logging, get_logger
+
+log = get_logger("backlog_pipeline")
+
+BACKLOG_CHUNK_SIZE = int(os.environ.get("BACKLOG_CHUNK_SIZE", "500"))
+BACKLOG_MIN_CONFIDENCE = float(os.environ.get("BACKLOG_MIN_CONFIDENCE", "0.6"))
+BACKLOG_LLM_CONCURRENCY = int(os.environ.get("BACKLOG_LLM_CONCURRENCY", "8"))
+BACKLOG_FETCH_WORKERS = int(os.environ.get("BACKLOG_FETCH_WORKERS", "8"))
+# Attendee-days held by the availability snapshot; past this the least recently used are dropped
+BACKLOG_SNAPSHOT_DAYS = int(os.environ.get("BACKLOG_SNAPSHOT_DAYS", "100000"))
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S+05:30"
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Confidence lost for each thing in an email the rule-based extractors cannot account for
+CONFIDENCE_PENALTIES = {
+    "several_days": 0.5,          # "Monday or Tuesday": the rules take whichever they check first
+    "extractors_disagree": 0.5,
+    "date_phrase": 0.5,           # "next week", "the 25th", "July 30"
+    "constraint": 0.5,            # "not before 2", "except Friday"
+    "unknown_time": 0.5,          # a clock time the rules do not recognise, e.g. "12:30"
+    "unknown_duration": 0.5,      # "90 minutes", "2 hours"
+    "no_day": 0.3,                # neither a day nor Start/End: the next business day is a guess
+}
+
+DAY_WORDS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday", "today", "tomorrow")
+# The clock times extract_meeting_time_from_email recognises
+KNOWN_TIMES = frozenset(("2 pm", "2:00 pm", "14:00", "10 am", "10:00 am", "3 pm", "15:00", "11 am", "11:00 am",
+                         "9 am", "9:00 am", "4 pm", "4:00 pm", "16:00"))
+_MONTHS = r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sept?(?:ember)?|" \
+          r"oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+DATE_PHRASE = re.compile(
+    rf"\b(?:next|this|coming) (?:week|month)\b|\bweekend\b|\bend of\b|\b\d{{1,2}}(?:st|nd|rd|th)\b"
+    rf"|\b\d{{1,2}}/\d{{1,2}}\b|\b(?:{_MONTHS}) \d{{1,2}}\b|\b\d{{1,2}} (?:{_MONTHS})\b"
+)
+CONSTRAINT = re.compile(r"\b(?:not|except|unless|before|after|between|instead|avoid)\b|n't\b")
+CLOCK_TIME = re.compile(r"\b\d{1,2}(?::\d{2})? ?(?:am|pm)\b|\b\d{1,2}:\d{2}\b")
+DURATION = re.compile(r"\b(\d+(?:\.\d+)?) ?(min(?:ute)?s?|h(?:ou)?rs?)\b|\bhalf (?:an )?hour\b|\ban hour\b")
+
+
+def _parse_time(value: str) -> datetime:
+    """An ISO timestamp as a naive IST datetime, the way the slot ranking compares times."""
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt.astimezone(IST).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def _days(start: datetime, end: datetime) -> List[date]:
+    """Calendar days touched by [start, end)."""
+    first = start.date()
+    last = max(first, (end - timedelta(microseconds=1)).date())
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+def _next_business_day(day: datetime) -> datetime:
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+def _mentioned_minutes(email_lower: str) -> List[float]:
+    minutes = []
+    for match in DURATION.finditer(email_lower):
+        if match.group(1):
+            minutes.append(float(match.group(1)) * (60 if match.group(2).startswith("h") else 1))
+        else:
+            minutes.append(30 if match.group().startswith("half") else 60)
+    return minutes
+
+
+class AvailabilitySnapshot:
+    """Attendees' calendars by day, fetched once and shared by every request of a backlog run.
+
+    ``ensure`` fetches the days that are not in the snapshot yet, one
+    fetch_calendar_events call per attendee per run of consecutive days, on
+    ``workers`` threads. ``book`` records a scheduled meeting for its
+    attendees, apart from the fetched days. At most ``max_days`` fetched
+    attendee-days are kept; the least recently used are dropped past that and
+    fetched again when a request needs them, while bookings stay for the
+    whole run. Not thread-safe: one run uses it at a time.
+    """
+
+    def __init__(self, fetch: Callable[[str, str, str], List[Dict[str, Any]]] = None,
+                 max_days: int = BACKLOG_SNAPSHOT_DAYS, workers: int = BACKLOG_FETCH_WORKERS):
+        self.fetch = fetch or fetch_calendar_events
+        self.max_days = max_days
+        self.workers = workers
+        self.stats = Counter()
+        # (email, day) -> [(start, end, event), ...] or {"error": ...}
+        self._days: "OrderedDict[Tuple[str, date], Any]" = OrderedDict()
+        # email -> [(start, end, event), ...] scheduled in this run, never evicted
+        self._bookings: Dict[str, List[Tuple[datetime, datetime, Dict[str, Any]]]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    def ensure(self, needs: Iterable[Tuple[str, datetime, datetime]]):
+        """Fetch every (email, start, end) range's days that are missing."""
+        missing = {}
+        for email, start, end in needs:
+            for day in _days(start, end):
+                if (email, day) in self._days:
+                    # Most recently used, so storing the missing days does not evict it
+                    self._days.move_to_end((email, day))
+                else:
+                    missing.setdefault(email, set()).add(day)
+        runs = []
+        for email, days in missing.items():
+            days = sorted(days)
+            run = [days[0]]
+            for day in days[1:]:
+                if day - run[-1] > timedelta(days=1):
+                    runs.append((email, run))
+                    run = []
+                run.append(day)
+            runs.append((email, run))
+        if not runs:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(runs))) as pool:
+            for (email, days), events in zip(runs, pool.map(self._fetch_run, runs)):
+                self._store(email, days, events)
+
+    def _fetch_run(self, run: Tuple[str, List[date]]) -> Any:
+        email, days = run
+        start = datetime.combine(days[0], dt_time(), IST).isoformat()
+        end = datetime.combine(days[-1] + timedelta(days=1), dt_time(), IST).isoformat()
+        try:
+            events = self.fetch(email, start, end)
+        except Exception as e:
+            log.warning("Could not retrieve calendar for %s: %s", email, e)
+            return {"error": str(e)}
+        return events if isinstance(events, list) else {"error": f"unexpected calendar response: {events!r:.100}"}
+
+    def _store(self, email: str, days: List[date], events: Any):
+        self.stats["fetches"] += 1
+        if isinstance(events, dict):
+            self.stats["fetch_errors"] += 1
+            by_day = {day: events for day in days}
+        else:
+            by_day = {day: [] for day in days}
+            for event in events:
+                try:
+                    start, end = _parse_time(event["StartTime"]), _parse_time(event["EndTime"])
+                except (KeyError, TypeError, ValueError):
+                    log.warning("Skipping calendar event of %s without usable times: %.100s", email, event)
+                    continue
+                for day in _days(start, end):
+                    if day in by_day:
+                        by_day[day].append((start, end, event))
+        for day, entry in by_day.items():
+            self._days[(email, day)] = entry
+            self._days.move_to_end((email, day))
+        while len(self._days) > self.max_days:
+            self._days.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def events(self, emails: Iterable[str], start: datetime, end: datetime) -> Dict[str, Any]:
+        """Each attendee's events overlapping [start, end), or their fetch error, as ``detailed_events``."""
+        emails = list(emails)
+        self.ensure((email, start, end) for email in emails)
+        days = _days(start, end)
+        detailed = {}
+        for email in emails:
+            events = []
+            for day in days:
+                entry = self._days.get((email, day), {"error": "calendar day dropped from the snapshot"})
+                if isinstance(entry, dict):
+                    events = entry
+                    break
+                self._days.move_to_end((email, day))
+                for event_start, event_end, event in entry:
+                    # Events spanning midnight are stored under every day they touch; take them from the first one
+                    if max(event_start.date(), days[0]) == day and event_start < end and event_end > start:
+                        events.append(event)
+            if isinstance(events, list):
+                events.extend(event for event_start, event_end, event in self._bookings.get(email, ())
+                              if event_start < end and event_end > start)
+            detailed[email] = events
+        return detailed
+
+    def book(self, emails: Iterable[str], event: Dict[str, Any]):
+        """Record a scheduled meeting, so later requests of the run see its attendees as busy."""
+        start, end = _parse_time(event["StartTime"]), _parse_time(event["EndTime"])
+        for email in emails:
+            self._bookings[email].append((start, end, event))
+
+
+def parse_request(scheduler: MeetingScheduler, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rule-based parse of one request: search range, duration, preferred day and time, and a confidence."""
+    from ai_scheduling_agent import extract_meeting_time_from_email
+
+    email = data.get("EmailContent", "") or ""
+    email_lower = email.lower()
+    reference = scheduler._parse_flexible_datetime(data.get("Datetime", ""))
+    analysis = scheduler.parse_email_content(email, data.get("Datetime", ""))
+    # The agent tool wants an ISO reference time; .function is the plain function under @Tool
+    extracted = extract_meeting_time_from_email.function(email, reference.strftime(TIME_FORMAT))
+    reasons = []
+
+    days_named = [word for word in DAY_WORDS if re.search(rf"\b{word}\b", email_lower)]
+    if len(days_named) > 1:
+        reasons.append("several_days")
+    extracted_start = _parse_time(extracted["start_time"])
+    preferred_day = analysis["preferred_day"]
+    if preferred_day:
+        preferred = _next_business_day(datetime.fromisoformat(preferred_day))
+        if preferred.date() != extracted_start.date():
+            reasons.append("extractors_disagree")
+        preferred_day = preferred.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+    if analysis["duration_minutes"] != extracted["duration_minutes"] and "extractors_disagree" not in reasons:
+        reasons.append("extractors_disagree")
+    if DATE_PHRASE.search(email_lower):
+        reasons.append("date_phrase")
+    if CONSTRAINT.search(email_lower):
+        reasons.append("constraint")
+    times = [match.group() for match in CLOCK_TIME.finditer(email_lower)]
+    if any(mentioned not in KNOWN_TIMES for mentioned in times):
+        reasons.append("unknown_time")
+
+    if data.get("Duration_mins"):
+        duration = int(data["Duration_mins"])
+    else:
+        duration = analysis["duration_minutes"]
+        if any(minutes != duration for minutes in _mentioned_minutes(email_lower)):
+            reasons.append("unknown_duration")
+
+    if data.get("Start") and data.get("End"):
+        start = scheduler._parse_flexible_datetime(data["Start"])
+        end = scheduler._parse_flexible_datetime(data["End"])
+        date_extraction = "Request Start/End"
+    elif preferred_day:
+        start = datetime.fromisoformat(preferred_day)
+        end = start + timedelta(days=1) - timedelta(seconds=1)
+        date_extraction = f"Extracted {start:%A} from email content"
+    else:
+        start = extracted_start.replace(hour=0, minute=0, second=0)
+        end = start + timedelta(days=7) - timedelta(seconds=1)
+        date_extraction = "Used the week from the next business day (no specific day mentioned)"
+        reasons.append("no_day")
+
+    # Only hold the extractor to a time the email actually names; otherwise rank the range
+    requested = None
+    time_extraction = "Ranked slots (no specific time mentioned)"
+    if any(mentioned in KNOWN_TIMES for mentioned in times) or "morning" in email_lower or "afternoon" in email_lower:
+        requested = extracted_start
+        time_extraction = f"Extracted {extracted['extraction_details']['detected_time']} from email content"
+
+    confidence = max(0.0, 1.0 - sum(CONFIDENCE_PENALTIES[reason] for reason in reasons))
+    return {
+        "data": data,
+        "emails": [data["From"]] + [attendee["email"] for attendee in data.get("Attendees", [])],
+        "start": start,
+        "end": end,
+        "duration": duration,
+        "preferred_day": preferred_day,
+        "requested": requested,
+        "confidence": round(confidence, 2),
+        "reasons": reasons,
+        "date_extraction": date_extraction,
+        "time_extraction": time_extraction,
+        "llm_used": False,
+        "reasoning": "",
+    }
+
+
+def error_record(data: Any, e: Exception, line: int) -> Dict[str, Any]:
+    """The /receive error response for one backlog line."""
+    return {
+        "Request_id": data.get("Request_id", "unknown") if isinstance(data, dict) else "unknown",
+        "Error": f"Processing failed: {str(e)}",
+        "Status": "error",
+        "MetaData": {"error_details": str(e), "line": line},
+    }
+
+
+def read_requests(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    """(line number, request) for each non-blank JSONL line; malformed lines become a ValueError."""
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f"Invalid JSON: {str(e)}")
+            continue
+        yield number, item if isinstance(item, dict) else ValueError("Requests must be JSON objects")
+
+
+class BacklogPipeline:
+    """Parse, refine, schedule and answer a backlog of requests chunk by chunk (see the module docstring)."""
+
+    def __init__(self, snapshot: AvailabilitySnapshot = None, chunk_size: int = BACKLOG_CHUNK_SIZE,
+                 min_confidence: float = BACKLOG_MIN_CONFIDENCE, llm_concurrency: int = BACKLOG_LLM_CONCURRENCY,
+                 use_llm: bool = True):
+        self.scheduler = MeetingScheduler()
+        self.snapshot = snapshot or AvailabilitySnapshot()
+        self.chunk_size = chunk_size
+        self.min_confidence = min_confidence
+        self.llm_concurrency = llm_concurrency
+        self.use_llm = use_llm
+        self.stats = Counter()
+
+    async def run(self, lines: Iterable[str], out) -> Counter:
+        """Process every request in ``lines`` and write one JSON line per request to the binary stream ``out``."""
+        requests = read_requests(lines)
+        while True:
+            chunk = list(itertools.islice(requests, self.chunk_size))
+            if not chunk:
+                return self.stats
+            for response in await self.process_chunk(chunk):
+                out.write(response_builder.dumps(response))
+            out.flush()
+
+    async def process_chunk(self, chunk: List[Tuple[int, Any]]) -> List[Dict[str, Any]]:
+        responses = [None] * len(chunk)
+        plans = []
+        for index, (line, item) in enumerate(chunk):
+            try:
+                if isinstance(item, Exception):
+                    raise item
+                plan = parse_request(self.scheduler, item)
+                plan["line"] = line
+                plans.append((index, plan))
+            except Exception as e:
+                responses[index] = error_record(item, e, line)
+        self.stats["requests"] += len(chunk)
+        self.stats["unparsed"] += len(chunk) - len(plans)
+
+        low = [plan for _, plan in plans if plan["confidence"] < self.min_confidence]
+        confident = [plan for _, plan in plans if plan["confidence"] >= self.min_confidence]
+        self.stats["low_confidence"] += len(low)
+        # Fetch the confident requests' days while the agents look at the rest
+        await asyncio.gather(asyncio.to_thread(self.snapshot.ensure, self._needs(confident)), self.refine(low))
+        await asyncio.to_thread(self.snapshot.ensure, self._needs(low))
+
+        scheduled = await asyncio.to_thread(self._schedule_all, plans, responses)
+        await asyncio.gather(*[create_calendar_events(plan["data"], event, responses[index]["MetaData"])
+                               for index, plan, event in scheduled])
+        self.stats["errors"] += sum("Error" in response for response in responses)
+        return responses
+
+    @staticmethod
+    def _needs(plans: List[Dict[str, Any]]) -> List[Tuple[str, datetime, datetime]]:
+        return [(email, plan["start"], plan["end"]) for plan in plans for email in plan["emails"]]
+
+    async def refine(self, plans: List[Dict[str, Any]]):
+        """Replace the rule-based range, duration and time of low-confidence requests with the agents' answers."""
+        if not plans or not self.use_llm:
+            return
+        import ai_scheduling_agent
+        if not ai_scheduling_agent.LLM_AVAILABLE:
+            for plan in plans:
+                plan["reasoning"] = "LLM not available, kept the rule-based parse"
+            return
+        semaphore = asyncio.Semaphore(self.llm_concurrency)
+
+        async def ask(plan):
+            async with semaphore:
+                result = await ai_scheduling_agent.schedule_meeting_async(plan["data"])
+            try:
+                if result.get("status") != "success":
+                    raise ValueError(result.get("error", "Unknown error"))
+                start, end = _parse_time(result["start_range"]), _parse_time(result["end_range"])
+                if end <= start:
+                    raise ValueError(f"empty date range {result['start_range']} to {result['end_range']}")
+                duration = int(result.get("duration_mins") or plan["duration"])
+                requested = _parse_time(result["event_start"]) if result.get("event_start") else None
+            except (KeyError, TypeError, ValueError) as e:
+                log.warning("LLM scheduling failed for line %s, keeping the rule-based parse: %s", plan["line"], e,
+                            extra={"Request_id": plan["data"].get("Request_id", "unknown")})
+                plan["reasoning"] = f"LLM failed: {str(e)}"
+                self.stats["llm_failed"] += 1
+                return
+            plan.update(start=start, end=end, duration=duration, requested=requested, llm_used=True,
+                        reasoning=result.get("reasoning") or "LLM successfully parsed the meeting request",
+                        date_extraction="LLM extracted from email content", time_extraction="LLM optimized timing")
+            self.stats["llm_ok"] += 1
+
+        await asyncio.gather(*[ask(plan) for plan in plans])
+
+    def _schedule_all(self, plans, responses) -> List[Tuple[int, Dict[str, Any], Dict[str, Any]]]:
+        """Schedule the chunk in input order, so earlier requests book their slots first."""
+        scheduled = []
+        for index, plan in plans:
+            try:
+                responses[index], event = self.schedule(plan)
+                scheduled.append((index, plan, event))
+            except Exception as e:
+                responses[index] = error_record(plan["data"], e, plan["line"])
+        return scheduled
+
+    def schedule(self, plan: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """The /receive response for one parsed request and the meeting it books in the snapshot."""
+        data, emails, duration = plan["data"], plan["emails"], plan["duration"]
+        start, end = plan["start"], plan["end"]
+        profile = scoring_profiles.profile_for_request(data)
+        detailed_events = self.snapshot.events(emails, start, end)
+
+        slot, source = None, "ranked"
+        requested = plan["requested"]
+        if requested is not None and start <= requested <= end:
+            candidates = scoring_profiles.rank_slots(detailed_events, duration, requested, requested, profile, limit=1)
+            if candidates and candidates[0]["all_available"]:
+                slot, source = candidates[0], "requested"
+        if slot is None:
+            slots = scoring_profiles.rank_slots(detailed_events, duration, start, end, profile, plan["preferred_day"])
+            # Nobody is free in the requested range: look further ahead, as process_meeting_request does
+            horizon_end = start.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(
+                days=SCHEDULING_HORIZON_DAYS)
+            if SCHEDULING_HORIZON_DAYS and not any(slot["all_available"] for slot in slots) and horizon_end > end:
+                later = scoring_profiles.rank_slots(self.snapshot.events(emails, start, horizon_end), duration, start,
+                                                    horizon_end, profile, plan["preferred_day"], requested_end=end)
+                if any(slot["all_available"] for slot in later):
+                    slots, source = later, "horizon_extended"
+            if not slots:
+                raise ValueError("No available time slots found for all attendees")
+            slot = next((slot for slot in slots if slot["all_available"]), slots[0])
+        self.stats[source] += 1
+        self.stats["conflicts"] += not slot["all_available"]
+
+        subject = data.get("Subject")
+        if not subject:
+            subject = "Goals Discussion Meeting" if "goals" in data.get("EmailContent", "").lower() else "Team Meeting"
+        new_event = {
+            "StartTime": datetime.fromisoformat(slot["start_time"]).strftime(TIME_FORMAT),
+            "EndTime": datetime.fromisoformat(slot["end_time"]).strftime(TIME_FORMAT),
+            "NumAttendees": len(emails),
+            "Attendees": emails,
+            "Summary": subject,
+        }
+        self.snapshot.book(emails, new_event)
+
+        if source == "requested":
+            reasoning = "Requested time is free for all attendees"
+        else:
+            reasoning = f"Best slot under the '{profile.name}' scoring profile"
+            if source == "horizon_extended":
+                reasoning += f", searching {SCHEDULING_HORIZON_DAYS} days from the range start"
+        if plan["reasoning"]:
+            reasoning = f"{plan['reasoning']}; {reasoning}"
+        metadata = {
+            "llm_used": plan["llm_used"],
+            "reasoning": reasoning,
+            "processing_method": "LLM_Success" if plan["llm_used"] else "Rule_Based_Success",
+            "date_extraction": plan["date_extraction"],
+            "time_extraction": plan["time_extraction"],
+            "fallback_used": plan["confidence"] < self.min_confidence and not plan["llm_used"],
+            "parse_confidence": plan["confidence"],
+            "confidence_reasons": plan["reasons"],
+            "slot_source": source,
+            "slot_score": slot["score"],
+            "conflicts_resolved": not slot["all_available"],
+            "scoring_profile": profile.name,
+        }
+        response = {
+            "Request_id": data.get("Request_id", "unknown"),
+            "Datetime": data.get("Datetime", ""),
+            "Location": data.get("Location", ""),
+            "From": data.get("From", ""),
+            "Attendees": response_builder.build_attendees(emails, detailed_events, new_event, scheduled_first=True),
+            "Subject": subject,
+            "EmailContent": data.get("EmailContent", ""),
+            "EventStart": new_event["StartTime"],
+            "EventEnd": new_event["EndTime"],
+            "Duration_mins": str(duration),
+            "MetaData": metadata,
+        }
+        return response, new_event
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of /receive requests, - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file for the responses, - for stdout")
+    parser.add_argument("--chunk-size", type=int, default=BACKLOG_CHUNK_SIZE, help="requests held in memory at once")
+    parser.add_argument("--min-confidence", type=float, default=BACKLOG_MIN_CONFIDENCE,
+                        help="parses scoring below this go to the agents")
+    parser.add_argument("--llm-concurrency", type=int, default=BACKLOG_LLM_CONCURRENCY)
+    parser.add_argument("--no-llm", action="store_true", help="schedule every request from the rule-based parse")
+    parser.add_argument("--fetch-workers", type=int, default=BACKLOG_FETCH_WORKERS,
+                        help="calendar fetches in flight")
+    parser.add_argument("--snapshot-days", type=int, default=BACKLOG_SNAPSHOT_DAYS,
+                        help="attendee-days kept in the availability snapshot")
+    parser.add_argument("--response-events", choices=response_builder.RESPONSE_EVENTS_MODES,
+                        help="existing events in each response (default RESPONSE_EVENTS)")
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    pipeline = BacklogPipeline(
+        AvailabilitySnapshot(max_days=args.snapshot_days, workers=args.fetch_workers),
+        chunk_size=args.chunk_size, min_confidence=args.min_confidence, llm_concurrency=args.llm_concurrency,
+        use_llm=not args.no_llm,
+    )
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    started = time.perf_counter()
+    try:
+        with response_builder.response_events(args.response_events):
+            stats = asyncio.run(pipeline.run(source, out))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout.buffer:
+            out.close()
+    elapsed = time.perf_counter() - started
+
+    print(f"{stats['requests']} requests in {elapsed:.1f}s ({stats['requests'] / elapsed:.0f}/s): "
+          f"{stats['requests'] - stats['unparsed'] - stats['low_confidence']} rule-based, "
+          f"{stats['low_confidence']} low confidence "
+          f"({stats['llm_ok']} refined by the agents, {stats['llm_failed']} agent failures), "
+          f"{stats['errors']} errors", file=sys.stderr)
+    print(f"Slots: {stats['requested']} as requested, {stats['ranked']} ranked, "
+          f"{stats['horizon_extended']} past the requested range, {stats['conflicts']} with conflicts. "
+          f"Calendar fetches: {pipeline.snapshot.stats['fetches']} ({pipeline.snapshot.stats['fetch_errors']} failed)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
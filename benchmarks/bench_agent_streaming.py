@@ -0,0 +1,147 @@
+"""Time-to-result of blocking vs streaming agent runs against a local streaming stub.
+
+The stub mimics the Qwen3 completions we see from the date range and optimal
+time agents: optional reasoning before the JSON and explanation text after
+it, emitted token by token at a fixed rate. The blocking path waits for the
+whole completion and calls ``json.loads``; the streaming path uses
+``run_agent_streaming`` and stops the generation once the fields are parsed.
+
+    python benchmarks/bench_agent_streaming.py --token-ms 20 --runs 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_streaming import run_agent_streaming
+
+DATE_RANGE_JSON = (
+    '{\n  "Start": "2025-07-24T00:00:00+05:30",\n'
+    '  "End": "2025-07-24T23:59:59+05:30",\n'
+    '  "Duration_mins": "30"\n}'
+)
+OPTIMAL_TIME_JSON = (
+    '{\n  "EventStart": "2025-07-24T10:00:00+05:30",\n'
+    '  "EventEnd": "2025-07-24T10:30:00+05:30",\n'
+    '  "OptimalTime": "10:00 on Thursday",\n'
+    '  "BusinessHoursValid": true,\n'
+    '  "Reasoning": "Thursday was requested and 10:00 is the first free morning slot '
+    'inside business hours, no weekend or off-hours adjustment was needed."\n}'
+)
+REASONING = (
+    "<think>\nThe user wants a meeting on Thursday. The reference date is a Monday, "
+    "so the next Thursday is three days ahead. Business hours are 9 to 6, the "
+    "request mentions 30 minutes, so the duration is 30. I should return only the "
+    "JSON object with Start and End covering the whole day.\n</think>\n\n"
+)
+EXPLANATION = (
+    "\n\nThe range above covers the requested Thursday from midnight to one second "
+    "before midnight, and the duration defaults to the 30 minutes mentioned in the email."
+)
+
+SCENARIOS = {
+    "date_range/clean": (DATE_RANGE_JSON, ("Start", "End", "Duration_mins")),
+    "date_range/reasoning+explanation": (REASONING + DATE_RANGE_JSON + EXPLANATION, ("Start", "End", "Duration_mins")),
+    "optimal_time/clean": (OPTIMAL_TIME_JSON, ("EventStart", "EventEnd")),
+    "optimal_time/reasoning+explanation": (REASONING + OPTIMAL_TIME_JSON + EXPLANATION, ("EventStart", "EventEnd")),
+}
+
+
+def tokenize(text):
+    """Split text into roughly token sized pieces."""
+    return re.findall(r"\s*\S{1,4}|\s+", text)
+
+
+class _Output:
+    def __init__(self, output):
+        self.output = output
+
+
+class _StreamResult:
+    def __init__(self, agent):
+        self.agent = agent
+
+    async def stream_text(self, delta=True, debounce_by=None):
+        for token in self.agent.tokens:
+            await asyncio.sleep(self.agent.token_delay)
+            self.agent.generated += 1
+            yield token
+
+
+class StubStreamingAgent:
+    """Local stand-in for a pydantic-ai Agent emitting a scripted completion."""
+
+    def __init__(self, completion, token_delay, first_token_delay):
+        self.tokens = tokenize(completion)
+        self.token_delay = token_delay
+        self.first_token_delay = first_token_delay
+        self.generated = 0
+
+    async def run(self, prompt):
+        await asyncio.sleep(self.first_token_delay)
+        for _ in self.tokens:
+            await asyncio.sleep(self.token_delay)
+            self.generated += 1
+        return _Output("".join(self.tokens))
+
+    @asynccontextmanager
+    async def run_stream(self, prompt):
+        await asyncio.sleep(self.first_token_delay)
+        yield _StreamResult(self)
+
+
+async def blocking_run(agent):
+    result = await agent.run("prompt")
+    try:
+        return json.loads(result.output)
+    except json.JSONDecodeError:
+        return None
+
+
+async def measure(completion, fields, args):
+    timings = {"blocking": [], "streaming": []}
+    parsed = {"blocking": 0, "streaming": 0}
+    tokens = {"blocking": 0, "streaming": 0}
+
+    for _ in range(args.runs):
+        for mode in ("blocking", "streaming"):
+            agent = StubStreamingAgent(completion, args.token_ms / 1000, args.first_token_ms / 1000)
+            started = time.perf_counter()
+            if mode == "blocking":
+                result = await blocking_run(agent)
+            else:
+                result = await run_agent_streaming(agent, "prompt", fields)
+            timings[mode].append(time.perf_counter() - started)
+            tokens[mode] += agent.generated
+            if result and all(field in result for field in fields):
+                parsed[mode] += 1
+
+    return timings, parsed, tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--token-ms", type=float, default=20.0, help="delay per generated token")
+    parser.add_argument("--first-token-ms", type=float, default=150.0, help="prefill delay before the first token")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'scenario':38} {'mode':10} {'mean_s':>8} {'tokens':>7} {'parsed':>7}")
+    for name, (completion, fields) in SCENARIOS.items():
+        timings, parsed, tokens = asyncio.run(measure(completion, fields, args))
+        for mode in ("blocking", "streaming"):
+            print(f"{name:38} {mode:10} {statistics.mean(timings[mode]):8.3f} "
+                  f"{tokens[mode] // args.runs:7d} {parsed[mode]:>3}/{args.runs}")
+        speedup = statistics.mean(timings["blocking"]) / statistics.mean(timings["streaming"])
+        print(f"{'':38} {'speedup':10} {speedup:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""How many in-flight /receive requests one process can hold: threaded Flask vs ASGI.
+
+Starts the local model stand-in (with a configurable per-call latency so each
+request spends most of its life waiting on the "LLM"), then for each server
+kind starts one server process and fires waves of concurrent /receive
+requests at it. Reports completed/failed requests, latency percentiles and
+the server's peak thread count and RSS (read from /proc, so Linux only).
+
+    python benchmarks/bench_asgi_concurrency.py --concurrency 50 200 800 --model-latency 1000
+
+``threaded`` is today's setup (Flask ``app.run(threaded=True)``, one thread per
+request running ``your_meeting_assistant``); ``asgi`` is ``asgi_server:app``
+under uvicorn. Calendar fetches fail fast without Keys/ tokens, which is fine
+here as they are not what is being measured.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE_REQUEST = os.path.join(ROOT, "input_Testcase1.json")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve_threaded(port: int):
+    """Run today's threaded Flask server (the notebook's /receive endpoint)."""
+    from flask import Flask, request, jsonify
+    from meeting_assistant import your_meeting_assistant
+
+    app = Flask(__name__)
+
+    @app.route('/receive', methods=['POST'])
+    def receive():
+        data = request.get_json()
+        return jsonify(your_meeting_assistant(data))
+
+    @app.route('/health', methods=['GET'])
+    def health():
+        return jsonify({"status": "healthy"})
+
+    app.run(host='127.0.0.1', port=port, debug=False, threaded=True)
+
+
+def serve_asgi(port: int):
+    import uvicorn
+    from asgi_server import app
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="error", backlog=4096)
+
+
+def process_stats(pid: int):
+    """Return (threads, rss_mb) for a process from /proc."""
+    threads, rss_kb = 0, 0
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    threads = int(line.split()[1])
+                elif line.startswith("VmRSS:"):
+                    rss_kb = int(line.split()[1])
+    except OSError:
+        pass
+    return threads, rss_kb / 1024
+
+
+async def post_json(port: int, path: str, payload: bytes, timeout: float):
+    """Minimal HTTP/1.1 POST over a raw socket so the client can hold thousands of connections."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+    try:
+        writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("ascii") + payload
+        )
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    status_line = response.split(b"\r\n", 1)[0].decode("latin-1")
+    return int(status_line.split()[1])
+
+
+async def wave(port: int, concurrency: int, timeout: float):
+    with open(SAMPLE_REQUEST, "rb") as f:
+        payload = f.read()
+
+    async def one():
+        started = time.perf_counter()
+        try:
+            status = await post_json(port, "/receive", payload, timeout)
+        except Exception as e:
+            return type(e).__name__, time.perf_counter() - started
+        return status, time.perf_counter() - started
+
+    return await asyncio.gather(*[one() for _ in range(concurrency)])
+
+
+def wait_until_up(port: int, deadline: float):
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def run_kind(kind: str, args, model_url: str):
+    port = free_port()
+    # Every request reuses one Request_id, keep idempotent replay out of the measurement.
+    # Admission control would cap in-flight requests, which is what this benchmark measures.
+    env = dict(os.environ, BASE_URL=model_url, PYTHONUNBUFFERED="1", IDEMPOTENCY_TTL="0",
+               ADMISSION_CONCURRENCY="100000", ADMISSION_QUEUE_SIZE="100000")
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", kind, "--port", str(port)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_until_up(port, time.time() + 60):
+            print(f"{kind}: server did not start")
+            return
+        # Warm up imports and the model client before measuring
+        asyncio.run(wave(port, 1, args.timeout))
+        for concurrency in args.concurrency:
+            peak = {"threads": 0, "rss": 0.0}
+            sampling = True
+
+            def sample():
+                while sampling:
+                    threads, rss = process_stats(server.pid)
+                    peak["threads"] = max(peak["threads"], threads)
+                    peak["rss"] = max(peak["rss"], rss)
+                    time.sleep(0.05)
+
+            sampler = threading.Thread(target=sample, daemon=True)
+            sampler.start()
+            started = time.perf_counter()
+            results = asyncio.run(wave(port, concurrency, args.timeout))
+            elapsed = time.perf_counter() - started
+            sampling = False
+            sampler.join()
+
+            ok = [latency for status, latency in results if status == 200]
+            failed = len(results) - len(ok)
+            reasons = Counter(str(status) for status, _ in results if status != 200)
+            p50 = statistics.median(ok) if ok else float("nan")
+            p99 = sorted(ok)[int(len(ok) * 0.99) - 1] if ok else float("nan")
+            print(f"{kind:9} {concurrency:6d} {len(ok):6d} {failed:6d} {p50:8.2f} {p99:8.2f} "
+                  f"{len(ok) / elapsed:8.1f} {peak['threads']:8d} {peak['rss']:8.1f}  {dict(reasons) or ''}")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kinds", nargs="+", default=["threaded", "asgi"], choices=["threaded", "asgi"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[50, 200, 800])
+    parser.add_argument("--model-latency", type=float, default=1000.0, help="stand-in latency per LLM call in ms")
+    parser.add_argument("--timeout", type=float, default=120.0, help="client timeout per request in seconds")
+    parser.add_argument("--serve", choices=["threaded", "asgi"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        # Keep the pipeline's per-request prints out of the measurement
+        sys.stdout = open(os.devnull, "w")
+        serve_threaded(args.port) if args.serve == "threaded" else serve_asgi(args.port)
+        return
+
+    from local_model_server import start_local_model_server, LatencyModel
+
+    model_server = start_local_model_server(latency=LatencyModel(f"fixed:{args.model_latency}"))
+    print(f"Model stand-in on {model_server.base_url}, {args.model_latency:.0f} ms per call")
+    print(f"{'server':9} {'conc':>6} {'ok':>6} {'failed':>6} {'p50_s':>8} {'p99_s':>8} "
+          f"{'req/s':>8} {'threads':>8} {'rss_mb':>8}")
+    for kind in args.kinds:
+        run_kind(kind, args, model_server.base_url)
+
+
+if __name__ == "__main__":
+    main()
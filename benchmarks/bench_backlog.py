@@ -0,0 +1,190 @@
+"""Working off a backlog: sequential /receive pipeline runs vs backlog_pipeline.py.
+
+Generates ``--requests`` meeting-request emails (``--ambiguous`` of them
+phrased in ways the rule-based extractors cannot fully read: several days,
+"next week", unusual times and durations) over a pool of attendees with busy
+calendars in the local calendar file, and the local model stand-in answering
+the agents with ``--model-latency-ms`` per call. ``receive`` runs every
+request through ``your_meeting_assistant_async`` one after the other, as
+replaying the backlog against /receive does; ``backlog`` runs
+``BacklogPipeline`` over the same JSONL file. The LLM cache is off, so
+neither mode benefits from the other's agent calls.
+
+Reports throughput, agent (model) calls, calendar backend calls, the peak
+Python heap (tracemalloc, so timings are inflated when --memory is given)
+and clashes: scheduled meetings overlapping an attendee's existing events or
+another meeting of the same run.
+
+    python benchmarks/bench_backlog.py --requests 200 --ambiguous 0.25 --model-latency-ms 100 --memory
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--ambiguous", type=float, default=0.25, help="share of emails the rules cannot fully read")
+    parser.add_argument("--pool", type=int, default=30, help="distinct attendees")
+    parser.add_argument("--per-request", type=int, default=3, help="people per request, organizer included")
+    parser.add_argument("--events-per-day", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated latency per calendar backend call")
+    parser.add_argument("--model-latency-ms", type=float, default=100.0)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--memory", action="store_true", help="trace the peak Python heap of each mode")
+    parser.add_argument("--modes", nargs="+", default=["receive", "backlog"], choices=["receive", "backlog"])
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+args = parse_args()
+workdir = tempfile.mkdtemp(prefix="backlog-bench-")
+
+from local_model_server import LatencyModel, start_local_model_server
+
+model_server = start_local_model_server(latency=LatencyModel(f"fixed:{args.model_latency_ms}"))
+os.environ.update(
+    LLM_ENABLED="1",
+    BASE_URL=model_server.base_url,
+    LLM_CACHE_TTL="0",
+    CALENDAR_EVENTS_FILE=os.path.join(workdir, "calendars.json"),
+    CALENDAR_FETCH_LATENCY_MS=str(args.latency_ms),
+    SHARED_CACHE_PATH=os.path.join(workdir, "cache.sqlite3"),
+    PREFETCH_ENABLED="0",
+)
+
+import ai_scheduling_agent  # loaded up front so neither mode pays for the import
+from backlog_pipeline import AvailabilitySnapshot, BacklogPipeline
+from calendar_events_fetch import calendar_cache
+from meeting_assistant import your_meeting_assistant_async
+import metrics
+from structured_logging import configure_logging
+import synthetic_calendars
+
+REFERENCE = datetime(2025, 7, 18, 12, 34, 55)  # a Friday
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+CLEAR = [
+    "Let's meet on {day} for 30 minutes to discuss the roadmap.",
+    "Can we do 1 hour on {day} at 2 pm?",
+    "Quick 15 min sync on {day} morning.",
+    "Please set up 45 min on {day} afternoon to review the launch.",
+]
+AMBIGUOUS = [
+    "{day} or {other} works, but not before 3 pm.",
+    "Let's catch up sometime next week for 90 minutes.",
+    "Quick chat at 12:30 on {day}?",
+    "Can we find time on the 29th to go through the goals?",
+]
+
+
+def build_requests(path: str, attendees, rng: random.Random):
+    with open(path, "w", encoding="utf-8") as f:
+        for index in range(args.requests):
+            day, other = rng.sample(DAYS, 2)
+            template = rng.choice(AMBIGUOUS if rng.random() < args.ambiguous else CLEAR)
+            people = rng.sample(attendees, args.per_request)
+            f.write(json.dumps({
+                "Request_id": f"backlog-bench-{index}",
+                "Datetime": REFERENCE.strftime("%d-%m-%YT%H:%M:%S"),
+                "Location": "IISc Bangalore",
+                "From": people[0],
+                "Attendees": [{"email": email} for email in people[1:]],
+                "Subject": "Synthetic backlog",
+                "EmailContent": template.format(day=day, other=other),
+            }) + "\n")
+
+
+def backend_calls() -> float:
+    return sum(value for (_, source), value in metrics.CALENDAR_CALLS.samples() if source == "backend")
+
+
+def clashes(responses, calendars) -> int:
+    """Scheduled meetings overlapping an attendee's existing event or another scheduled meeting."""
+    busy = defaultdict(list)
+    for email, events in calendars.items():
+        busy[email] = [(event["StartTime"], event["EndTime"]) for event in events]
+    count = 0
+    for response in responses:
+        start, end = response.get("EventStart"), response.get("EventEnd")
+        if not start:
+            continue
+        emails = [attendee["email"] for attendee in response["Attendees"]]
+        count += any(busy_start < end and busy_end > start for email in emails for busy_start, busy_end in busy[email])
+        for email in emails:
+            busy[email].append((start, end))
+    return count
+
+
+async def run_receive(path: str):
+    responses = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            responses.append(await your_meeting_assistant_async(json.loads(line)))
+    return responses
+
+
+async def run_backlog(path: str):
+    out_path = os.path.join(workdir, "results.jsonl")
+    pipeline = BacklogPipeline(AvailabilitySnapshot(), chunk_size=args.chunk_size,
+                               llm_concurrency=args.llm_concurrency)
+    with open(path, encoding="utf-8") as source, open(out_path, "wb") as out:
+        await pipeline.run(source, out)
+    with open(out_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f], pipeline.stats
+
+
+def run_mode(mode: str, path: str, calendars):
+    calendar_cache.clear()
+    model_before, calls_before = model_server.model.snapshot()["requests"], backend_calls()
+    if args.memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    if mode == "receive":
+        responses, stats = asyncio.run(run_receive(path)), Counter(low_confidence=args.requests)
+    else:
+        responses, stats = asyncio.run(run_backlog(path))
+    elapsed = time.perf_counter() - started
+    peak = f"{tracemalloc.get_traced_memory()[1] / 2 ** 20:8.1f}" if args.memory else f"{'-':>8}"
+    if args.memory:
+        tracemalloc.stop()
+    errors = sum("Error" in response for response in responses)
+    print(f"{mode:>8} {elapsed:8.2f} {len(responses) / elapsed:7.1f} {stats['low_confidence'] / args.requests:9.0%} "
+          f"{model_server.model.snapshot()['requests'] - model_before:11d} {backend_calls() - calls_before:8.0f} "
+          f"{peak} {clashes(responses, calendars):7d} {errors:6d}")
+
+
+def main():
+    configure_logging()
+    rng = random.Random(args.seed)
+    attendees = synthetic_calendars.attendee_emails(args.pool)
+    calendars = synthetic_calendars.generate_calendars(attendees, datetime(2025, 7, 21), 28, args.events_per_day,
+                                                       args.seed)
+    synthetic_calendars.write_calendars(os.environ["CALENDAR_EVENTS_FILE"], calendars)
+    path = os.path.join(workdir, "backlog.jsonl")
+    build_requests(path, attendees, rng)
+
+    print(f"{args.requests} requests, {args.ambiguous:.0%} ambiguous, {args.per_request} of {args.pool} attendees "
+          f"each, {args.model_latency_ms:.0f} ms per model call, {args.latency_ms:.0f} ms per calendar call")
+    print(f"{'mode':>8} {'total_s':>8} {'req/s':>7} {'to_agents':>9} {'model_calls':>11} {'fetches':>8} "
+          f"{'peak_mb':>8} {'clashes':>7} {'errors':>6}")
+    for mode in args.modes:
+        run_mode(mode, path, calendars)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""N separate POST /receive calls vs one POST /receive/batch for the same requests.
+
+Runs asgi_server.py with LLM_ENABLED=0 against a generated CALENDAR_EVENTS_FILE
+with the shared calendar cache disabled, so per-batch calendar sharing is the
+only thing deduplicating fetches.
+
+    python benchmarks/bench_batch_endpoint.py --requests 200 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_asgi_concurrency import free_port, wait_until_up
+from bench_multiprocess_scaling import build_request, drive, write_busy_calendars
+
+
+async def post_batch(port: int, payloads, timeout: float):
+    """Stream the batch as NDJSON and time the first and last response lines."""
+    body = b"\n".join(payloads) + b"\n"
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"POST /receive/batch HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/x-ndjson\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("ascii") + body
+    )
+    await writer.drain()
+    first = None
+    lines = 0
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        line = await asyncio.wait_for(reader.readline(), timeout)
+        if not line:
+            break
+        # Chunked transfer encoding: response lines are the ones carrying JSON objects
+        if line.startswith(b"{"):
+            lines += 1
+            first = first or time.perf_counter() - started
+    writer.close()
+    return lines, first, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8, help="client concurrency and BATCH_CONCURRENCY")
+    parser.add_argument("--attendees", type=int, default=4)
+    parser.add_argument("--weeks", type=int, default=1)
+    parser.add_argument("--events-per-day", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="batch-bench-")
+    attendees = [f"user{i}@example.com" for i in range(args.attendees)]
+    calendar_file = os.path.join(workdir, "calendars.json")
+    write_busy_calendars(calendar_file, attendees, args.weeks, args.events_per_day, args.seed)
+    payloads = [build_request(i, attendees, args.weeks) for i in range(args.requests)]
+
+    port = free_port()
+    env = dict(
+        os.environ,
+        CALENDAR_EVENTS_FILE=calendar_file,
+        CALENDAR_CACHE_TTL="0",
+        SHARED_CACHE_PATH=os.path.join(workdir, "cache.sqlite3"),
+        LLM_ENABLED="0",
+        # Both modes send the same Request_ids, run every one of them for real
+        IDEMPOTENCY_TTL="0",
+        BATCH_CONCURRENCY=str(args.concurrency),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "asgi_server.py", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_until_up(port, time.time() + 60):
+            print("server did not start")
+            return
+        asyncio.run(drive(port, payloads[:args.concurrency], args.concurrency, args.timeout))
+
+        elapsed, statuses = asyncio.run(drive(port, payloads, args.concurrency, args.timeout))
+        ok = sum(1 for status in statuses if status == 200)
+        lines, first, batch_elapsed = asyncio.run(post_batch(port, payloads, args.timeout))
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+    print(f"{args.requests} requests, {args.attendees} attendees, concurrency {args.concurrency}")
+    print(f"{'mode':>10} {'ok':>6} {'first_s':>8} {'total_s':>8} {'req/s':>8}")
+    print(f"{'/receive':>10} {ok:6d} {'-':>8} {elapsed:8.2f} {ok / elapsed:8.2f}")
+    print(f"{'batch':>10} {lines:6d} {first or 0:8.2f} {batch_elapsed:8.2f} {lines / batch_elapsed:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
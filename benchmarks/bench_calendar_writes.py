@@ -0,0 +1,145 @@
+"""Calendar event creation: one write call per attendee vs batched writes, against the local backend.
+
+Concurrent requests each create a meeting for a few attendees drawn from a
+shared pool of accounts, through ``CalendarWriter`` on the local
+CALENDAR_EVENTS_FILE backend with a simulated per-call latency and injected
+rate limits / server errors. ``unbatched`` sends every write on its own
+(batch size 1); ``batched`` lets concurrent requests share per-account batch
+calls. Both share one token bucket. Afterwards the calendar file is checked:
+every meeting must be on all of its attendees' calendars or on none.
+
+    python benchmarks/bench_calendar_writes.py --requests 200 --concurrency 16 --latency-ms 50 --rate-limit-rate 0.05
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+from calendar_events_write import CalendarWriteError, CalendarWriter, LocalCalendarWriteBackend, TokenBucket
+from local_model_server import FailureInjector
+from structured_logging import configure_logging
+import synthetic_calendars
+
+RANGE_START = datetime(2025, 7, 21, 9)
+
+
+def build_meetings(count: int, accounts, per_meeting: int, seed: int):
+    rng = random.Random(seed)
+    meetings = []
+    for index in range(count):
+        # Distinct start times, so each meeting's copies can be told apart in the file
+        start = RANGE_START + timedelta(minutes=index)
+        meetings.append((f"write-bench-{index}", {
+            "StartTime": start.strftime(synthetic_calendars.TIME_FORMAT),
+            "EndTime": (start + timedelta(minutes=30)).strftime(synthetic_calendars.TIME_FORMAT),
+            "NumAttendees": per_meeting,
+            "Attendees": rng.sample(accounts, per_meeting),
+            "Summary": f"Benchmark meeting {index}",
+        }))
+    return meetings
+
+
+def check_all_or_nothing(path: str, meetings, outcomes):
+    """(fully created, fully absent, partial and reported, inconsistent) meetings in the calendar file.
+
+    A failed rollback leaves copies behind; that is only acceptable when the
+    error named those accounts in ``rollback_failed``.
+    """
+    with open(path, encoding="utf-8") as f:
+        calendars = json.load(f)
+    full = absent = partial = broken = 0
+    for (_, meeting), outcome in zip(meetings, outcomes):
+        present = {account for account in meeting["Attendees"] if meeting in calendars.get(account, [])}
+        if outcome == "created" and len(present) == len(meeting["Attendees"]):
+            full += 1
+        elif outcome != "created" and not present:
+            absent += 1
+        elif outcome != "created" and present <= set(outcome):
+            partial += 1
+        else:
+            broken += 1
+    return full, absent, partial, broken
+
+
+def run_mode(mode: str, args, workdir: str, accounts, meetings):
+    path = os.path.join(workdir, f"calendars-{mode}.json")
+    synthetic_calendars.write_calendars(path, {account: [] for account in accounts})
+    failures = FailureInjector(error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                               rng=random.Random(args.seed))
+    backend = LocalCalendarWriteBackend(path, latency=args.latency_ms / 1000, failures=failures,
+                                        retry_after=args.retry_after)
+    writer = CalendarWriter(
+        backend, TokenBucket(args.rate, args.burst),
+        batch_size=1 if mode == "unbatched" else args.batch_size,
+        batch_window=0.0 if mode == "unbatched" else args.batch_window_ms / 1000,
+        max_attempts=args.max_attempts, backoff_base=args.backoff_base, workers=args.workers,
+        rng=random.Random(args.seed),
+    )
+
+    def create(meeting):
+        request_id, event = meeting
+        try:
+            writer.create_event(event, request_id)
+            return "created"
+        except CalendarWriteError as e:
+            # The accounts whose copy could not be rolled back (usually none)
+            return e.rollback_failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        outcomes = list(pool.map(create, meetings))
+    elapsed = time.perf_counter() - started
+    full, absent, partial, broken = check_all_or_nothing(path, meetings, outcomes)
+    stats = writer.stats
+    print(f"{mode:>10} {elapsed:8.2f} {backend.calls:7d} {stats['insert_ok'] / elapsed:9.1f} "
+          f"{stats['retries']:8d} {stats['rate_limited']:8d} {stats['rollbacks']:9d} "
+          f"{full:6d} {absent:7d} {partial:8d} {broken:6d}")
+    return broken
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--accounts", type=int, default=12, help="calendar accounts shared by all meetings")
+    parser.add_argument("--attendees", type=int, default=4, help="attendees per meeting")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="simulated latency per backend call")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.02, help="fraction of writes answered 429")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="fraction of writes answered 500")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--rate", type=float, default=500.0, help="token bucket: writes per second")
+    parser.add_argument("--burst", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--batch-window-ms", type=float, default=20.0)
+    parser.add_argument("--max-attempts", type=int, default=5)
+    parser.add_argument("--backoff-base", type=float, default=0.05, help="seconds before the first retry")
+    parser.add_argument("--workers", type=int, default=4, help="writer threads")
+    parser.add_argument("--modes", nargs="+", default=["unbatched", "batched"], choices=["unbatched", "batched"])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    configure_logging()
+
+    workdir = tempfile.mkdtemp(prefix="calendar-write-bench-")
+    accounts = synthetic_calendars.attendee_emails(args.accounts)
+    meetings = build_meetings(args.requests, accounts, args.attendees, args.seed)
+
+    print(f"{args.requests} meetings x {args.attendees} attendees over {args.accounts} accounts, "
+          f"{args.latency_ms:.0f} ms per call, {args.rate_limit_rate:.0%} rate limited, {args.error_rate:.0%} errors")
+    print(f"{'mode':>10} {'total_s':>8} {'calls':>7} {'writes/s':>9} {'retries':>8} {'limited':>8} "
+          f"{'rollbacks':>9} {'full':>6} {'absent':>7} {'partial':>8} {'broken':>6}")
+    broken = sum(run_mode(mode, args, workdir, accounts, meetings) for mode in args.modes)
+    return 1 if broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Cost of the pipeline's logging at each level.
+
+Runs ``your_meeting_assistant_async`` in-process with LLM_ENABLED=0 and a
+generated CALENDAR_EVENTS_FILE, once per mode, and reports per-request time:
+
+    info        LOG_LEVEL=INFO, the production default (DEBUG trace skipped)
+    debug       LOG_LEVEL=DEBUG, every request's trace formatted and written
+    per-request LOG_LEVEL=INFO, every request flagged with debug=True
+
+Log output goes to /dev/null so only the formatting and queueing are timed.
+
+    python benchmarks/bench_logging_overhead.py --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_multiprocess_scaling import build_request, write_busy_calendars
+
+MODES = ("info", "debug", "per-request")
+
+
+async def run_mode(mode: str, requests, devnull) -> list:
+    from meeting_assistant import your_meeting_assistant_async
+    from structured_logging import configure_logging, request_context, shutdown_logging
+
+    # Big enough that the writer never drops records, which would flatter the debug modes
+    configure_logging(level="DEBUG" if mode == "debug" else "INFO", stream=devnull, queue_size=1_000_000)
+    timings = []
+    for data in requests:
+        started = time.perf_counter()
+        with request_context(data["Request_id"], debug=mode == "per-request"):
+            await your_meeting_assistant_async(data)
+        timings.append(time.perf_counter() - started)
+    shutdown_logging()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--attendees", type=int, default=4)
+    parser.add_argument("--weeks", type=int, default=1)
+    parser.add_argument("--events-per-day", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="logging-bench-")
+    attendees = [f"user{i}@example.com" for i in range(args.attendees)]
+    calendar_file = os.path.join(workdir, "calendars.json")
+    write_busy_calendars(calendar_file, attendees, args.weeks, args.events_per_day, args.seed)
+    os.environ.update(
+        CALENDAR_EVENTS_FILE=calendar_file,
+        SHARED_CACHE_PATH=os.path.join(workdir, "cache.sqlite3"),
+        LLM_ENABLED="0",
+    )
+    requests = [json.loads(build_request(i, attendees, args.weeks)) for i in range(args.requests)]
+
+    print(f"{'mode':12} {'mean_ms':>8} {'p50_ms':>8} {'p99_ms':>8}")
+    with open(os.devnull, "w") as devnull:
+        # Warm up imports and the calendar cache
+        asyncio.run(run_mode("info", requests[:5], devnull))
+        for mode in MODES:
+            timings = sorted(asyncio.run(run_mode(mode, requests, devnull)))
+            print(f"{mode:12} {statistics.mean(timings) * 1000:8.2f} {timings[len(timings) // 2] * 1000:8.2f} "
+                  f"{timings[int(len(timings) * 0.99) - 1] * 1000:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Throughput of server.py on a slot-search-heavy workload as the worker count grows.
+
+Each request covers a multi-week range for many attendees with busy
+calendars (served from a generated CALENDAR_EVENTS_FILE) and runs with
+LLM_ENABLED=0, so every request goes through the rule-based
+``find_best_time_slots`` search. Ideally req/s grows linearly with workers up
+to the number of cores.
+
+    python benchmarks/bench_multiprocess_scaling.py --workers 1 2 4 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_asgi_concurrency import free_port, post_json, wait_until_up
+import synthetic_calendars
+
+RANGE_START = datetime(2025, 7, 21)
+
+
+def write_busy_calendars(path: str, attendees, weeks: int, events_per_day: int, seed: int):
+    calendars = synthetic_calendars.generate_calendars(attendees, RANGE_START, weeks * 7, events_per_day, seed)
+    synthetic_calendars.write_calendars(path, calendars)
+
+
+def build_request(index: int, attendees, weeks: int) -> bytes:
+    request = synthetic_calendars.build_request(f"scaling-{index}", attendees, RANGE_START, weeks * 7, duration=45)
+    return json.dumps(request).encode("utf-8")
+
+
+async def drive(port: int, payloads, concurrency: int, timeout: float):
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses = []
+
+    async def one(payload):
+        async with semaphore:
+            try:
+                statuses.append(await post_json(port, "/receive", payload, timeout))
+            except Exception as e:
+                statuses.append(type(e).__name__)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(payload) for payload in payloads])
+    return time.perf_counter() - started, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--attendees", type=int, default=8)
+    parser.add_argument("--weeks", type=int, default=3)
+    parser.add_argument("--events-per-day", type=int, default=6)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="scaling-bench-")
+    attendees = [f"user{i}@example.com" for i in range(args.attendees)]
+    calendar_file = os.path.join(workdir, "calendars.json")
+    write_busy_calendars(calendar_file, attendees, args.weeks, args.events_per_day, args.seed)
+    payloads = [build_request(i, attendees, args.weeks) for i in range(args.requests)]
+
+    print(f"{args.requests} requests, {args.attendees} attendees, {args.weeks} weeks, "
+          f"{args.events_per_day} events/day, {os.cpu_count()} cores")
+    print(f"{'workers':>7} {'ok':>6} {'req/s':>8} {'speedup':>8} {'efficiency':>10}")
+    baseline = None
+    for workers in args.workers:
+        port = free_port()
+        env = dict(
+            os.environ,
+            CALENDAR_EVENTS_FILE=calendar_file,
+            SHARED_CACHE_PATH=os.path.join(workdir, f"cache-{workers}.sqlite3"),
+            LLM_ENABLED="0",
+            # The warm-up requests are sent again in the measured run
+            IDEMPOTENCY_TTL="0",
+        )
+        server = subprocess.Popen(
+            [sys.executable, "server.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            if not wait_until_up(port, time.time() + 60):
+                print(f"{workers:7d} server did not start")
+                continue
+            # Warm every worker's imports before measuring
+            asyncio.run(drive(port, payloads[:workers * 2], workers * 2, args.timeout))
+            elapsed, statuses = asyncio.run(drive(port, payloads, workers * 4, args.timeout))
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+
+        ok = sum(1 for status in statuses if status == 200)
+        throughput = ok / elapsed
+        baseline = baseline or throughput / workers
+        speedup = throughput / baseline
+        print(f"{workers:7d} {ok:6d} {throughput:8.2f} {speedup:7.2f}x {speedup / workers:9.0%}")
+
+
+if __name__ == "__main__":
+    main()
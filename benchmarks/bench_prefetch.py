@@ -0,0 +1,171 @@
+"""Critical-path calendar lookups with and without the background prefetcher.
+
+Requests arrive at ``--rate`` per second, each from a few attendees drawn
+from a pool with Zipf-like popularity (a handful of people are in most
+requests), over a range of 1-3 days within the next business days. Every
+request runs ``get_availability_for_all`` against the local calendar file
+with ``--latency-ms`` per backend call, through the usual calendar cache.
+``off`` is the behaviour before calendar_prefetch.py; ``prefetch`` records
+attendee frequency and runs the prefetcher every ``--interval`` seconds.
+Time is compressed: the calendar cache TTL defaults to the interval, as with
+CALENDAR_CACHE_TTL=60 and the default PREFETCH_INTERVAL of 60s.
+
+Reports availability latency on the request path, backend calls made on
+the request path and in the background, the prefetch hit rate (calendar
+cache misses answered from prefetched days) and the share of attendee
+lookups that had to wait for the backend.
+
+    python benchmarks/bench_prefetch.py --requests 300 --rate 20 --latency-ms 80 --interval 2
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--rate", type=float, default=20.0, help="requests per second")
+    parser.add_argument("--pool", type=int, default=20, help="distinct attendees")
+    parser.add_argument("--per-request", type=int, default=3, help="people per request, organizer included")
+    parser.add_argument("--zipf", type=float, default=1.2, help="popularity skew; 0 draws attendees uniformly")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="simulated latency per backend call")
+    parser.add_argument("--events-per-day", type=int, default=6)
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between prefetch rounds")
+    parser.add_argument("--cache-ttl", type=float, default=None,
+                        help="CALENDAR_CACHE_TTL; defaults to --interval, 0 turns the cache off as in production")
+    parser.add_argument("--top-n", type=int, default=10, help="attendees refreshed per round")
+    parser.add_argument("--days", type=int, default=5, help="upcoming business days prefetched")
+    parser.add_argument("--budget", type=int, default=3600, help="background backend calls per hour")
+    parser.add_argument("--modes", nargs="+", default=["off", "prefetch"], choices=["off", "prefetch"])
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+args = parse_args()
+workdir = tempfile.mkdtemp(prefix="prefetch-bench-")
+os.environ.update(
+    CALENDAR_EVENTS_FILE=os.path.join(workdir, "calendars.json"),
+    CALENDAR_FETCH_LATENCY_MS=str(args.latency_ms),
+    SHARED_CACHE_PATH=os.path.join(workdir, "cache.sqlite3"),
+    PREFETCH_INTERVAL=str(args.interval),
+    CALENDAR_CACHE_TTL=str(args.interval if args.cache_ttl is None else args.cache_ttl),
+)
+
+from calendar_events_fetch import calendar_cache
+import calendar_prefetch
+import metrics
+from scheduling_meeting_utils import MeetingScheduler
+from structured_logging import configure_logging
+import synthetic_calendars
+
+
+def upcoming_business_days(today, count: int):
+    days, day = [], today
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def build_requests(attendees, business_days, rng: random.Random):
+    weights = [1 / (rank + 1) ** args.zipf for rank in range(len(attendees))]
+    requests = []
+    for index in range(args.requests):
+        people = []
+        while len(people) < args.per_request:
+            person = rng.choices(attendees, weights)[0]
+            if person not in people:
+                people.append(person)
+        first = rng.randrange(len(business_days))
+        last = min(len(business_days) - 1, first + rng.randrange(3))
+        start = datetime.combine(business_days[first], datetime.min.time())
+        days = (business_days[last] - business_days[first]).days + 1
+        requests.append(synthetic_calendars.build_request(f"prefetch-bench-{index}", people, start, days))
+    return requests
+
+
+def calendar_calls() -> Counter:
+    calls = Counter()
+    for (_, source), value in metrics.CALENDAR_CALLS.samples():
+        calls[source] += value
+    return calls
+
+
+def prefetch_lookups() -> Counter:
+    return Counter({outcome: value for (outcome,), value in metrics.PREFETCH_LOOKUPS.samples()})
+
+
+async def run_mode(mode: str, requests):
+    calendar_cache.clear()
+    calendar_prefetch.availability_cache.clear()
+    calendar_prefetch.invalidated_days.clear()
+    calendar_prefetch.PREFETCH_ENABLED = mode == "prefetch"
+    calendar_prefetch.attendee_tracker = tracker = calendar_prefetch.AttendeeTracker()
+    prefetcher = calendar_prefetch.Prefetcher(tracker, interval=args.interval, top_n=args.top_n, days=args.days,
+                                              max_calls_per_hour=args.budget)
+    prefetcher.budget.clear()
+    calls_before, lookups_before = calendar_calls(), prefetch_lookups()
+    scheduler = MeetingScheduler()
+    if mode == "prefetch":
+        prefetcher.start()
+
+    latencies = []
+    started = time.perf_counter()
+    for index, request in enumerate(requests):
+        delay = started + index / args.rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        calendar_prefetch.record_request(request)
+        emails = [request["From"]] + [attendee["email"] for attendee in request["Attendees"]]
+        call_started = time.perf_counter()
+        await asyncio.to_thread(scheduler.get_availability_for_all, emails, request["Start"], request["End"])
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    await prefetcher.stop()
+
+    calls = calendar_calls() - calls_before
+    lookups = prefetch_lookups() - lookups_before
+    checked = lookups["hit"] + lookups["miss"]
+    hit_rate = f"{lookups['hit'] / checked:8.0%}" if checked else f"{'-':>8}"
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{mode:>8} {quantiles[49]:8.1f} {quantiles[94]:8.1f} {max(latencies):8.1f} {calls['backend']:8.0f} "
+          f"{prefetcher.stats['ok'] + prefetcher.stats['error']:10d} {hit_rate} "
+          f"{calls['backend'] / sum(calls.values()):13.0%}")
+
+
+def main():
+    configure_logging()
+    rng = random.Random(args.seed)
+    today = datetime.now(calendar_prefetch.IST).date()
+    business_days = upcoming_business_days(today, args.days)
+    attendees = synthetic_calendars.attendee_emails(args.pool)
+    calendars = synthetic_calendars.generate_calendars(
+        attendees, datetime.combine(today, datetime.min.time()), (business_days[-1] - today).days + 1,
+        args.events_per_day, args.seed
+    )
+    synthetic_calendars.write_calendars(os.environ["CALENDAR_EVENTS_FILE"], calendars)
+    requests = build_requests(attendees, business_days, rng)
+
+    print(f"{args.requests} requests at {args.rate:.0f}/s, {args.per_request} of {args.pool} attendees each, "
+          f"{args.latency_ms:.0f} ms per backend call, prefetch top {args.top_n} every {args.interval:.0f}s")
+    print(f"{'mode':>8} {'p50_ms':>8} {'p95_ms':>8} {'max_ms':>8} {'fg_calls':>8} {'prefetches':>10} "
+          f"{'hit_rate':>8} {'backend_share':>13}")
+    for mode in args.modes:
+        asyncio.run(run_mode(mode, requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Bytes and CPU per /receive response, by response events mode and JSON encoder.
+
+Builds rule-based responses with ``MeetingScheduler.create_meeting_response``
+from generated busy calendars (no calendar backend involved) and encodes them
+the way the servers do. ``all`` + ``json`` is the response as it was before
+response_builder.py: every existing event in the requested range, encoded by
+the json module. CPU time is process time per response, build and encode
+separately.
+
+    python benchmarks/bench_response_builder.py --attendees 3 10 50 --days 5 20 --events-per-day 8
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import response_builder
+from scheduling_meeting_utils import MeetingScheduler
+import synthetic_calendars
+
+RANGE_START = datetime(2025, 7, 21)
+
+
+def cpu_per_call(func, min_seconds: float) -> float:
+    """Process time per call in seconds, repeating ``func`` for at least ``min_seconds``."""
+    calls = 0
+    started = time.process_time()
+    while True:
+        func()
+        calls += 1
+        elapsed = time.process_time() - started
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attendees", nargs="+", type=int, default=[3, 10, 50])
+    parser.add_argument("--days", nargs="+", type=int, default=[5, 20])
+    parser.add_argument("--events-per-day", type=int, default=8)
+    parser.add_argument("--modes", nargs="+", default=list(response_builder.RESPONSE_EVENTS_MODES),
+                        choices=response_builder.RESPONSE_EVENTS_MODES)
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="CPU time to spend per measurement")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    scheduler = MeetingScheduler()
+    encoders = response_builder.ENCODERS
+    if "orjson" not in encoders:
+        print("orjson is not installed, measuring the json module only")
+
+    print(f"{'attendees':>9} {'days':>5} {'mode':>7} {'encoder':>8} {'kbytes':>9} {'build_us':>10} "
+          f"{'encode_us':>10} {'total_us':>10} {'vs_before':>9}")
+    for attendees_count in args.attendees:
+        for days in args.days:
+            attendees = synthetic_calendars.attendee_emails(attendees_count)
+            calendars = synthetic_calendars.generate_calendars(
+                attendees, RANGE_START, days, args.events_per_day, args.seed, shared_ratio=0.2
+            )
+            request = synthetic_calendars.build_request("response-bench", attendees, RANGE_START, days)
+            availability = {"detailed_events": calendars}
+            # A meeting in the middle of the range, like a real pick
+            slot_start = RANGE_START + timedelta(days=days // 2, hours=11)
+            best_slot = {
+                "start_time": slot_start.strftime(synthetic_calendars.TIME_FORMAT),
+                "end_time": (slot_start + timedelta(minutes=30)).strftime(synthetic_calendars.TIME_FORMAT),
+            }
+            before = None
+            for mode in args.modes:
+                with response_builder.response_events(mode):
+                    def build():
+                        return scheduler.create_meeting_response(request, best_slot, availability)
+
+                    response = build()
+                    build_cpu = cpu_per_call(build, args.min_seconds)
+                for name, encode in encoders.items():
+                    size = len(encode(response))
+                    encode_cpu = cpu_per_call(lambda: encode(response), args.min_seconds)
+                    total = build_cpu + encode_cpu
+                    if mode == "all" and name == "json":
+                        before = total
+                    speedup = f"{before / total:8.1f}x" if before else f"{'-':>9}"
+                    print(f"{attendees_count:9d} {days:5d} {mode:>7} {name:>8} {size / 1024:9.1f} "
+                          f"{build_cpu * 1e6:10.1f} {encode_cpu * 1e6:10.1f} {total * 1e6:10.1f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""Benchmark suite for the rule-based scheduling core.
+
+For every scenario (attendees x events per day x range length x meeting
+duration) a seeded synthetic calendar is generated and three stages are
+measured in-process against the local calendar backend:
+
+    availability  MeetingScheduler.get_availability_for_all (calendar cache off)
+    slot_search   each registered slot-search engine on the fetched availability:
+                  baseline (find_best_time_slots) and profile:<name> (rank_time_slots
+                  under each built-in scoring profile)
+    end_to_end    process_meeting_request
+
+Each row reports throughput, p50/p95/p99 latency and peak traced memory
+(tracemalloc, measured in a separate call so it does not skew the timings).
+Results are compared with the stored baseline; a row whose fastest run is
+more than --threshold slower, or whose peak memory is that much higher, fails
+the run. The fastest run is compared, as timeit does, because noise on a
+shared machine only ever adds time. Before any timing, every engine must
+reproduce the slots of the input_TestcaseN.json / output_TestcaseN.json pairs.
+
+    python benchmarks/bench_scheduling_core.py                  # check and compare with the baseline
+    python benchmarks/bench_scheduling_core.py --save-baseline  # record a new baseline on this machine
+    python benchmarks/bench_scheduling_core.py --engines baseline --attendees 3 25 --days 5 --iterations 20
+"""
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Measure real calendar reads, not the shared cache, and keep the scheduler quiet
+os.environ.setdefault("CALENDAR_CACHE_TTL", "0")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import calendar_events_fetch
+from scheduling_meeting_utils import MeetingScheduler, process_meeting_request
+import scoring_profiles
+from structured_logging import configure_logging
+import synthetic_calendars
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "scheduling_core.json")
+RANGE_START = datetime(2025, 7, 21)
+
+# name -> factory returning a slot-search function with the signature of
+# MeetingScheduler.find_best_time_slots(availability, duration, start, end, preferred_day)
+ENGINES: Dict[str, Callable[[], Callable[..., List[Dict[str, Any]]]]] = {}
+
+
+def register_engine(name: str):
+    def decorator(factory):
+        ENGINES[name] = factory
+        return factory
+    return decorator
+
+
+@register_engine("baseline")
+def baseline_engine():
+    """The hour-band scorer process_meeting_request uses."""
+    return MeetingScheduler().find_best_time_slots
+
+
+def profile_engine(name: str):
+    """rank_time_slots under one scoring profile, the ranking process_meeting_request uses."""
+    def factory():
+        scheduler = MeetingScheduler()
+        profile = scoring_profiles.get_profile(name)
+        return lambda availability, duration, start, end, preferred_day: scheduler.rank_time_slots(
+            availability, duration, start, end, preferred_day, profile
+        )
+    return factory
+
+
+for _profile in scoring_profiles.BUILTIN_PROFILES:
+    register_engine(f"profile:{_profile}")(profile_engine(_profile))
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def peak_memory_kb(func: Callable[[], Any]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {
+        "ops_per_s": round(len(timings) / sum(timings), 3),
+        "best_ms": round(timings[0] * 1000, 3),
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "peak_kb": round(peak_memory_kb(func), 1),
+    }
+
+
+def scenario_name(attendees: int, events_per_day: int, days: int, duration: int) -> str:
+    return f"a{attendees}-e{events_per_day}-d{days}-m{duration}"
+
+
+def run_scenario(args, workdir: str, engines: List[str], attendees: int, events_per_day: int,
+                 days: int, duration: int) -> List[Dict[str, Any]]:
+    name = scenario_name(attendees, events_per_day, days, duration)
+    emails = synthetic_calendars.attendee_emails(attendees)
+    calendar_file = os.path.join(workdir, f"{name}.json")
+    synthetic_calendars.write_calendars(
+        calendar_file,
+        synthetic_calendars.generate_calendars(emails, RANGE_START, days, events_per_day, args.seed,
+                                               shared_ratio=args.shared_ratio)
+    )
+    calendar_events_fetch.CALENDAR_EVENTS_FILE = calendar_file
+
+    request = synthetic_calendars.build_request(name, emails, RANGE_START, days, duration)
+    scheduler = MeetingScheduler()
+    availability = scheduler.get_availability_for_all(emails, request["Start"], request["End"])
+
+    stages = [("availability", "-", lambda: scheduler.get_availability_for_all(emails, request["Start"], request["End"]))]
+    for engine in engines:
+        search = ENGINES[engine]()
+        stages.append(("slot_search", engine,
+                       lambda search=search: search(availability, duration, request["Start"], request["End"], None)))
+    stages.append(("end_to_end", "baseline", lambda: process_meeting_request(dict(request))))
+
+    rows = []
+    for stage, engine, func in stages:
+        row = {"stage": stage, "engine": engine, "scenario": name}
+        row.update(measure(func, args.iterations, args.warmup))
+        rows.append(row)
+    return rows
+
+
+def load_testcases() -> List[Dict[str, Any]]:
+    cases = []
+    for input_path in sorted(glob.glob(os.path.join(ROOT, "input_Testcase*.json"))):
+        output_path = input_path.replace("input_", "output_")
+        if not os.path.exists(output_path):
+            continue
+        with open(input_path, encoding="utf-8") as f:
+            request = json.load(f)
+        with open(output_path, encoding="utf-8") as f:
+            expected = json.load(f)
+        cases.append({"name": os.path.basename(input_path)[len("input_"):-len(".json")],
+                      "request": request, "expected": expected})
+    return cases
+
+
+def _naive(value: str) -> datetime:
+    return datetime.fromisoformat(value).replace(tzinfo=None)
+
+
+def _attendee_events(response: Dict[str, Any]):
+    return [
+        (attendee["email"], [(_naive(event["StartTime"]), _naive(event["EndTime"]), event["NumAttendees"])
+                             for event in attendee["events"]])
+        for attendee in response.get("Attendees", [])
+    ]
+
+
+def check_testcases(engines: List[str], workdir: str) -> List[str]:
+    """Run every engine and process_meeting_request on the test cases; return the mismatches.
+
+    The test case calendars are empty, so each expected output holds just the
+    scheduled meeting. The requests carry no range; process_meeting_request
+    must reproduce the output from the request as sent, and everything is
+    also checked with an explicit range: the week starting on the request's
+    Datetime.
+    """
+    failures = []
+    empty_calendars = os.path.join(workdir, "testcase_calendars.json")
+    synthetic_calendars.write_calendars(empty_calendars, {})
+    calendar_events_fetch.CALENDAR_EVENTS_FILE = empty_calendars
+    scheduler = MeetingScheduler()
+
+    for case in load_testcases():
+        expected_attendees = _attendee_events(case["expected"])
+        response = process_meeting_request(dict(case["request"]))
+        if _attendee_events(response) != expected_attendees:
+            failures.append(f"{case['name']} [process_meeting_request, as sent]: attendee events differ from the "
+                            f"expected output{': ' + response['error'] if 'error' in response else ''}")
+
+        request = dict(case["request"])
+        requested_at = scheduler._parse_flexible_datetime(request["Datetime"]).replace(hour=0, minute=0, second=0)
+        request["Start"] = requested_at.isoformat()
+        request["End"] = (requested_at + timedelta(days=7)).replace(hour=23, minute=59, second=59).isoformat()
+        expected_event = case["expected"]["Attendees"][0]["events"][-1]
+        expected_slot = (_naive(expected_event["StartTime"]), _naive(expected_event["EndTime"]))
+
+        analysis = scheduler.parse_email_content(request.get("EmailContent", ""), request["Datetime"])
+        emails = [request["From"]] + [attendee["email"] for attendee in request.get("Attendees", [])]
+        availability = {"detailed_events": {email: [] for email in emails}}
+        for engine in engines:
+            slots = ENGINES[engine]()(availability, analysis["duration_minutes"], request["Start"],
+                                      request["End"], analysis["preferred_day"])
+            best = next((slot for slot in slots if slot["all_available"]), slots[0] if slots else None)
+            got = (_naive(best["start_time"]), _naive(best["end_time"])) if best else None
+            if got != expected_slot:
+                failures.append(f"{case['name']} [{engine}]: expected {expected_slot}, got {got}")
+
+        if _attendee_events(process_meeting_request(request)) != expected_attendees:
+            failures.append(f"{case['name']} [process_meeting_request, with range]: attendee events differ from "
+                            f"the expected output")
+    return failures
+
+
+def row_key(row: Dict[str, Any]) -> str:
+    return f"{row['stage']}/{row['engine']}/{row['scenario']}"
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(rows: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Annotate rows with their change against the baseline; return the regressions."""
+    regressions = []
+    stored = baseline.get("results", {})
+    for row in rows:
+        base = stored.get(row_key(row))
+        if base is None:
+            row["vs_baseline"] = "new"
+            continue
+        change = row["best_ms"] / base["best_ms"] - 1 if base["best_ms"] else 0.0
+        row["vs_baseline"] = f"{change:+.0%}"
+        if change > threshold:
+            regressions.append(f"{row_key(row)}: fastest run {base['best_ms']:.2f} -> "
+                               f"{row['best_ms']:.2f} ms ({change:+.0%})")
+        if base.get("peak_kb") and row["peak_kb"] > base["peak_kb"] * (1 + threshold):
+            regressions.append(f"{row_key(row)}: peak memory {base['peak_kb']:.0f} -> {row['peak_kb']:.0f} KB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", default=None, help="default: all registered")
+    parser.add_argument("--attendees", nargs="+", type=int, default=[3, 10])
+    parser.add_argument("--events-per-day", nargs="+", type=int, default=[4, 12])
+    parser.add_argument("--days", nargs="+", type=int, default=[5, 10])
+    parser.add_argument("--durations", nargs="+", type=int, default=[30])
+    parser.add_argument("--shared-ratio", type=float, default=0.2, help="fraction of events shared by two attendees")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before a row fails")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--skip-checks", action="store_true", help="skip the test case correctness checks")
+    args = parser.parse_args()
+
+    configure_logging()
+    engines = args.engines or list(ENGINES)
+    unknown = [engine for engine in engines if engine not in ENGINES]
+    if unknown:
+        parser.error(f"unknown engines {unknown}, registered: {list(ENGINES)}")
+    workdir = tempfile.mkdtemp(prefix="scheduling-bench-")
+
+    if not args.skip_checks:
+        failures = check_testcases(engines, workdir)
+        for failure in failures:
+            print(f"CHECK FAILED {failure}")
+        if failures:
+            sys.exit(1)
+        print(f"Test cases: {len(load_testcases())} passed for {', '.join(engines)} and process_meeting_request")
+
+    rows = []
+    print(f"{'stage':12} {'engine':18} {'scenario':18} {'ops/s':>9} {'best_ms':>9} {'p50_ms':>9} {'p95_ms':>9} "
+          f"{'p99_ms':>9} {'peak_kb':>9} {'vs_base':>8}")
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    for attendees in args.attendees:
+        for events_per_day in args.events_per_day:
+            for days in args.days:
+                for duration in args.durations:
+                    scenario_rows = run_scenario(args, workdir, engines, attendees, events_per_day, days, duration)
+                    compare(scenario_rows, baseline, args.threshold)
+                    for row in scenario_rows:
+                        print(f"{row['stage']:12} {row['engine']:18} {row['scenario']:18} {row['ops_per_s']:9.2f} "
+                              f"{row['best_ms']:9.2f} {row['p50_ms']:9.2f} {row['p95_ms']:9.2f} {row['p99_ms']:9.2f} {row['peak_kb']:9.0f} "
+                              f"{row.get('vs_baseline', '-'):>8}")
+                    rows.extend(scenario_rows)
+
+    results = {"meta": {**machine_info(), "created": datetime.now().isoformat(timespec="seconds"),
+                        "iterations": args.iterations, "seed": args.seed},
+               "results": {row_key(row): {key: row[key] for key in ("ops_per_s", "best_ms", "p50_ms", "p95_ms", "p99_ms", "peak_kb")}
+                           for row in rows}}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if baseline:
+        if baseline.get("meta", {}).get("platform") != machine_info()["platform"]:
+            print(f"Note: baseline was recorded on {baseline['meta'].get('platform')}, "
+                  f"timings from another machine are only roughly comparable")
+        regressions = compare(rows, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Slot ranking cost by scoring profile over horizons of one to several weeks.
+
+Ranks slots on generated busy calendars (no calendar backend involved) with
+``find_best_time_slots`` (the hour-band scorer, re-parsing every event for
+every candidate slot) and with ``rank_time_slots`` under each built-in
+scoring profile (table lookup plus merged busy intervals). Also reports
+what compiling a profile into its (weekday, slot) table costs, and whether
+the default profile picks the same slot as find_best_time_slots. When it
+does not, it is usually because find_best_time_slots also offers slots that
+run past the end of business hours (17:45 for 30 minutes), which
+rank_time_slots leaves out.
+
+    python benchmarks/bench_scoring_profiles.py --weeks 1 2 4 --attendees 3 10 25 --events-per-day 8
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+from scheduling_meeting_utils import MeetingScheduler
+import scoring_profiles
+import synthetic_calendars
+
+RANGE_START = datetime(2025, 7, 21)
+
+
+def best_ms(func, iterations: int) -> float:
+    """Fastest of ``iterations`` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--attendees", nargs="+", type=int, default=[3, 10, 25])
+    parser.add_argument("--events-per-day", type=int, default=8)
+    parser.add_argument("--duration", type=int, default=30)
+    parser.add_argument("--profiles", nargs="+", default=scoring_profiles.profile_names())
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--skip-baseline", action="store_true",
+                        help="leave out find_best_time_slots, which takes seconds on long horizons")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    scheduler = MeetingScheduler()
+    profiles = [scoring_profiles.get_profile(name) for name in args.profiles]
+    compile_us = best_ms(lambda: [scoring_profiles.ScoringProfile(p.name, **p.fields) for p in profiles],
+                         args.iterations * 10) * 1000 / len(profiles)
+    print(f"Compiling a profile into its 7 x {scoring_profiles.SLOTS_PER_DAY} table: {compile_us:.0f} us")
+
+    print(f"{'weeks':>5} {'attendees':>9} {'ranker':>24} {'best_ms':>9} {'vs_baseline':>11} {'best_slot':>17} {'same':>5}")
+    for weeks in args.weeks:
+        for attendees_count in args.attendees:
+            attendees = synthetic_calendars.attendee_emails(attendees_count)
+            calendars = synthetic_calendars.generate_calendars(
+                attendees, RANGE_START, weeks * 7, args.events_per_day, args.seed, shared_ratio=0.2
+            )
+            request = synthetic_calendars.build_request("profile-bench", attendees, RANGE_START, weeks * 7)
+            availability = {"detailed_events": calendars}
+
+            baseline_ms = baseline_slot = None
+            if not args.skip_baseline:
+                def baseline():
+                    return scheduler.find_best_time_slots(availability, args.duration, request["Start"],
+                                                          request["End"])
+
+                baseline_ms = best_ms(baseline, args.iterations)
+                baseline_slot = baseline()[0]["start_time"]
+                print(f"{weeks:5d} {attendees_count:9d} {'find_best_time_slots':>24} {baseline_ms:9.2f} "
+                      f"{'-':>11} {baseline_slot[:16]:>17} {'-':>5}")
+
+            for profile in profiles:
+                def rank():
+                    return scheduler.rank_time_slots(availability, args.duration, request["Start"],
+                                                     request["End"], None, profile)
+
+                elapsed = best_ms(rank, args.iterations)
+                slot = rank()[0]["start_time"]
+                speedup = f"{baseline_ms / elapsed:10.1f}x" if baseline_ms else f"{'-':>11}"
+                same = ("yes" if slot == baseline_slot else "no") if baseline_slot and profile.name == "default" else "-"
+                print(f"{weeks:5d} {attendees_count:9d} {'profile:' + profile.name:>24} {elapsed:9.2f} "
+                      f"{speedup} {slot[:16]:>17} {same:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""Replay recorded /receive traffic against the scheduler and report latency and outcomes.
+
+Reads recorded requests from any mix of:
+
+* the request journal (REQUEST_JOURNAL_PATH NDJSON, rotated files included),
+* a saved ``GET /debug/requests`` response (``{"requests": [...]}``),
+* JSONL / JSON with one /receive request body per line or element
+  (``input_Testcase1.json`` works too).
+
+Pacing: by default requests keep their recorded spacing (journal timestamps),
+divided by ``--speed`` for time compression. ``--rate`` sends at a fixed
+request rate instead and ``--concurrency`` keeps N requests in flight as fast
+as the server answers. Open-loop modes cap in-flight requests at
+``--max-in-flight``; ``send_lag`` in the report shows how far sending fell
+behind the schedule when that cap was hit.
+
+Without ``--target`` the tool runs fully offline. It starts asgi_server.py
+(or server.py with ``--workers``) against the local model stand-in and a
+seeded synthetic CALENDAR_EVENTS_FILE for every attendee in the recording
+(or ``--calendars``). The report covers p50/p95/p99 latency, HTTP, transport
+and application errors, and the ``processing_method`` mix from each response's
+MetaData.
+
+    python benchmarks/replay_traffic.py /var/log/scheduler/journal.ndjson* --speed 10
+    python benchmarks/replay_traffic.py input_Testcase*.json --repeat 50 --rate 20 --model-latency lognormal:5.3,0.4
+    python benchmarks/replay_traffic.py recorded.jsonl --concurrency 16 --target http://scheduler:5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_asgi_concurrency import free_port, wait_until_up
+import synthetic_calendars
+
+# A recorded request: (journal timestamp or None, /receive body)
+Recorded = Tuple[Optional[datetime], Dict[str, Any]]
+
+
+def _recorded(item: Any) -> Optional[Recorded]:
+    if not isinstance(item, dict):
+        return None
+    if "original_request" in item:
+        request = item["original_request"]
+        if not isinstance(request, dict):
+            return None
+        timestamp = datetime.fromisoformat(item["timestamp"]) if item.get("timestamp") else None
+        return timestamp, request
+    return None, item
+
+
+def _json_items(path: str) -> Iterator[Any]:
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    try:
+        document = json.loads(text)
+    except json.JSONDecodeError:
+        # One JSON document per line: the journal or a JSONL file
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"{path}: skipping unparsable line")
+        return
+    if isinstance(document, dict) and isinstance(document.get("requests"), list):
+        yield from document["requests"]
+    elif isinstance(document, list):
+        yield from document
+    else:
+        yield document
+
+
+def load_recorded(paths: List[str]) -> List[Recorded]:
+    """Recorded requests from all ``paths``, in timestamp order when every one has a timestamp."""
+    recorded = []
+    for path in paths:
+        for item in _json_items(path):
+            entry = _recorded(item)
+            if entry is not None:
+                recorded.append(entry)
+    if recorded and all(timestamp is not None for timestamp, _ in recorded):
+        recorded.sort(key=lambda entry: entry[0])
+    return recorded
+
+
+def build_schedule(recorded: List[Recorded], args) -> List[Tuple[Optional[float], Dict[str, Any]]]:
+    """(send offset in seconds or None for closed loop, request) for every request to send."""
+    requests = [request for _, request in recorded]
+    if args.concurrency:
+        offsets = [None] * len(requests)
+        period = 0.0
+    elif args.rate:
+        offsets = [index / args.rate for index in range(len(requests))]
+        period = len(requests) / args.rate
+    else:
+        first = recorded[0][0]
+        offsets = [(timestamp - first).total_seconds() / args.speed for timestamp, _ in recorded]
+        # Repeats start one average gap after the previous pass ends
+        period = offsets[-1] * len(offsets) / (len(offsets) - 1) if len(offsets) > 1 else 0.0
+
+    schedule = []
+    for repeat in range(args.repeat):
+        for offset, request in zip(offsets, requests):
+            if args.rewrite_ids:
+                request = dict(request, Request_id=f"{request.get('Request_id', 'replay')}-replay{len(schedule)}")
+            schedule.append((None if offset is None else offset + repeat * period, request))
+    return schedule[:args.limit] if args.limit else schedule
+
+
+def write_recorded_calendars(path: str, recorded: List[Recorded], events_per_day: int, seed: int,
+                             horizon_days: int = 21):
+    """Seeded busy calendars for every attendee, covering each request's week(s) after its Datetime."""
+    attendees = set()
+    dates = []
+    for _, request in recorded:
+        attendees.add(request.get("From"))
+        attendees.update(attendee.get("email") for attendee in request.get("Attendees") or []
+                         if isinstance(attendee, dict))
+        try:
+            dates.append(datetime.strptime(request.get("Datetime", ""), "%d-%m-%YT%H:%M:%S"))
+        except ValueError:
+            continue
+    attendees.discard(None)
+    start = min(dates) if dates else datetime.now()
+    start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    end = max(dates) if dates else start
+    calendars = synthetic_calendars.generate_calendars(
+        sorted(attendees), start, (end - start).days + horizon_days, events_per_day, seed, shared_ratio=0.2
+    )
+    synthetic_calendars.write_calendars(path, calendars)
+    return len(attendees)
+
+
+async def post_request(host: str, port: int, path: str, payload: bytes, timeout: float) -> Tuple[int, bytes]:
+    """POST ``payload`` over a fresh connection and return (status, body)."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("ascii") + payload
+        )
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = int(head.split(b"\r\n", 1)[0].split()[1])
+    if b"transfer-encoding: chunked" in head.lower():
+        body = _dechunk(body)
+    return status, body
+
+
+def _dechunk(body: bytes) -> bytes:
+    chunks = []
+    while body:
+        size_line, _, body = body.partition(b"\r\n")
+        size = int(size_line.split(b";")[0], 16)
+        if size == 0:
+            break
+        chunks.append(body[:size])
+        body = body[size + 2:]
+    return b"".join(chunks)
+
+
+def classify(status: Any, body: bytes) -> Tuple[str, str]:
+    """(outcome, processing_method) for one response; outcome is "ok" or the kind of error."""
+    if not isinstance(status, int):
+        return status, "-"
+    try:
+        response = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return (f"http_{status}" if status != 200 else "bad_json"), "-"
+    if not isinstance(response, dict):
+        return "bad_json", "-"
+    method = (response.get("MetaData") or {}).get("processing_method", "-")
+    if status != 200:
+        return f"http_{status}", method
+    if response.get("Status") == "error" or response.get("Error"):
+        return "app_error", method
+    return "ok", method
+
+
+async def replay(host: str, port: int, schedule, args) -> Tuple[List[Dict[str, Any]], float]:
+    closed_loop = schedule and schedule[0][0] is None
+    in_flight = asyncio.Semaphore(args.concurrency if closed_loop else args.max_in_flight)
+    results = []
+    loop = asyncio.get_running_loop()
+
+    async def one(payload: bytes, lag: float):
+        started = time.perf_counter()
+        try:
+            status, body = await post_request(host, port, "/receive", payload, args.timeout)
+        except Exception as e:
+            status, body = type(e).__name__, b""
+        finally:
+            in_flight.release()
+        outcome, method = classify(status, body)
+        results.append({"latency": time.perf_counter() - started, "outcome": outcome,
+                        "method": method, "lag": lag})
+
+    tasks = []
+    began = loop.time()
+    for offset, request in schedule:
+        payload = json.dumps(request).encode("utf-8")
+        if offset is not None:
+            await asyncio.sleep(max(0.0, began + offset - loop.time()))
+        await in_flight.acquire()
+        lag = 0.0 if offset is None else max(0.0, loop.time() - began - offset)
+        tasks.append(asyncio.create_task(one(payload, lag)))
+    await asyncio.gather(*tasks)
+    return results, loop.time() - began
+
+
+async def warm_up(host: str, port: int, requests: List[Dict[str, Any]], timeout: float):
+    """Send ``requests`` one by one, unmeasured, so imports and clients are warm."""
+    for request in requests:
+        try:
+            await post_request(host, port, "/receive", json.dumps(request).encode("utf-8"), timeout)
+        except Exception:
+            pass
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))]
+
+
+def summarize(results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(result["latency"] for result in results if result["outcome"] == "ok")
+    outcomes = Counter(result["outcome"] for result in results)
+    return {
+        "requests": len(results),
+        "ok": outcomes.get("ok", 0),
+        "error_rate": round(1 - outcomes.get("ok", 0) / len(results), 4) if results else 0.0,
+        "errors": {outcome: count for outcome, count in outcomes.most_common() if outcome != "ok"},
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+            "max": round(latencies[-1] * 1000, 1) if latencies else float("nan"),
+        },
+        "max_send_lag_ms": round(max((result["lag"] for result in results), default=0.0) * 1000, 1),
+        "processing_methods": dict(Counter(result["method"] for result in results).most_common()),
+    }
+
+
+def print_report(summary: Dict[str, Any]):
+    latency = summary["latency_ms"]
+    print(f"{summary['requests']} requests in {summary['elapsed_s']:.1f}s ({summary['throughput_rps']:.1f} req/s), "
+          f"max send lag {summary['max_send_lag_ms']:.0f} ms")
+    print(f"latency ms (ok): p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  "
+          f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}")
+    print(f"errors: {summary['error_rate']:.2%}  {summary['errors'] or ''}")
+    print("processing_method:")
+    for method, count in summary["processing_methods"].items():
+        print(f"  {method:24} {count:6d} {count / summary['requests']:7.1%}")
+
+
+def start_local_server(args, workdir: str, recorded: List[Recorded]) -> Tuple[subprocess.Popen, int]:
+    """Start the scheduler offline: local calendars, model stand-in (or LLM off), fresh caches."""
+    calendar_file = args.calendars
+    if not calendar_file:
+        calendar_file = os.path.join(workdir, "calendars.json")
+        count = write_recorded_calendars(calendar_file, recorded, args.events_per_day, args.seed)
+        print(f"Synthetic calendars for {count} attendees, {args.events_per_day} events/day")
+
+    env = dict(
+        os.environ,
+        CALENDAR_EVENTS_FILE=os.path.abspath(calendar_file),
+        SHARED_CACHE_PATH=os.path.join(workdir, "cache.sqlite3"),
+        JOB_QUEUE_PATH=os.path.join(workdir, "jobs.sqlite3"),
+        # Recorded Request_ids may repeat, process every replayed request
+        IDEMPOTENCY_TTL="0",
+        LOG_LEVEL=os.environ.get("LOG_LEVEL", "ERROR"),
+    )
+    if args.model_latency == "off":
+        env["LLM_ENABLED"] = "0"
+        print("LLM disabled, rule-based scheduler only")
+    else:
+        from local_model_server import LatencyModel, start_local_model_server
+
+        model_server = start_local_model_server(latency=LatencyModel(args.model_latency))
+        env.update(LLM_ENABLED="1", BASE_URL=model_server.base_url)
+        print(f"Model stand-in on {model_server.base_url}, latency {args.model_latency}")
+
+    port = free_port()
+    if args.workers:
+        command = ["server.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(args.workers)]
+    else:
+        command = ["asgi_server.py", "--host", "127.0.0.1", "--port", str(port)]
+    server = subprocess.Popen([sys.executable] + command, cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return server, port
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", nargs="+", help="journal NDJSON, /debug/requests JSON or request JSONL files")
+    pacing = parser.add_mutually_exclusive_group()
+    pacing.add_argument("--speed", type=float, default=1.0, help="time compression of the recorded spacing")
+    pacing.add_argument("--rate", type=float, help="send at this many requests per second")
+    pacing.add_argument("--concurrency", type=int, help="keep this many requests in flight")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="in-flight cap for open-loop pacing")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the recording this many times")
+    parser.add_argument("--limit", type=int, default=None, help="send at most this many requests")
+    parser.add_argument("--rewrite-ids", action="store_true",
+                        help="make Request_ids unique so a live server's idempotency cache does not answer them")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured requests sent first")
+    parser.add_argument("--timeout", type=float, default=120.0, help="client timeout per request in seconds")
+    parser.add_argument("--target", help="base URL of a running server (default: start one offline)")
+    parser.add_argument("--workers", type=int, default=0, help="offline: run server.py with N workers")
+    parser.add_argument("--model-latency", default="fixed:0",
+                        help="offline: stand-in latency spec (see local_model_server.py), or 'off' for LLM_ENABLED=0")
+    parser.add_argument("--calendars", help="offline: CALENDAR_EVENTS_FILE to use instead of synthetic calendars")
+    parser.add_argument("--events-per-day", type=int, default=4, help="offline: synthetic busy events per day")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    recorded = load_recorded(args.recordings)
+    if not recorded:
+        parser.error("no requests found in the recordings")
+    if not (args.rate or args.concurrency) and any(timestamp is None for timestamp, _ in recorded):
+        parser.error("recordings without journal timestamps need --rate or --concurrency")
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    schedule = build_schedule(recorded, args)
+    print(f"Replaying {len(schedule)} requests from {len(recorded)} recorded")
+
+    server = None
+    workdir = tempfile.mkdtemp(prefix="traffic-replay-")
+    try:
+        if args.target:
+            url = urlsplit(args.target)
+            host, port = url.hostname, url.port or 80
+        else:
+            server, port = start_local_server(args, workdir, recorded)
+            host = "127.0.0.1"
+            if not wait_until_up(port, time.time() + 60):
+                print("server did not start")
+                return 1
+        asyncio.run(warm_up(host, port, [request for _, request in schedule[:args.warmup]], args.timeout))
+        results, elapsed = asyncio.run(replay(host, port, schedule, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=60)
+
+    summary = summarize(results, elapsed)
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Soak test: memory of the ASGI app stays flat as /receive requests pile up.
+
+Calls ``asgi_server.app`` in-process (no sockets) with LLM_ENABLED=0 and a
+generated CALENDAR_EVENTS_FILE, so every request carries a full set of
+attendee events into the request journal. Prints RSS, journal entries held in
+memory and on-disk journal size once per ``--report-every`` seconds. With the
+ring buffer RSS should level off after warm-up instead of growing with the
+request count.
+
+    python benchmarks/soak_request_journal.py --duration 10800 --journal /tmp/journal.ndjson
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_asgi_concurrency import process_stats
+from bench_multiprocess_scaling import build_request, write_busy_calendars
+
+
+async def call_app(app, payload: bytes) -> int:
+    """Drive one POST /receive through the ASGI app and return the status code."""
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    status = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    scope = {"type": "http", "method": "POST", "path": "/receive", "query_string": b"", "headers": []}
+    await app(scope, receive, send)
+    return status[0]
+
+
+def journal_size(journal) -> int:
+    return sum(os.path.getsize(path) for path in journal.journal_files())
+
+
+async def soak(args, payloads):
+    import asgi_server
+
+    journal = asgi_server.journal
+    started = time.time()
+    next_report = started
+    sent = errors = 0
+    print(f"{'elapsed':>8} {'requests':>9} {'errors':>6} {'rss_mb':>8} {'in_memory':>9} {'journal_mb':>10}")
+    while time.time() - started < args.duration:
+        batch = [payloads[(sent + i) % len(payloads)] for i in range(args.concurrency)]
+        statuses = await asyncio.gather(*[call_app(asgi_server.app, payload) for payload in batch])
+        sent += len(statuses)
+        errors += sum(1 for status in statuses if status != 200)
+        if time.time() >= next_report:
+            _, rss_mb = process_stats(os.getpid())
+            print(f"{time.time() - started:7.0f}s {sent:9d} {errors:6d} {rss_mb:8.1f} "
+                  f"{len(journal.recent(journal.capacity)):9d} {journal_size(journal) / 1e6:10.1f}")
+            next_report += args.report_every
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run")
+    parser.add_argument("--report-every", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--attendees", type=int, default=4)
+    parser.add_argument("--weeks", type=int, default=1)
+    parser.add_argument("--events-per-day", type=int, default=6)
+    parser.add_argument("--journal", default=None, help="REQUEST_JOURNAL_PATH (default: in-memory ring only)")
+    parser.add_argument("--journal-max-bytes", type=int, default=5 * 1024 * 1024)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="journal-soak-")
+    attendees = [f"user{i}@example.com" for i in range(args.attendees)]
+    calendar_file = os.path.join(workdir, "calendars.json")
+    write_busy_calendars(calendar_file, attendees, args.weeks, args.events_per_day, args.seed)
+    # Distinct Request_ids so nothing upstream can short-circuit repeated payloads
+    payloads = [build_request(i, attendees, args.weeks) for i in range(1000)]
+
+    os.environ.update(
+        CALENDAR_EVENTS_FILE=calendar_file,
+        SHARED_CACHE_PATH=os.path.join(workdir, "cache.sqlite3"),
+        LLM_ENABLED="0",
+        # Payloads cycle through 1000 Request_ids, every request must reach the journal
+        IDEMPOTENCY_TTL="0",
+        REQUEST_JOURNAL_MAX_BYTES=str(args.journal_max_bytes),
+    )
+    # LLM_ENABLED=0 logs a warning per request, keep the report readable
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    if args.journal:
+        os.environ["REQUEST_JOURNAL_PATH"] = args.journal
+
+    asyncio.run(soak(args, payloads))
+
+
+if __name__ == "__main__":
+    main()
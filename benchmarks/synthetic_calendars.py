@@ -0,0 +1,78 @@
+"""Seeded synthetic calendars and meeting requests for the benchmarks.
+
+Calendars use the event format ``retrive_calendar_events`` returns and can be
+written to a CALENDAR_EVENTS_FILE for the local calendar backend. The same
+seed always produces the same calendars.
+"""
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S+05:30"
+
+
+def attendee_emails(count: int, domain: str = "example.com") -> List[str]:
+    return [f"user{i}@{domain}" for i in range(count)]
+
+
+def generate_calendars(attendees: Sequence[str], start: datetime, days: int, events_per_day: int,
+                       seed: int = 0, durations: Sequence[int] = (30, 45, 60), shared_ratio: float = 0.0,
+                       first_hour: int = 9, last_hour: int = 16) -> Dict[str, List[Dict[str, Any]]]:
+    """Busy calendars for ``attendees`` over ``days`` days from ``start``, weekends left free.
+
+    Each attendee gets ``events_per_day`` events per business day starting on
+    a 15-minute boundary between ``first_hour`` and ``last_hour``. Events may
+    overlap, as they do in real calendars. With ``shared_ratio`` > 0 that
+    fraction of events is also put on a second attendee's calendar, like a
+    one-on-one.
+    """
+    rng = random.Random(seed)
+    calendars = {attendee: [] for attendee in attendees}
+    for day in range(days):
+        date = start + timedelta(days=day)
+        if date.weekday() >= 5:
+            continue
+        for attendee in attendees:
+            for _ in range(events_per_day):
+                event_start = date.replace(hour=rng.randint(first_hour, last_hour), minute=rng.choice([0, 15, 30, 45]),
+                                           second=0, microsecond=0)
+                event_end = event_start + timedelta(minutes=rng.choice(durations))
+                members = [attendee]
+                if len(attendees) > 1 and rng.random() < shared_ratio:
+                    members.append(rng.choice([other for other in attendees if other != attendee]))
+                event = {
+                    "StartTime": event_start.strftime(TIME_FORMAT),
+                    "EndTime": event_end.strftime(TIME_FORMAT),
+                    "NumAttendees": len(members),
+                    "Attendees": members if len(members) > 1 else ["SELF"],
+                    "Summary": "Busy",
+                }
+                for member in members:
+                    calendars[member].append(event)
+    for events in calendars.values():
+        events.sort(key=lambda event: event["StartTime"])
+    return calendars
+
+
+def write_calendars(path: str, calendars: Dict[str, List[Dict[str, Any]]]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(calendars, f)
+
+
+def build_request(request_id: str, attendees: Sequence[str], start: datetime, days: int,
+                  duration: int = 30, email_content: str = None) -> Dict[str, Any]:
+    """A /receive request from attendees[0] covering ``days`` days from ``start``."""
+    end = start + timedelta(days=days - 1)
+    return {
+        "Request_id": request_id,
+        "Datetime": (start - timedelta(days=2)).strftime("%d-%m-%YT12:34:55"),
+        "Location": "IISc Bangalore",
+        "From": attendees[0],
+        "Attendees": [{"email": email} for email in attendees[1:]],
+        "Subject": "Synthetic benchmark",
+        "EmailContent": email_content or f"Let's find {duration} minutes to sync on the roadmap.",
+        "Start": start.strftime("%Y-%m-%dT00:00:00+05:30"),
+        "End": end.strftime("%Y-%m-%dT23:59:59+05:30"),
+        "Duration_mins": str(duration),
+    }
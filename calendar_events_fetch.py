@@ -1,10 +1,134 @@
+import contextlib
+import contextvars
 import json
 import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
 from datetime import datetime, timezone, timedelta
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
+from shared_cache import SharedCache, cache_key
+import calendar_prefetch
+import metrics
+import tracing
+
+# Local stand-in for the Google Calendar API: a JSON file mapping each user's
+# email to their events in the same format retrive_calendar_events returns
+CALENDAR_EVENTS_FILE = os.environ.get("CALENDAR_EVENTS_FILE")
+# Simulated backend latency for the local file, per call
+CALENDAR_FETCH_LATENCY_MS = float(os.environ.get("CALENDAR_FETCH_LATENCY_MS", "0"))
+
+# Calendar responses are cached for all worker processes. Off by default: a cached
+# calendar can hide a meeting booked elsewhere, and the scheduler would double-book it
+CALENDAR_CACHE_TTL = float(os.environ.get("CALENDAR_CACHE_TTL", "0"))
+calendar_cache = SharedCache("calendar_events", CALENDAR_CACHE_TTL)
+# Entries are keyed by the exact range, so a write can't find the ones it makes
+# stale; it gives the user a new generation instead, which is part of every key
+calendar_generations = SharedCache("calendar_generation", CALENDAR_CACHE_TTL)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+_local_calendars = {}
+
+def _parse_calendar_time(value):
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=IST)
+
+def retrive_local_calendar_events(user, start, end):
+    """Return the user's events overlapping [start, end) from CALENDAR_EVENTS_FILE."""
+    if CALENDAR_FETCH_LATENCY_MS:
+        time.sleep(CALENDAR_FETCH_LATENCY_MS / 1000)
+    mtime = os.path.getmtime(CALENDAR_EVENTS_FILE)
+    cached = _local_calendars.get(CALENDAR_EVENTS_FILE)
+    if cached is None or cached[0] != mtime:
+        with open(CALENDAR_EVENTS_FILE, encoding="utf-8") as f:
+            cached = (mtime, json.load(f))
+        _local_calendars[CALENDAR_EVENTS_FILE] = cached
+    
+    range_start = _parse_calendar_time(start)
+    range_end = _parse_calendar_time(end)
+    return [
+        event for event in cached[1].get(user, [])
+        if _parse_calendar_time(event["StartTime"]) < range_end
+        and _parse_calendar_time(event["EndTime"]) > range_start
+    ]
+
+# Set by shared_calendar_fetches(): {key: Future} for the current batch
+_batch_fetches = contextvars.ContextVar("batch_calendar_fetches", default=None)
+
+@contextlib.contextmanager
+def shared_calendar_fetches():
+    """Share calendar fetches between all requests processed inside this block.
+    
+    Tasks and worker threads started within the block inherit the memo, so
+    batch items asking for the same (user, start, end) wait on one fetch
+    instead of each hitting the calendar backend. The memo is dropped on exit.
+    """
+    token = _batch_fetches.set(({}, threading.Lock()))
+    try:
+        yield
+    finally:
+        _batch_fetches.reset(token)
+
+def invalidate_calendars(users, start, end):
+    """Forget what is cached of these users' calendars after a write on [start, end).
+
+    Every cached range of theirs misses from now on, and the prefetched days
+    the write touches are dropped.
+    """
+    generation = uuid.uuid4().hex
+    for user in users:
+        calendar_generations.set(cache_key(user), generation)
+        calendar_prefetch.invalidate(user, start, end)
+
+@tracing.traced("fetch_calendar_events")
+def fetch_calendar_events(user, start, end):
+    """retrive_calendar_events through the calendar cache shared by all workers.
+    
+    A cache miss is answered from the days calendar_prefetch warmed when it
+    has all of them, and only goes to the backend otherwise.
+    """
+    generation = calendar_generations.get(cache_key(user)) if calendar_cache.enabled else None
+    key = cache_key(user, start, end, generation)
+    fetched = []
+    
+    def retrieve():
+        prefetched = calendar_prefetch.lookup(user, start, end)
+        if prefetched is not None:
+            fetched.append("prefetch")
+            return prefetched
+        fetched.append("backend")
+        with metrics.time_stage("retrive_calendar_events"):
+            return retrive_calendar_events(user, start, end)
+    
+    compute = lambda: calendar_cache.get_or_compute(key, retrieve)
+    try:
+        batch = _batch_fetches.get()
+        if batch is None:
+            return compute()
+        
+        fetches, lock = batch
+        with lock:
+            future = fetches.get(key)
+            owner = future is None
+            if owner:
+                future = fetches[key] = Future()
+        if owner:
+            try:
+                future.set_result(compute())
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+    finally:
+        source = fetched[0] if fetched else "cache"
+        metrics.CALENDAR_CALLS.inc(attendee=user, source=source)
+        tracing.annotate(attendee=user, source=source)
 
 def retrive_calendar_events(user, start, end):
+    if CALENDAR_EVENTS_FILE:
+        return retrive_local_calendar_events(user, start, end)
+    
     events_list = []
     # Resolved path issue
     token_path = os.path.join("Keys", user.split("@")[0] + ".token")
@@ -0,0 +1,466 @@
+"""Write path next to ``retrive_calendar_events``: put the scheduled meeting on every attendee's calendar.
+
+``CalendarWriter.create_event`` inserts the meeting into each attendee's
+primary calendar and either creates all copies or, if any insert fails for
+good, deletes the ones already made (rollback) and raises CalendarWriteError.
+Each copy is a private event on that attendee's calendar: it names the
+others in its description but invites nobody, so everyone ends up with
+exactly one copy and no invitation emails.
+
+Writes are never one blocking call per attendee per request. They queue
+per calendar account, and a worker thread sends each account's queue as one
+batched HTTP request (up to ``batch_size`` writes, after waiting
+``batch_window`` for concurrent requests to join). Every write takes a token
+from one TokenBucket shared by all writer threads. A rate-limit or server
+error pauses that bucket for every thread (Retry-After, or exponential
+backoff with jitter) and the write is retried up to ``max_attempts`` times.
+Event ids are derived from the Request_id, so a retried insert that already
+landed comes back as 409 and counts as created. Google also answers 409 for
+an id whose event an earlier rollback deleted (it stays behind, cancelled);
+the backend reads such an event back and restores it instead.
+
+Backends: Google Calendar (per-user tokens in Keys/, like the read path) or,
+when CALENDAR_EVENTS_FILE is set, that local JSON file. The local file
+backend can inject latency and failures, which is how this module is
+exercised offline (benchmarks/bench_calendar_writes.py). Writes are off
+unless CALENDAR_WRITE_ENABLED=1.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+import metrics
+from structured_logging import get_logger
+
+log = get_logger("calendar_events_write")
+
+CALENDAR_WRITE_ENABLED = os.environ.get("CALENDAR_WRITE_ENABLED", "0") == "1"
+
+# Statuses worth retrying: transport errors (0), rate limits and server errors
+RETRYABLE_STATUSES = {0, 429, 500, 502, 503, 504}
+
+
+class CalendarWriteError(Exception):
+    """Some attendee calendars could not be written; the copies already created were rolled back."""
+
+    def __init__(self, message: str, failed: Dict[str, str], rolled_back: List[str], rollback_failed: List[str]):
+        super().__init__(message)
+        self.failed = failed
+        self.rolled_back = rolled_back
+        self.rollback_failed = rollback_failed
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "status": "rolled_back" if not self.rollback_failed else "partial",
+            "error": str(self),
+            "failed": self.failed,
+            "rolled_back": len(self.rolled_back),
+            "rollback_failed": self.rollback_failed,
+        }
+
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by every thread that writes to the calendar backend.
+
+    ``pause`` is the shared backoff: after a rate limit no thread gets a
+    token until the pause is over.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                delay = self._paused_until - now
+                if delay <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class _Write:
+    __slots__ = ("account", "operation", "event_id", "event", "attempt", "future", "abandoned")
+
+    def __init__(self, account: str, operation: str, event_id: str, event: Dict[str, Any]):
+        self.account = account
+        self.operation = operation
+        self.event_id = event_id
+        self.event = event
+        self.attempt = 0
+        self.future = Future()
+        self.abandoned = False
+
+
+def event_id(request_id: str, account: str, event: Dict[str, Any]) -> str:
+    """Stable event id for one attendee's copy (Google accepts lowercase hex as base32hex)."""
+    return hashlib.sha1(f"{request_id}|{account}|{event['StartTime']}".encode("utf-8")).hexdigest()
+
+
+class CalendarWriter:
+    """Batches, rate limits and retries calendar writes from all request threads."""
+
+    def __init__(self, backend, limiter: TokenBucket, batch_size: int = 50, batch_window: float = 0.02,
+                 max_attempts: int = 5, backoff_base: float = 0.5, backoff_cap: float = 30.0,
+                 timeout: float = 60.0, workers: int = 4, rng: random.Random = None):
+        self.backend = backend
+        self.limiter = limiter
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.stats = Counter()
+        self._rng = rng or random.Random()
+        self._queues: Dict[tuple, deque] = {}
+        self._scheduled = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="calendar-write")
+
+    @classmethod
+    def from_env(cls) -> "CalendarWriter":
+        calendar_file = os.environ.get("CALENDAR_EVENTS_FILE")
+        if calendar_file:
+            backend = LocalCalendarWriteBackend.from_env(calendar_file)
+        else:
+            backend = GoogleCalendarWriteBackend()
+        return cls(
+            backend,
+            TokenBucket(float(os.environ.get("CALENDAR_WRITE_RATE", "10")),
+                        int(os.environ.get("CALENDAR_WRITE_BURST", "20"))),
+            batch_size=int(os.environ.get("CALENDAR_WRITE_BATCH_SIZE", "50")),
+            batch_window=float(os.environ.get("CALENDAR_WRITE_BATCH_WINDOW_MS", "20")) / 1000,
+            max_attempts=int(os.environ.get("CALENDAR_WRITE_MAX_ATTEMPTS", "5")),
+            timeout=float(os.environ.get("CALENDAR_WRITE_TIMEOUT", "60")),
+        )
+
+    def create_event(self, event: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+        """Create ``event`` on the calendar of everyone in ``event["Attendees"]``, all or nothing.
+
+        Returns ``{"status": "created", "events": n}``; raises
+        CalendarWriteError after rolling back when any attendee failed.
+        """
+        accounts = list(dict.fromkeys(event["Attendees"]))
+        inserts = [self._submit(_Write(account, "insert", event_id(request_id, account, event), event))
+                   for account in accounts]
+        failed = self._wait(inserts)
+        if not failed:
+            return {"status": "created", "events": len(inserts)}
+
+        created = [write for write in inserts if write.account not in failed]
+        deletes = [self._submit(_Write(write.account, "delete", write.event_id, event)) for write in created]
+        rollback_failed = self._wait(deletes)
+        self.stats["rollbacks"] += 1
+        log.warning("Calendar write failed for %s of %s attendees, rolled back %s",
+                    len(failed), len(accounts), len(deletes) - len(rollback_failed))
+        raise CalendarWriteError(
+            f"could not create the meeting for {', '.join(sorted(failed))}",
+            failed, [write.account for write in created if write.account not in rollback_failed],
+            sorted(rollback_failed)
+        )
+
+    def _wait(self, writes: List[_Write]) -> Dict[str, str]:
+        """Wait for ``writes`` and return {account: error} for the ones that failed."""
+        wait([write.future for write in writes], timeout=self.timeout)
+        failed = {}
+        for write in writes:
+            if not write.future.done():
+                # Still queued or retrying; if it lands after all, _settle undoes it
+                write.abandoned = True
+                failed[write.account] = f"timed out after {self.timeout:.0f}s"
+            elif write.future.exception() is not None:
+                failed[write.account] = str(write.future.exception())
+        return failed
+
+    def _submit(self, write: _Write) -> _Write:
+        key = (write.account, write.operation)
+        with self._lock:
+            self._queues.setdefault(key, deque()).append(write)
+            if key in self._scheduled:
+                return write
+            self._scheduled.add(key)
+        self._executor.submit(self._flush, key, self.batch_window)
+        return write
+
+    def _flush(self, key: tuple, delay: float):
+        # Give concurrent requests writing to the same calendar a moment to join the batch
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            queue = self._queues[key]
+            batch = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+        try:
+            if batch:
+                self._send(key, batch)
+        finally:
+            with self._lock:
+                more = bool(self._queues[key])
+                if not more:
+                    self._scheduled.discard(key)
+                    del self._queues[key]
+            if more:
+                self._executor.submit(self._flush, key, 0)
+
+    def _send(self, key: tuple, batch: List[_Write]):
+        account, operation = key
+        for _ in batch:
+            self.limiter.acquire()
+        self.stats["batches"] += 1
+        try:
+            with metrics.time_stage("calendar_write_batch"):
+                results = self.backend.execute(account, operation, batch)
+        except Exception as e:
+            results = [{"status": 0, "error": f"{type(e).__name__}: {e}"}] * len(batch)
+        for write, result in zip(batch, results):
+            self._settle(write, result)
+
+    def _settle(self, write: _Write, result: Dict[str, Any]):
+        status = result.get("status", 0)
+        # 409: an earlier attempt already created it (a cancelled leftover is restored by the backend
+        # first); 404/410: already gone
+        ok = status == 200 or (write.operation == "insert" and status == 409) or \
+            (write.operation == "delete" and status in (404, 410))
+        if ok:
+            self.stats[f"{write.operation}_ok"] += 1
+            metrics.CALENDAR_WRITES.inc(operation=write.operation, outcome="ok")
+            if write.abandoned and write.operation == "insert":
+                # The request gave up and rolled back without this copy, remove it again
+                self._submit(_Write(write.account, "delete", write.event_id, write.event))
+            write.future.set_result(write.event_id)
+            return
+
+        write.attempt += 1
+        if status in RETRYABLE_STATUSES and write.attempt < self.max_attempts:
+            delay = result.get("retry_after") or \
+                min(self.backoff_cap, self.backoff_base * 2 ** (write.attempt - 1)) * (0.5 + self._rng.random() / 2)
+            if status == 429:
+                self.stats["rate_limited"] += 1
+            self.stats["retries"] += 1
+            metrics.CALENDAR_WRITES.inc(operation=write.operation, outcome="retried")
+            self.limiter.pause(delay)
+            self._submit(write)
+            return
+
+        self.stats[f"{write.operation}_failed"] += 1
+        metrics.CALENDAR_WRITES.inc(operation=write.operation, outcome="failed")
+        write.future.set_exception(RuntimeError(f"HTTP {status}: {result.get('error', 'calendar write failed')}"))
+
+
+class GoogleCalendarWriteBackend:
+    """Google Calendar API: one batch HTTP request per account, with that user's Keys/<user>.token."""
+
+    def __init__(self, keys_dir: str = "Keys", timezone: str = "Asia/Kolkata"):
+        self.keys_dir = keys_dir
+        self.timezone = timezone
+        # googleapiclient services are not thread-safe, keep one per writer thread and account
+        self._local = threading.local()
+
+    def _service(self, account: str):
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build
+
+        services = self._local.__dict__.setdefault("services", {})
+        if account not in services:
+            token_path = os.path.join(self.keys_dir, account.split("@")[0] + ".token")
+            services[account] = build("calendar", "v3", credentials=Credentials.from_authorized_user_file(token_path))
+        return services[account]
+
+    def _body(self, write: _Write) -> Dict[str, Any]:
+        event = write.event
+        return {
+            "id": write.event_id,
+            "summary": event.get("Summary", "Team Meeting"),
+            # Rule-based times carry no offset, the time zone makes them unambiguous
+            "start": {"dateTime": event["StartTime"], "timeZone": self.timezone},
+            "end": {"dateTime": event["EndTime"], "timeZone": self.timezone},
+            # No "attendees": with it every copy would be an invitation to everyone,
+            # putting N events on each calendar
+            "description": "Attendees: " + ", ".join(event.get("Attendees", [])),
+        }
+
+    @staticmethod
+    def _outcome(exception) -> Dict[str, Any]:
+        if exception is None:
+            return {"status": 200}
+        resp = getattr(exception, "resp", None)
+        status = getattr(resp, "status", 0) if resp is not None else 0
+        # Google reports per-user rate limits as 403 rateLimitExceeded / userRateLimitExceeded
+        if status == 403 and "ratelimitexceeded" in str(exception).replace(" ", "").lower():
+            status = 429
+        retry_after = resp.get("retry-after") if resp is not None else None
+        return {
+            "status": status,
+            "retry_after": float(retry_after) if retry_after and retry_after.isdigit() else None,
+            "error": str(exception),
+        }
+
+    def execute(self, account: str, operation: str, writes: List[_Write]) -> List[Dict[str, Any]]:
+        service = self._service(account)
+        results = [None] * len(writes)
+
+        def callback(request_id, response, exception):
+            results[int(request_id)] = self._outcome(exception)
+
+        batch = service.new_batch_http_request(callback=callback)
+        for index, write in enumerate(writes):
+            if operation == "insert":
+                request = service.events().insert(calendarId="primary", body=self._body(write), sendUpdates="none")
+            else:
+                request = service.events().delete(calendarId="primary", eventId=write.event_id, sendUpdates="none")
+            batch.add(request, request_id=str(index))
+        batch.execute()
+        results = [result or {"status": 0, "error": "no response in batch"} for result in results]
+        if operation == "insert":
+            for index, write in enumerate(writes):
+                if results[index]["status"] == 409:
+                    results[index] = self._read_back(service, write)
+        return results
+
+    def _read_back(self, service, write: _Write) -> Dict[str, Any]:
+        """Outcome of an insert answered 409: the event exists, or was cancelled and is restored now."""
+        events = service.events()
+        try:
+            existing = events.get(calendarId="primary", eventId=write.event_id).execute()
+            if existing.get("status") != "cancelled":
+                return {"status": 409}
+            # Deleted by an earlier rollback; the id can only be reused by updating that event
+            events.update(calendarId="primary", eventId=write.event_id,
+                          body={**self._body(write), "status": "confirmed"}, sendUpdates="none").execute()
+            return {"status": 200}
+        except Exception as e:
+            # e.g. a transient error reading it back: retried like any other insert failure
+            return self._outcome(e)
+
+
+class LocalCalendarWriteBackend:
+    """Stand-in backend that writes into CALENDAR_EVENTS_FILE, so later reads see the meeting.
+
+    The file keeps the read format; the ids of the copies written here live
+    in ``<path>.ids`` (account -> {event id: event}). Inserting the same id
+    twice answers 409 and deleting an unknown one 404, and a rollback only
+    removes a copy this backend wrote, never an attendee's own identical
+    event. Each batch is one locked read-modify-write of both files.
+    ``latency`` (seconds per batch) and a ``failures`` injector (see
+    local_model_server.FailureInjector: error -> 500, rate_limit -> 429,
+    timeout -> the whole batch fails) simulate a remote API.
+    """
+
+    def __init__(self, path: str, latency: float = 0.0, failures=None, retry_after: Optional[float] = None):
+        self.path = path
+        self.latency = latency
+        self.failures = failures
+        self.retry_after = retry_after
+        self.calls = 0
+
+    @classmethod
+    def from_env(cls, path: str) -> "LocalCalendarWriteBackend":
+        failures = None
+        error_rate = float(os.environ.get("CALENDAR_WRITE_ERROR_RATE", "0"))
+        rate_limit_rate = float(os.environ.get("CALENDAR_WRITE_RATE_LIMIT_RATE", "0"))
+        if error_rate or rate_limit_rate:
+            from local_model_server import FailureInjector
+            failures = FailureInjector(error_rate=error_rate, rate_limit_rate=rate_limit_rate,
+                                       rng=random.Random(int(os.environ.get("CALENDAR_WRITE_SEED", "0"))))
+        return cls(path, latency=float(os.environ.get("CALENDAR_WRITE_LATENCY_MS", "0")) / 1000, failures=failures)
+
+    @staticmethod
+    def _stored(write: _Write) -> Dict[str, Any]:
+        event = write.event
+        return {
+            "StartTime": event["StartTime"],
+            "EndTime": event["EndTime"],
+            "NumAttendees": event.get("NumAttendees", len(event.get("Attendees", []))),
+            "Attendees": event.get("Attendees", []),
+            "Summary": event.get("Summary", "Team Meeting"),
+        }
+
+    def execute(self, account: str, operation: str, writes: List[_Write]) -> List[Dict[str, Any]]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        outcomes = [self.failures.draw() if self.failures else None for _ in writes]
+        if "timeout" in outcomes:
+            raise TimeoutError("injected calendar backend timeout")
+
+        with open(self.path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    calendars = json.load(f)
+                ids = {}
+                if os.path.exists(self.path + ".ids"):
+                    with open(self.path + ".ids", encoding="utf-8") as f:
+                        ids = json.load(f)
+                events = calendars.setdefault(account, [])
+                written = ids.setdefault(account, {})
+                results = []
+                for write, outcome in zip(writes, outcomes):
+                    if outcome == "rate_limit":
+                        results.append({"status": 429, "retry_after": self.retry_after, "error": "injected rate limit"})
+                        continue
+                    if outcome is not None:
+                        results.append({"status": 500, "error": f"injected {outcome}"})
+                        continue
+                    if operation == "insert":
+                        if write.event_id in written:
+                            results.append({"status": 409, "error": "duplicate"})
+                        else:
+                            written[write.event_id] = self._stored(write)
+                            events.append(written[write.event_id])
+                            results.append({"status": 200})
+                    elif write.event_id in written:
+                        stored = written.pop(write.event_id)
+                        # Equal events are interchangeable: removing the first match removes ours
+                        if stored in events:
+                            events.remove(stored)
+                        results.append({"status": 200})
+                    else:
+                        results.append({"status": 404, "error": "not found"})
+                events.sort(key=lambda event: event["StartTime"])
+                self._replace(self.path, calendars)
+                self._replace(self.path + ".ids", ids)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return results
+
+    @staticmethod
+    def _replace(path: str, data: Any):
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def calendar_writer() -> CalendarWriter:
+    """The process-wide writer, created from the environment on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = CalendarWriter.from_env()
+        return _writer
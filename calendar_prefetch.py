@@ -0,0 +1,364 @@
+"""Background prefetch of frequent attendees' calendars into a per-day availability cache.
+
+The same few people appear in most requests, and their calendars used to be
+fetched on the critical path every time the requested range changed (the
+calendar cache is keyed by the exact range). Instead:
+
+* ``attendee_tracker`` counts how often each attendee shows up in incoming
+  requests (``record_request``), decayed with a half-life so the hot set
+  follows the traffic;
+* ``Prefetcher`` wakes up every ``PREFETCH_INTERVAL`` seconds, takes the
+  ``PREFETCH_TOP_N`` hottest attendees (decayed request count of at least
+  ``PREFETCH_MIN_SCORE``, 1.5: more than one recent request) and fetches
+  each one's events for the next ``PREFETCH_DAYS`` business days in one
+  backend call, stored per calendar day in the shared availability cache;
+* ``lookup`` answers a calendar fetch from that cache when every day of the
+  requested range is there, so ``get_availability_for_all`` finds warm data.
+
+Background spend is capped at ``PREFETCH_MAX_CALLS_PER_HOUR`` backend calls
+in total, counted in the SQLite file all server.py workers share. An attendee whose days another worker refreshed less than
+half an interval ago is skipped. Prefetched days are served for
+``PREFETCH_TTL`` seconds (default two intervals), or until a meeting is
+written on them (``invalidate``); ``PREFETCH_ENABLED=0`` turns all of it off.
+"""
+import asyncio
+import heapq
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import metrics
+from shared_cache import SHARED_CACHE_PATH, SharedCache, cache_key
+from structured_logging import get_logger
+
+log = get_logger("calendar_prefetch")
+
+PREFETCH_ENABLED = os.environ.get("PREFETCH_ENABLED", "1") == "1"
+PREFETCH_INTERVAL = float(os.environ.get("PREFETCH_INTERVAL", "60"))
+PREFETCH_TTL = float(os.environ.get("PREFETCH_TTL", str(2 * PREFETCH_INTERVAL)))
+
+# Longest request range (in calendar days) assembled from prefetched days
+MAX_RANGE_DAYS = 31
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+availability_cache = SharedCache("availability_days", PREFETCH_TTL if PREFETCH_ENABLED else 0)
+# When each day was last invalidated, so a fetch that started before then is not stored
+invalidated_days = SharedCache("availability_invalidated", PREFETCH_TTL if PREFETCH_ENABLED else 0)
+
+
+def _parse_time(value: str) -> datetime:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=IST)
+
+
+def _day_key(user: str, day: date) -> str:
+    return cache_key(user, day.isoformat())
+
+
+def _days(start: datetime, end: datetime) -> List[date]:
+    """Calendar days (IST) touched by [start, end)."""
+    first = start.astimezone(IST).date()
+    last = (end - timedelta(microseconds=1)).astimezone(IST).date()
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+class AttendeeTracker:
+    """How often each attendee appears in requests, decayed with a half-life of ``half_life`` seconds.
+
+    Scores are kept relative to a reference time, so recording is O(1) and
+    ranking needs no decay pass: an appearance at time t adds
+    2 ** ((t - reference) / half_life). Only the ``max_attendees``
+    highest-scoring attendees are kept.
+    """
+
+    def __init__(self, half_life: float = 3600.0, max_attendees: int = 1000, clock: Callable[[], float] = time.time):
+        self.half_life = half_life
+        self.max_attendees = max_attendees
+        self.clock = clock
+        self._scores: Dict[str, float] = {}
+        self._reference = clock()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def record(self, emails: Iterable[str]):
+        now = self.clock()
+        with self._lock:
+            exponent = (now - self._reference) / self.half_life
+            if exponent > 500:
+                # Rebase before the weights overflow
+                scale = 2.0 ** -exponent
+                self._scores = {email: score * scale for email, score in self._scores.items()}
+                self._reference, exponent = now, 0.0
+            weight = 2.0 ** exponent
+            for email in emails:
+                if email:
+                    self._scores[email] = self._scores.get(email, 0.0) + weight
+            if len(self._scores) > self.max_attendees * 1.1:
+                self._scores = dict(heapq.nlargest(self.max_attendees, self._scores.items(), key=lambda item: item[1]))
+
+    def hottest(self, n: int, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """The ``n`` most frequent attendees with their decayed request counts, at least ``min_score``."""
+        with self._lock:
+            scale = 2.0 ** (-(self.clock() - self._reference) / self.half_life)
+            top = heapq.nlargest(n, self._scores.items(), key=lambda item: item[1])
+        return [(email, score * scale) for email, score in top if score * scale >= min_score]
+
+
+attendee_tracker = AttendeeTracker(
+    half_life=float(os.environ.get("PREFETCH_HALF_LIFE", "3600")),
+    max_attendees=int(os.environ.get("PREFETCH_MAX_TRACKED", "1000")),
+)
+
+
+def record_request(data: Dict[str, Any]):
+    """Count the organizer and attendees of an incoming request."""
+    if PREFETCH_ENABLED:
+        attendee_tracker.record(
+            [data.get("From")] + [attendee.get("email") for attendee in data.get("Attendees", [])
+                                  if isinstance(attendee, dict)]
+        )
+
+
+def lookup(user: str, start: str, end: str) -> Optional[List[Dict[str, Any]]]:
+    """The user's events overlapping [start, end) from prefetched days, or None unless every day is cached."""
+    if not PREFETCH_ENABLED:
+        return None
+    try:
+        range_start, range_end = _parse_time(start), _parse_time(end)
+    except (TypeError, ValueError):
+        return None
+    days = _days(range_start, range_end)
+    if not days or len(days) > MAX_RANGE_DAYS:
+        metrics.PREFETCH_LOOKUPS.inc(outcome="miss")
+        return None
+
+    entries = []
+    for day in days:
+        entry = availability_cache.get(_day_key(user, day))
+        if entry is None:
+            metrics.PREFETCH_LOOKUPS.inc(outcome="miss")
+            return None
+        entries.append(entry)
+    metrics.PREFETCH_LOOKUPS.inc(outcome="hit")
+
+    events = []
+    for day, entry in zip(days, entries):
+        for event in entry["events"]:
+            event_start = _parse_time(event["StartTime"])
+            # Events spanning midnight are stored under every day they touch; take them from the first one
+            if max(event_start.astimezone(IST).date(), days[0]) != day:
+                continue
+            if event_start < range_end and _parse_time(event["EndTime"]) > range_start:
+                events.append(event)
+    return events
+
+
+def invalidate(user: str, start: str, end: str):
+    """Drop the user's prefetched days touched by [start, end), e.g. after a meeting was written there.
+
+    The invalidation time is recorded before the entry is deleted, so a
+    prefetch already in flight for the day (``store_days``) sees it and
+    does not put its older result back.
+    """
+    if not availability_cache.enabled:
+        return
+    now = time.time()
+    for day in _days(_parse_time(start), _parse_time(end)):
+        key = _day_key(user, day)
+        invalidated_days.set(key, now)
+        availability_cache.delete(key)
+
+
+def _invalidated_since(key: str, fetched_at: float) -> bool:
+    invalidated_at = invalidated_days.get(key)
+    return invalidated_at is not None and invalidated_at >= fetched_at
+
+
+def store_days(user: str, days: List[date], events: List[Dict[str, Any]], fetched_at: float = None):
+    """Store ``events`` (everything the user has on ``days``) as one availability entry per day.
+
+    Days invalidated at or after ``fetched_at`` are skipped: ``events`` may
+    predate the write that invalidated them. The check is repeated after the
+    store and the entry dropped again, covering an ``invalidate`` that lands
+    in between.
+    """
+    fetched_at = fetched_at or time.time()
+    by_day = {day: [] for day in days}
+    for event in events:
+        try:
+            event_days = _days(_parse_time(event["StartTime"]), _parse_time(event["EndTime"]))
+        except (KeyError, TypeError, ValueError):
+            # Without a usable time the days are incomplete; let requests fetch them
+            return
+        for day in event_days:
+            if day in by_day:
+                by_day[day].append(event)
+    for day, day_events in by_day.items():
+        key = _day_key(user, day)
+        if _invalidated_since(key, fetched_at):
+            continue
+        availability_cache.set(key, {"fetched_at": fetched_at, "events": day_events})
+        if _invalidated_since(key, fetched_at):
+            availability_cache.delete(key)
+
+
+class SharedCallBudget:
+    """At most ``max_calls`` calls per rolling ``window`` seconds across all worker processes.
+
+    Each granted call is a row in the shared SQLite file; ``take`` counts
+    and inserts in one write transaction, so concurrent workers cannot
+    overshoot the budget together.
+    """
+
+    def __init__(self, name: str, max_calls: int, window: float = 3600.0, path: str = None,
+                 clock: Callable[[], float] = time.time):
+        self.name = name
+        self.max_calls = max_calls
+        self.window = window
+        self.path = path or SHARED_CACHE_PATH
+        self.clock = clock
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS call_budget (name TEXT NOT NULL, called_at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS call_budget_name ON call_budget (name, called_at)")
+            self._local.conn = conn
+        return conn
+
+    def take(self) -> bool:
+        """Spend one call; False when the budget for the current window is used up."""
+        conn = self._connection()
+        now = self.clock()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM call_budget WHERE name = ? AND called_at <= ?", (self.name, now - self.window))
+            (used,) = conn.execute("SELECT COUNT(*) FROM call_budget WHERE name = ?", (self.name,)).fetchone()
+            granted = used < self.max_calls
+            if granted:
+                conn.execute("INSERT INTO call_budget (name, called_at) VALUES (?, ?)", (self.name, now))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return granted
+
+    def clear(self):
+        self._connection().execute("DELETE FROM call_budget WHERE name = ?", (self.name,))
+
+
+class Prefetcher:
+    """Refresh the hottest attendees' upcoming business days into the availability cache.
+
+    ``refresh`` runs one round; ``start`` runs a round every ``interval``
+    seconds on the event loop (the fetches themselves run in a thread).
+    """
+
+    def __init__(self, tracker: AttendeeTracker = None, fetch: Callable[[str, str, str], List[Dict[str, Any]]] = None,
+                 interval: float = 60.0, top_n: int = 20, days: int = 5, min_score: float = 1.5,
+                 max_calls_per_hour: int = 600, clock: Callable[[], float] = time.time):
+        if fetch is None:
+            from calendar_events_fetch import retrive_calendar_events
+            fetch = retrive_calendar_events
+        self.tracker = tracker or attendee_tracker
+        self.fetch = fetch
+        self.interval = interval
+        self.top_n = top_n
+        self.days = days
+        self.min_score = min_score
+        self.max_calls_per_hour = max_calls_per_hour
+        self.clock = clock
+        self.stats = Counter()
+        self.budget = SharedCallBudget("calendar_prefetch", max_calls_per_hour, clock=clock)
+        self._task = None
+
+    @classmethod
+    def from_env(cls) -> "Prefetcher":
+        return cls(
+            interval=PREFETCH_INTERVAL,
+            top_n=int(os.environ.get("PREFETCH_TOP_N", "20")),
+            days=int(os.environ.get("PREFETCH_DAYS", "5")),
+            min_score=float(os.environ.get("PREFETCH_MIN_SCORE", "1.5")),
+            max_calls_per_hour=int(os.environ.get("PREFETCH_MAX_CALLS_PER_HOUR", "600")),
+        )
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                log.warning("Calendar prefetch round failed: %s", e)
+
+    def horizon(self) -> List[date]:
+        """Every calendar day from today (IST) through the ``days``-th upcoming business day."""
+        day = datetime.fromtimestamp(self.clock(), IST).date()
+        horizon, business_days = [], 0
+        while business_days < self.days:
+            horizon.append(day)
+            business_days += day.weekday() < 5
+            day += timedelta(days=1)
+        return horizon
+
+    def _fresh(self, user: str, days: List[date]) -> bool:
+        """True when every day was refreshed within the last half interval, e.g. by another worker."""
+        cutoff = self.clock() - self.interval / 2
+        for day in days:
+            entry = availability_cache.get(_day_key(user, day))
+            if entry is None or entry["fetched_at"] < cutoff:
+                return False
+        return True
+
+    def refresh(self) -> Counter:
+        """One prefetch round; returns this round's counts by outcome."""
+        if not availability_cache.enabled:
+            return Counter()
+        days = self.horizon()
+        start = datetime.combine(days[0], datetime.min.time(), IST).isoformat()
+        end = datetime.combine(days[-1] + timedelta(days=1), datetime.min.time(), IST).isoformat()
+        outcomes = Counter()
+        for user, _ in self.tracker.hottest(self.top_n, self.min_score):
+            if self._fresh(user, days):
+                outcome = "fresh"
+            elif not self.budget.take():
+                outcome = "over_budget"
+            else:
+                fetched_at = self.clock()
+                try:
+                    with metrics.STAGE_SECONDS.time(stage="calendar_prefetch"):
+                        events = self.fetch(user, start, end)
+                    store_days(user, days, events, fetched_at)
+                    outcome = "ok"
+                except Exception as e:
+                    log.warning("Prefetch of %s failed: %s", user, e)
+                    outcome = "error"
+            outcomes[outcome] += 1
+            metrics.PREFETCH_FETCHES.inc(outcome=outcome)
+        self.stats.update(outcomes)
+        if outcomes["over_budget"]:
+            log.info("Calendar prefetch over its budget of %s calls/hour, skipped %s attendees",
+                     self.max_calls_per_hour, outcomes["over_budget"])
+        return outcomes
+
+
+metrics.on_collect(lambda: metrics.PREFETCH_TRACKED.set(len(attendee_tracker)))
@@ -0,0 +1,188 @@
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from shared_cache import SHARED_CACHE_PATH
+from structured_logging import get_logger
+
+log = get_logger("idempotency")
+
+
+class _OwnerCancelled(Exception):
+    """The copy of a Request_id that duplicates were waiting on was cancelled."""
+
+
+class IdempotencyCache:
+    """Run each Request_id once and replay its response to retries.
+
+    Completed responses are kept for ``ttl`` seconds, at most ``max_entries``
+    of them (oldest dropped first, in-flight claims are never evicted), in
+    the SQLite file shared by all server.py workers. A duplicate that arrives
+    while the first copy is still running waits for it: within a worker on
+    the same future, across workers by polling the ``pending`` claim row
+    until it turns ``done``. The owner renews its claim every third of
+    ``in_flight_timeout`` for as long as it computes, so only a claim that
+    stopped being renewed (e.g. a killed worker) is taken over. If the owner
+    is cancelled, duplicates waiting on it start over and one of them claims
+    the request. All SQLite access runs in a worker thread, off the event
+    loop. A ``ttl`` of 0 disables the cache.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10000, path: str = None,
+                 in_flight_timeout: float = 300.0):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path or SHARED_CACHE_PATH
+        self.in_flight_timeout = in_flight_timeout
+        self.replayed = 0
+        self.joined = 0
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> "IdempotencyCache":
+        return cls(
+            ttl=float(os.environ.get("IDEMPOTENCY_TTL", "3600")),
+            max_entries=int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "10000")),
+            in_flight_timeout=float(os.environ.get("IDEMPOTENCY_IN_FLIGHT_TIMEOUT", "300")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency ("
+                " request_id TEXT PRIMARY KEY, state TEXT NOT NULL, response TEXT,"
+                " created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idempotency_created ON idempotency (created_at)")
+            self._local.conn = conn
+        return conn
+
+    def _lookup(self, request_id: str):
+        return self._connection().execute(
+            "SELECT state, response FROM idempotency WHERE request_id = ? AND expires_at > ?",
+            (request_id, time.time())
+        ).fetchone()
+
+    def _claim(self, request_id: str) -> bool:
+        """Mark request_id as in flight; False if another live claim or response exists."""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("DELETE FROM idempotency WHERE request_id = ? AND expires_at <= ?", (request_id, now))
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO idempotency (request_id, state, response, created_at, expires_at)"
+            " VALUES (?, 'pending', NULL, ?, ?)",
+            (request_id, now, now + self.in_flight_timeout)
+        )
+        return cursor.rowcount == 1
+
+    def _complete(self, request_id: str, response: Dict[str, Any]):
+        conn = self._connection()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO idempotency (request_id, state, response, created_at, expires_at)"
+            " VALUES (?, 'done', ?, ?, ?)",
+            (request_id, json.dumps(response), now, now + self.ttl)
+        )
+        conn.execute(
+            "DELETE FROM idempotency WHERE request_id IN ("
+            " SELECT request_id FROM idempotency WHERE state = 'done'"
+            " ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def _renew(self, request_id: str):
+        now = time.time()
+        self._connection().execute(
+            "UPDATE idempotency SET expires_at = ? WHERE request_id = ? AND state = 'pending'",
+            (now + self.in_flight_timeout, request_id)
+        )
+
+    async def _heartbeat(self, request_id: str):
+        while True:
+            await asyncio.sleep(self.in_flight_timeout / 3)
+            await asyncio.to_thread(self._renew, request_id)
+
+    def _release(self, request_id: str):
+        self._connection().execute(
+            "DELETE FROM idempotency WHERE request_id = ? AND state = 'pending'", (request_id,)
+        )
+
+    async def run(self, request_id: str, compute: Callable[[], Awaitable[Dict[str, Any]]],
+                  cacheable: Callable[[Dict[str, Any]], bool] = lambda response: True) -> Dict[str, Any]:
+        """Return the stored response for request_id, or await compute() exactly once.
+
+        Responses for which ``cacheable`` is False (e.g. errors) are handed to
+        the waiting duplicates but not stored, so a later retry runs again.
+        """
+        if not self.enabled or not request_id:
+            return await compute()
+
+        future = self._in_flight.get(request_id)
+        if future is not None:
+            self.joined += 1
+            log.info("Request_id %s already in flight, waiting for it", request_id)
+            try:
+                return copy.deepcopy(await asyncio.shield(future))
+            except _OwnerCancelled:
+                return await self.run(request_id, compute, cacheable)
+
+        # Registered before the first await, so duplicates in this worker join instead of polling
+        future = self._in_flight[request_id] = asyncio.get_running_loop().create_future()
+        heartbeat = None
+        try:
+            delay = 0.05
+            while True:
+                row = await asyncio.to_thread(self._lookup, request_id)
+                if row is not None and row[0] == "done":
+                    self.replayed += 1
+                    log.info("Request_id %s already processed, returning stored response", request_id)
+                    response = json.loads(row[1])
+                    future.set_result(response)
+                    return response
+                if await asyncio.to_thread(self._claim, request_id):
+                    break
+                # Another worker process is computing it
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.5)
+
+            heartbeat = asyncio.create_task(self._heartbeat(request_id))
+            try:
+                response = await compute()
+            except BaseException:
+                await asyncio.to_thread(self._release, request_id)
+                raise
+            finally:
+                heartbeat.cancel()
+
+            if cacheable(response):
+                await asyncio.to_thread(self._complete, request_id, response)
+            else:
+                await asyncio.to_thread(self._release, request_id)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            if not future.done():
+                # Duplicates must not see the owner's cancellation as their own: they start over
+                future.set_exception(_OwnerCancelled() if isinstance(e, asyncio.CancelledError) else e)
+                # Mark it retrieved, nobody may be waiting on it
+                future.exception()
+            raise
+        finally:
+            self._in_flight.pop(request_id, None)
+
+    def clear(self):
+        self._connection().execute("DELETE FROM idempotency")
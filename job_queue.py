@@ -0,0 +1,331 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from structured_logging import get_logger
+
+log = get_logger("job_queue")
+
+# Survives restarts of every worker process; not a cache, keep it out of SHARED_CACHE_PATH
+JOB_QUEUE_PATH = os.environ.get(
+    "JOB_QUEUE_PATH",
+    os.path.join(tempfile.gettempdir(), "ai_meeting_scheduler_jobs.sqlite3")
+)
+
+
+# Hosts client-supplied callback URLs may point at (comma-separated); the
+# host of JOB_WEBHOOK_URL is always allowed
+JOB_WEBHOOK_URL = os.environ.get("JOB_WEBHOOK_URL") or None
+JOB_WEBHOOK_ALLOWED_HOSTS = {
+    host.strip().lower() for host in os.environ.get("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()
+}
+if JOB_WEBHOOK_URL:
+    JOB_WEBHOOK_ALLOWED_HOSTS.add((urllib.parse.urlsplit(JOB_WEBHOOK_URL).hostname or "").lower())
+
+
+def check_callback_url(url: str) -> str:
+    """Return url if it is an http(s) URL on an allowed host, raise ValueError otherwise."""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an http(s) URL")
+    if parts.hostname.lower() not in JOB_WEBHOOK_ALLOWED_HOSTS:
+        raise ValueError(f"callback_url host {parts.hostname} is not in JOB_WEBHOOK_ALLOWED_HOSTS")
+    return url
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Fail on redirects instead of following them to a host that was never checked."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_webhook_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def post_webhook(url: str, payload: Dict[str, Any], timeout: float = 10.0) -> int:
+    """POST a JSON payload to an allowed callback URL and return the HTTP status."""
+    check_callback_url(url)
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    with _webhook_opener.open(request, timeout=timeout) as response:
+        return response.status
+
+
+class JobQueue:
+    """Persistent queue of scheduling jobs in a local SQLite file.
+
+    A job moves queued -> running -> done/failed. Workers claim a job by
+    taking a lease on it and keep renewing the lease while they work; a job
+    whose lease runs out (its worker was killed or restarted) is claimed
+    again, up to ``max_attempts`` runs. A job with a callback URL stays
+    leased after it finishes until its webhook has been delivered, so a
+    restart also retries undelivered webhooks.
+    """
+
+    def __init__(self, path: str = None, max_attempts: int = 3, retention: float = 7 * 24 * 3600):
+        self.path = path or JOB_QUEUE_PATH
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY, request TEXT NOT NULL, callback_url TEXT,"
+                " status TEXT NOT NULL, response TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0,"
+                " lease_until REAL NOT NULL DEFAULT 0, worker TEXT,"
+                " webhook_state TEXT NOT NULL, webhook_attempts INTEGER NOT NULL DEFAULT 0, webhook_error TEXT,"
+                " created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_claimable ON jobs (lease_until, created_at)")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, request: Dict[str, Any], callback_url: Optional[str] = None) -> str:
+        job_id = uuid.uuid4().hex
+        self._connection().execute(
+            "INSERT INTO jobs (job_id, request, callback_url, status, webhook_state, created_at)"
+            " VALUES (?, ?, ?, 'queued', ?, ?)",
+            (job_id, json.dumps(request), callback_url, "pending" if callback_url else "none", time.time())
+        )
+        return job_id
+
+    def claim(self, worker: str, lease: float) -> Optional[Dict[str, Any]]:
+        """Lease the oldest job that needs running or webhook delivery, if any."""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE lease_until <= ?"
+                " AND (status IN ('queued', 'running') OR webhook_state = 'pending')"
+                " ORDER BY created_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            job = dict(row)
+            if job["status"] in ("queued", "running"):
+                job["attempts"] += 1
+                job["status"] = "running"
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, lease_until = ?, worker = ?,"
+                " started_at = COALESCE(started_at, ?) WHERE job_id = ?",
+                (job["status"], job["attempts"], now + lease, worker, now, job["job_id"])
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        job["request"] = json.loads(job["request"])
+        return job
+
+    def renew(self, job_id: str, worker: str, lease: float):
+        self._connection().execute(
+            "UPDATE jobs SET lease_until = ? WHERE job_id = ? AND worker = ?",
+            (time.time() + lease, job_id, worker)
+        )
+
+    def finish(self, job_id: str, status: str, response: Optional[Dict[str, Any]] = None, error: str = None):
+        """Record the outcome. The lease is kept while a webhook is still pending."""
+        self._connection().execute(
+            "UPDATE jobs SET status = ?, response = ?, error = ?, finished_at = ?,"
+            " lease_until = CASE WHEN webhook_state = 'pending' THEN lease_until ELSE 0 END"
+            " WHERE job_id = ?",
+            (status, json.dumps(response) if response is not None else None, error, time.time(), job_id)
+        )
+
+    def release(self, job_id: str):
+        """Hand a job back to the queue without counting the interrupted attempt (e.g. on shutdown)."""
+        self._connection().execute(
+            "UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), lease_until = 0"
+            " WHERE job_id = ? AND status = 'running'",
+            (job_id,)
+        )
+        self._connection().execute(
+            "UPDATE jobs SET lease_until = 0 WHERE job_id = ? AND webhook_state = 'pending'", (job_id,)
+        )
+
+    def webhook_result(self, job_id: str, delivered: bool, attempts: int, error: str = None):
+        self._connection().execute(
+            "UPDATE jobs SET webhook_state = ?, webhook_attempts = webhook_attempts + ?, webhook_error = ?,"
+            " lease_until = 0 WHERE job_id = ?",
+            ("delivered" if delivered else "failed", attempts, error, job_id)
+        )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Public view of a job, as served by GET /jobs/<job_id> and posted to webhooks."""
+        row = self._connection().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        request = json.loads(row["request"])
+        job = {
+            "job_id": row["job_id"],
+            "Request_id": request.get("Request_id", "unknown") if isinstance(request, dict) else "unknown",
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+        if row["response"] is not None:
+            job["response"] = json.loads(row["response"])
+        if row["error"]:
+            job["error"] = row["error"]
+        if row["callback_url"]:
+            job["webhook"] = {
+                "url": row["callback_url"],
+                "state": row["webhook_state"],
+                "attempts": row["webhook_attempts"],
+                "error": row["webhook_error"],
+            }
+        return job
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def prune(self):
+        """Drop finished jobs older than the retention period."""
+        self._connection().execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND webhook_state != 'pending'"
+            " AND finished_at < ?",
+            (time.time() - self.retention,)
+        )
+
+
+class JobRunner:
+    """Pool of async workers that run queued jobs and deliver their webhooks.
+
+    ``process`` is awaited with the job's request and returns the response
+    dict. Every server process runs its own pool against the shared queue
+    file; the job lease keeps two workers off the same job. Queue calls
+    (SQLite, with a busy timeout) run in a worker thread, off the event loop.
+    """
+
+    def __init__(self, queue: JobQueue, process: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                 workers: int = 4, lease: float = 60.0, poll_interval: float = 0.5,
+                 webhook_attempts: int = 3, webhook_timeout: float = 10.0):
+        self.queue = queue
+        self.process = process
+        self.num_workers = workers
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.webhook_attempts = webhook_attempts
+        self.webhook_timeout = webhook_timeout
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._tasks = []
+        self._wakeup = None
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.num_workers)]
+        self._tasks.append(asyncio.create_task(asyncio.to_thread(self.queue.prune)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, request: Dict[str, Any], callback_url: Optional[str] = None) -> str:
+        job_id = await asyncio.to_thread(self.queue.submit, request, callback_url)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            await asyncio.to_thread(self.queue.renew, job_id, self.worker_id, self.lease)
+
+    async def _work(self):
+        while True:
+            job = await asyncio.to_thread(self.queue.claim, self.worker_id, self.lease)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heartbeat = asyncio.create_task(self._heartbeat(job["job_id"]))
+            try:
+                if job["status"] == "running":
+                    await self._run(job)
+                if job["webhook_state"] == "pending":
+                    await self._deliver(job["job_id"], job["callback_url"])
+            except asyncio.CancelledError:
+                await asyncio.to_thread(self.queue.release, job["job_id"])
+                raise
+            finally:
+                heartbeat.cancel()
+
+    async def _run(self, job: Dict[str, Any]):
+        job_id = job["job_id"]
+        if job["attempts"] > self.queue.max_attempts:
+            log.error("Job %s gave up after %s attempts", job_id, self.queue.max_attempts)
+            await asyncio.to_thread(self.queue.finish, job_id, "failed",
+                                    error=f"Gave up after {self.queue.max_attempts} attempts")
+            return
+        log.info("Running job %s (attempt %s)", job_id, job["attempts"])
+        try:
+            response = await self.process(job["request"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.error("Job %s failed: %s", job_id, e)
+            await asyncio.to_thread(self.queue.finish, job_id, "failed", error=str(e))
+            return
+        if response.get("Status") == "error":
+            await asyncio.to_thread(self.queue.finish, job_id, "failed", response, response.get("Error"))
+        else:
+            await asyncio.to_thread(self.queue.finish, job_id, "done", response)
+
+    async def _deliver(self, job_id: str, url: str):
+        error = None
+        for attempt in range(1, self.webhook_attempts + 1):
+            try:
+                payload = await asyncio.to_thread(self.queue.get, job_id)
+                status = await asyncio.to_thread(post_webhook, url, payload, self.webhook_timeout)
+                log.info("Job %s webhook delivered to %s (%s)", job_id, url, status)
+                await asyncio.to_thread(self.queue.webhook_result, job_id, True, attempt)
+                return
+            except Exception as e:
+                error = str(e)
+                log.warning("Job %s webhook attempt %s to %s failed: %s", job_id, attempt, url, error)
+                if attempt < self.webhook_attempts:
+                    await asyncio.sleep(2 ** (attempt - 1))
+        await asyncio.to_thread(self.queue.webhook_result, job_id, False, self.webhook_attempts, error)
+
+    @classmethod
+    def from_env(cls, process: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]) -> "JobRunner":
+        queue = JobQueue(max_attempts=int(os.environ.get("JOB_MAX_ATTEMPTS", "3")))
+        return cls(
+            queue,
+            process,
+            workers=int(os.environ.get("JOB_WORKERS", "4")),
+            lease=float(os.environ.get("JOB_LEASE_SECONDS", "60")),
+            webhook_attempts=int(os.environ.get("JOB_WEBHOOK_ATTEMPTS", "3")),
+        )
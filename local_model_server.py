@@ -0,0 +1,538 @@
+"""Local OpenAI-compatible stand-in for the Qwen3-30B-A3B server.
+
+Speaks enough of the chat-completions protocol (plain, streaming and tool
+calls) for ``ai_scheduling_agent`` to run offline, so the pipeline can be
+load tested in CI or on a laptop without the MI300 box. Responses are
+deterministic: scripted replies from a replay file win, otherwise built-in
+rule-based responders answer the date range and optimal time agents.
+
+Every response carries ``X-Model-Time-Ms`` with the simulated model time and
+``GET /stats`` reports the cumulative totals, so load tests can subtract the
+model's share and see our own overhead.
+
+    python local_model_server.py --port 8000 --latency lognormal:5.3,0.4 --token-ms 15
+    BASE_URL=http://localhost:8000/v1 python benchmarks/...
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+
+MODEL_NAME = "Qwen3-30B-A3B"
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+TIME_MENTIONS = [
+    (("2 pm", "2:00 pm", "14:00"), (14, 0)),
+    (("10 am", "10:00 am", "10:00 a.m"), (10, 0)),
+    (("3 pm", "15:00"), (15, 0)),
+    (("11 am", "11:00 am"), (11, 0)),
+    (("9 am", "9:00 am"), (9, 0)),
+    (("4 pm", "4:00 pm", "16:00"), (16, 0)),
+    (("morning",), (10, 0)),
+    (("afternoon",), (14, 0)),
+]
+THINK_BLOCK = "<think>\nWorking out the dates from the reference timestamp and the email.\n</think>\n\n"
+
+
+class LatencyModel:
+    """Sample simulated model latency in milliseconds.
+
+    Specs: ``fixed:200``, ``uniform:100,300``, ``normal:200,50``,
+    ``lognormal:5.3,0.4`` (mu, sigma of the underlying normal) or ``exp:200``.
+    """
+
+    def __init__(self, spec: str = "fixed:0", rng: random.Random = None):
+        self.spec = spec
+        self.rng = rng or random.Random(0)
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p] or [0.0]
+        if kind not in ("fixed", "uniform", "normal", "lognormal", "exp"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            value = p[0]
+        elif self.kind == "uniform":
+            value = self.rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            value = self.rng.gauss(p[0], p[1])
+        elif self.kind == "lognormal":
+            value = self.rng.lognormvariate(p[0], p[1])
+        else:
+            value = self.rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+        return max(0.0, value)
+
+
+class FailureInjector:
+    """Decide per request whether to fail, rate limit, hang or drop the stream."""
+
+    def __init__(self, error_rate=0.0, rate_limit_rate=0.0, timeout_rate=0.0,
+                 drop_stream_rate=0.0, hang_seconds=60.0, rng: random.Random = None):
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.timeout_rate = timeout_rate
+        self.drop_stream_rate = drop_stream_rate
+        self.hang_seconds = hang_seconds
+        self.rng = rng or random.Random(0)
+
+    def draw(self) -> Optional[str]:
+        roll = self.rng.random()
+        for kind, rate in (("error", self.error_rate), ("rate_limit", self.rate_limit_rate),
+                           ("timeout", self.timeout_rate), ("drop_stream", self.drop_stream_rate)):
+            if roll < rate:
+                return kind
+            roll -= rate
+        return None
+
+
+class ReplayScript:
+    """Scripted responses loaded from a JSONL file.
+
+    Each line is either ``{"match": "...", "content": "..."}`` or
+    ``{"match": "...", "tool_calls": [{"name": "...", "arguments": {...}}]}``.
+    The first entry whose ``match`` regex is found in the conversation is
+    used; entries without ``match`` are served in order once the matching
+    ones are exhausted. Recorded chat.completion objects (``{"response":
+    {...}}``) are replayed as their first choice's message.
+    """
+
+    def __init__(self, path: str = None):
+        self.entries: List[Dict[str, Any]] = []
+        self._sequence_index = 0
+        self._lock = threading.Lock()
+        if path:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self.entries.append(self._normalise(json.loads(line)))
+
+    @staticmethod
+    def _normalise(entry: Dict[str, Any]) -> Dict[str, Any]:
+        if "response" in entry:
+            message = entry["response"]["choices"][0]["message"]
+            entry = dict(entry, content=message.get("content"))
+            if message.get("tool_calls"):
+                entry["tool_calls"] = [
+                    {"name": call["function"]["name"], "arguments": json.loads(call["function"]["arguments"])}
+                    for call in message["tool_calls"]
+                ]
+        return entry
+
+    def lookup(self, conversation: str) -> Optional[Dict[str, Any]]:
+        for entry in self.entries:
+            if entry.get("match") and re.search(entry["match"], conversation):
+                return entry
+        sequence = [entry for entry in self.entries if not entry.get("match")]
+        if not sequence:
+            return None
+        with self._lock:
+            entry = sequence[self._sequence_index % len(sequence)]
+            self._sequence_index += 1
+        return entry
+
+
+def _parse_reference_datetime(value: str) -> datetime:
+    value = (value or "").replace("+05:30", "").replace("Z", "")
+    try:
+        date_part, _, time_part = value.partition("T")
+        parts = date_part.split("-")
+        if len(parts) == 3 and len(parts[0]) == 2:
+            value = f"{parts[2]}-{parts[1]}-{parts[0]}T{time_part or '00:00:00'}"
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime(2025, 7, 21, 12, 0, 0)
+
+
+def _next_business_day(day: datetime) -> datetime:
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+def _target_day(email_lower: str, reference: datetime) -> datetime:
+    for index, name in enumerate(WEEKDAYS):
+        if name in email_lower:
+            days_ahead = index - reference.weekday()
+            if days_ahead <= 0:
+                days_ahead += 7
+            return _next_business_day(reference + timedelta(days=days_ahead))
+    if "tomorrow" in email_lower:
+        return _next_business_day(reference + timedelta(days=1))
+    if "today" in email_lower:
+        return _next_business_day(reference)
+    return _next_business_day(reference + timedelta(days=1))
+
+
+def _duration(email_lower: str) -> int:
+    match = re.search(r"(\d+)\s*(?:-\s*)?min", email_lower)
+    if match:
+        return int(match.group(1))
+    if "1 hour" in email_lower or "one hour" in email_lower:
+        return 60
+    if "half hour" in email_lower:
+        return 30
+    return 30
+
+
+def respond_date_range(system_prompt: str, user_prompt: str) -> str:
+    """Deterministic answer for the date range agent."""
+    try:
+        payload = json.loads(user_prompt)
+    except (json.JSONDecodeError, TypeError):
+        payload = {"EmailContent": user_prompt, "Datetime": ""}
+    email_lower = payload.get("EmailContent", "").lower()
+    day = _target_day(email_lower, _parse_reference_datetime(payload.get("Datetime", "")))
+    return json.dumps({
+        "Start": day.strftime("%Y-%m-%dT00:00:00+05:30"),
+        "End": day.strftime("%Y-%m-%dT23:59:59+05:30"),
+        "Duration_mins": str(_duration(email_lower)),
+    }, indent=2)
+
+
+def respond_optimal_time(system_prompt: str, user_prompt: str) -> str:
+    """Deterministic answer for the optimal time agent."""
+    email_match = re.search(r"Email Content:\s*(.*)", user_prompt)
+    range_match = re.search(r"Date Range:\s*(\S+)\s+to\s+(\S+)", user_prompt)
+    duration_match = re.search(r"Duration:\s*(\d+)", user_prompt)
+    email_lower = (email_match.group(1) if email_match else user_prompt).lower()
+    duration = int(duration_match.group(1)) if duration_match else _duration(email_lower)
+
+    if range_match and range_match.group(1) != "None":
+        day = _next_business_day(_parse_reference_datetime(range_match.group(1)))
+    else:
+        day = _target_day(email_lower, datetime(2025, 7, 21, 12, 0, 0))
+
+    hour, minute = 10, 30
+    for mentions, (mention_hour, mention_minute) in TIME_MENTIONS:
+        if any(mention in email_lower for mention in mentions):
+            hour, minute = mention_hour, mention_minute
+            break
+
+    start = day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    end = start + timedelta(minutes=duration)
+    return json.dumps({
+        "EventStart": start.strftime("%Y-%m-%dT%H:%M:%S+05:30"),
+        "EventEnd": end.strftime("%Y-%m-%dT%H:%M:%S+05:30"),
+        "OptimalTime": f"{start.strftime('%H:%M')} on {start.strftime('%A')}",
+        "BusinessHoursValid": 9 <= hour and end.hour <= 18,
+        "Reasoning": "Deterministic stand-in: requested day and time mapped onto business hours",
+    }, indent=2)
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+class StandInModel:
+    """Produce completions, simulated latency and failures for each request."""
+
+    def __init__(self, latency: LatencyModel = None, token_seconds: float = 0.0,
+                 failures: FailureInjector = None, replay: ReplayScript = None, think: bool = False):
+        self.latency = latency or LatencyModel()
+        self.token_seconds = token_seconds
+        self.failures = failures or FailureInjector()
+        self.replay = replay or ReplayScript()
+        self.think = think
+        self._lock = threading.Lock()
+        self.stats = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {
+                "requests": 0,
+                "streamed": 0,
+                "tool_call_responses": 0,
+                "completion_tokens": 0,
+                "cancelled_streams": 0,
+                "injected_failures": {"error": 0, "rate_limit": 0, "timeout": 0, "drop_stream": 0},
+                "model_time_seconds": 0.0,
+            }
+
+    def record(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                if key == "failure":
+                    self.stats["injected_failures"][value] += 1
+                else:
+                    self.stats[key] += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+    def complete(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the assistant message (content and/or tool calls) for a request."""
+        messages = body.get("messages", [])
+        system_prompt = "\n".join(_message_text(m) for m in messages if m.get("role") == "system")
+        user_prompt = next((_message_text(m) for m in reversed(messages) if m.get("role") == "user"), "")
+        conversation = "\n".join(_message_text(m) for m in messages)
+
+        scripted = self.replay.lookup(conversation)
+        if scripted:
+            tool_calls = scripted.get("tool_calls")
+            # Scripted tool calls are only issued until the tool result is back
+            if tool_calls and body.get("tools") and messages and messages[-1].get("role") != "tool":
+                return {"content": None, "tool_calls": tool_calls}
+            return {"content": scripted.get("content") or "", "tool_calls": None}
+
+        if "date-time scheduling agent" in system_prompt:
+            content = respond_date_range(system_prompt, user_prompt)
+        elif "meeting time optimizer" in system_prompt:
+            content = respond_optimal_time(system_prompt, user_prompt)
+        elif messages and messages[-1].get("role") == "tool":
+            content = _message_text(messages[-1])
+        else:
+            content = "OK"
+
+        if self.think:
+            content = THINK_BLOCK + content
+        return {"content": content, "tool_calls": None}
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return re.findall(r"\s*\S{1,4}|\s+", text or "")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "LocalModelStandIn/1.0"
+
+    @property
+    def model(self) -> StandInModel:
+        return self.server.model
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/v1/models", "/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": MODEL_NAME, "object": "model", "owned_by": "local"}]})
+        elif self.path.rstrip("/") in ("/stats", "/v1/stats"):
+            self._send_json(200, self.model.snapshot())
+        elif self.path.rstrip("/") == "/health":
+            self._send_json(200, {"status": "healthy"})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b"{}"
+
+        if self.path.rstrip("/") in ("/stats/reset", "/v1/stats/reset"):
+            self.model.reset_stats()
+            self._send_json(200, {"status": "reset"})
+            return
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        try:
+            body = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self._send_json(400, {"error": {"message": f"Invalid JSON: {e}"}})
+            return
+
+        self.model.record(requests=1)
+        failure = self.model.failures.draw()
+        if failure:
+            self.model.record(failure=failure)
+        if failure == "error":
+            self._send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+            return
+        if failure == "rate_limit":
+            self._send_json(429, {"error": {"message": "Injected rate limit", "type": "rate_limit_error"}},
+                            {"Retry-After": "1"})
+            return
+        if failure == "timeout":
+            time.sleep(self.model.failures.hang_seconds)
+            self.close_connection = True
+            return
+
+        message = self.model.complete(body)
+        tokens = self.model.tokenize(message["content"])
+        if message["tool_calls"]:
+            self.model.record(tool_call_responses=1)
+
+        if body.get("stream"):
+            self._stream(body, message, tokens, drop=failure == "drop_stream")
+        else:
+            self._complete(body, message, tokens)
+
+    def _completion_id(self) -> str:
+        return "chatcmpl-" + uuid.uuid4().hex[:24]
+
+    def _tool_calls_payload(self, tool_calls):
+        return [
+            {
+                "id": f"call_{index}_{uuid.uuid4().hex[:8]}",
+                "type": "function",
+                "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}))},
+            }
+            for index, call in enumerate(tool_calls)
+        ]
+
+    def _complete(self, body, message, tokens):
+        model_time = self.model.latency.sample() / 1000 + len(tokens) * self.model.token_seconds
+        time.sleep(model_time)
+        self.model.record(completion_tokens=len(tokens), model_time_seconds=model_time)
+
+        reply = {"role": "assistant", "content": message["content"]}
+        finish_reason = "stop"
+        if message["tool_calls"]:
+            reply["tool_calls"] = self._tool_calls_payload(message["tool_calls"])
+            finish_reason = "tool_calls"
+
+        prompt_tokens = sum(len(_message_text(m)) // 4 for m in body.get("messages", []))
+        self._send_json(200, {
+            "id": self._completion_id(),
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", MODEL_NAME),
+            "choices": [{"index": 0, "message": reply, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                      "total_tokens": prompt_tokens + len(tokens)},
+        }, {"X-Model-Time-Ms": f"{model_time * 1000:.3f}"})
+
+    def _stream(self, body, message, tokens, drop=False):
+        self.model.record(streamed=1)
+        first_token = self.model.latency.sample() / 1000
+        completion_id = self._completion_id()
+        created = int(time.time())
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def chunk(delta, finish_reason=None):
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body.get("model", MODEL_NAME),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        model_time = first_token
+        generated = 0
+        time.sleep(first_token)
+        try:
+            chunk({"role": "assistant", "content": ""})
+            if message["tool_calls"]:
+                for index, call in enumerate(self._tool_calls_payload(message["tool_calls"])):
+                    chunk({"tool_calls": [dict(call, index=index)]})
+                chunk({}, "tool_calls")
+            else:
+                drop_at = len(tokens) // 2 if drop else None
+                for token in tokens:
+                    if generated == drop_at:
+                        return
+                    time.sleep(self.model.token_seconds)
+                    model_time += self.model.token_seconds
+                    chunk({"content": token})
+                    generated += 1
+                chunk({}, "stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped reading, i.e. cancelled the rest of the generation
+            self.model.record(cancelled_streams=1)
+        finally:
+            self.model.record(completion_tokens=generated, model_time_seconds=model_time)
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load tests open hundreds of connections at once, the default backlog is 5
+    request_queue_size = 1024
+
+    def __init__(self, address, model: StandInModel, verbose: bool = False):
+        super().__init__(address, StandInHandler)
+        self.model = model
+        self.verbose = verbose
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_local_model_server(host: str = "127.0.0.1", port: int = 0, **model_kwargs) -> StandInServer:
+    """Start the stand-in in a daemon thread and return the server (see ``base_url``)."""
+    server = StandInServer((host, port), StandInModel(**model_kwargs))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def build_model(args) -> StandInModel:
+    rng = random.Random(args.seed)
+    return StandInModel(
+        latency=LatencyModel(args.latency, rng),
+        token_seconds=args.token_ms / 1000,
+        failures=FailureInjector(args.error_rate, args.rate_limit_rate, args.timeout_rate,
+                                 args.drop_stream_rate, args.hang_seconds, rng),
+        replay=ReplayScript(args.replay),
+        think=args.think,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible model stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="fixed:0",
+                        help="time to first token in ms: fixed:N, uniform:A,B, normal:MU,SD, lognormal:MU,SIGMA, exp:MEAN")
+    parser.add_argument("--token-ms", type=float, default=0.0, help="delay per generated token in ms")
+    parser.add_argument("--replay", help="JSONL file of scripted or recorded responses")
+    parser.add_argument("--think", action="store_true", help="prefix answers with a <think> block like Qwen3")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction answered with HTTP 429")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="fraction that hang for --hang-seconds")
+    parser.add_argument("--drop-stream-rate", type=float, default=0.0, help="fraction of streams cut off halfway")
+    parser.add_argument("--hang-seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = StandInServer((args.host, args.port), build_model(args), verbose=args.verbose)
+    print(f"Local model stand-in serving {MODEL_NAME} on {server.base_url}")
+    print(f"   Latency: {args.latency}, {args.token_ms} ms/token")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+import pytz
+import calendar_prefetch
+import metrics
+import response_builder
+from structured_logging import get_logger
+import tracing
+
+log = get_logger("meeting_assistant")
+
+
+async def fetch_attendee_events(email, data):
+    """Fetch an attendee's existing events for the request range without blocking the event loop."""
+    from calendar_events_fetch import fetch_calendar_events
+    return await asyncio.to_thread(fetch_calendar_events, email, data['Start'], data['End'])
+
+
+async def create_calendar_events(data, scheduled_event, processing_metadata):
+    """STEP 10: put the meeting on every attendee's calendar when CALENDAR_WRITE_ENABLED=1.
+
+    The outcome goes into MetaData["calendar_write"]; a failed write (already
+    rolled back) is reported there instead of failing the request.
+    """
+    import calendar_events_write
+    if not calendar_events_write.CALENDAR_WRITE_ENABLED:
+        return
+    tracing.step("STEP 10: CALENDAR EVENT CREATION")
+    log.debug("STEP 10: CALENDAR EVENT CREATION")
+    writer = calendar_events_write.calendar_writer()
+    try:
+        with metrics.time_stage("calendar_write"):
+            processing_metadata["calendar_write"] = await asyncio.to_thread(
+                writer.create_event, scheduled_event, data.get("Request_id", "unknown")
+            )
+        log.debug("Created the meeting on %s calendars", processing_metadata["calendar_write"]["events"])
+    except calendar_events_write.CalendarWriteError as e:
+        log.warning("Calendar write failed: %s", e)
+        processing_metadata["calendar_write"] = e.to_json()
+    except Exception as e:
+        log.warning("Calendar write error: %s", e)
+        processing_metadata["calendar_write"] = {"status": "error", "error": str(e)}
+    finally:
+        # Created or rolled back, cached calendars of these attendees no longer match the backend
+        from calendar_events_fetch import invalidate_calendars
+        await asyncio.to_thread(invalidate_calendars, scheduled_event["Attendees"],
+                                scheduled_event["StartTime"], scheduled_event["EndTime"])
+
+
+@tracing.stepped
+async def your_meeting_assistant_async(data): 
+    """
+    Enhanced AI Meeting Scheduler with Comprehensive Logging
+    
+    This function processes meeting requests and returns scheduled meetings
+    in the exact format specified by 3_Output_Event.json. The LLM agents are
+    awaited directly and blocking calendar/rule-based work runs in worker
+    threads, so an event loop can hold many requests in flight.
+    """
+    log.debug("AI MEETING SCHEDULER - DETAILED PROCESSING LOG")
+    
+    # STEP 1: INPUT ANALYSIS
+    tracing.step("STEP 1: INPUT ANALYSIS")
+    log.debug("STEP 1: INPUT ANALYSIS")
+    log.debug("Email Content: %s", data.get('EmailContent', 'Not provided'))
+    log.debug("From: %s", data.get('From', 'Not provided'))
+    log.debug("Subject: %s", data.get('Subject', 'Not provided'))
+    log.debug("Start Range: %s", data.get('Start', 'Not provided'))
+    log.debug("End Range: %s", data.get('End', 'Not provided'))
+    log.debug("Duration: %s minutes", data.get('Duration_mins', 'Not provided'))
+    log.debug("Attendees: %s people", len(data.get('Attendees', [])))
+    for i, attendee in enumerate(data.get('Attendees', []), 1):
+        log.debug("   %s. %s", i, attendee.get('email', 'Unknown email'))
+    calendar_prefetch.record_request(data)
+    
+    # STEP 2: DATA PREPROCESSING  
+    tracing.step("STEP 2: DATA PREPROCESSING")
+    log.debug("STEP 2: DATA PREPROCESSING")
+    
+    # Ensure Duration_mins has a default value
+    if not data.get('Duration_mins'):
+        data['Duration_mins'] = '30'
+        log.debug("Generated Duration: 30 minutes (default)")
+    else:
+        log.debug("Duration already provided: %s minutes", data['Duration_mins'])
+    
+    # Auto-generate subject if missing
+    if not data.get('Subject'):
+        email_content = data.get('EmailContent', '').lower()
+        if 'goals' in email_content:
+            data['Subject'] = 'Goals Discussion Meeting'
+            log.debug("Generated Subject: 'Goals Discussion Meeting' (found 'Goals' in content)")
+        else:
+            data['Subject'] = 'Team Meeting'
+            log.debug("Generated Subject: 'Team Meeting' (default)")
+    else:
+        log.debug("Subject already provided: '%s'", data['Subject'])
+    
+    # Initialize metadata for tracking reasoning
+    processing_metadata = {
+        "llm_used": False,
+        "reasoning": "",
+        "processing_method": "unknown",
+        "date_extraction": "",
+        "time_extraction": "",
+        "fallback_used": False
+    }
+    
+    # STEP 3: LLM PROCESSING ATTEMPT
+    tracing.step("STEP 3: LLM PROCESSING ATTEMPT")
+    log.debug("STEP 3: LLM PROCESSING ATTEMPT")
+    llm_result = None
+    try:
+        from ai_scheduling_agent import schedule_meeting_async
+        log.debug("LLM Agent initialized successfully")
+        log.debug("Loading LLM meeting scheduler agent...")
+        
+        # Call LLM-powered scheduler
+        log.debug("Calling LLM with processed data...")
+        log.debug("LLM Input Summary:")
+        log.debug("Email: '%.50s...'", data.get('EmailContent', ''))
+        log.debug("Time Range: %s to %s", data.get('Start'), data.get('End'))
+        log.debug("Duration: %s mins", data.get('Duration_mins'))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Attendees: %s", [att.get('email') for att in data.get('Attendees', [])])
+        
+        result = await schedule_meeting_async(data)
+        
+        log.debug("LLM Response Received:")
+        log.debug("Status: %s", result.get('status', 'Unknown'))
+        log.debug("Type: %s", type(result))
+        log.debug("Keys: %s", result.keys() if isinstance(result, dict) else 'Not a dict')
+        
+        if result.get("status") == "success":
+            log.debug("LLM scheduling successful!")
+            processing_metadata["llm_used"] = True
+            processing_metadata["processing_method"] = "LLM_Enhanced"
+            
+            # Extract LLM reasoning and timing details
+            if result.get("reasoning"):
+                processing_metadata["reasoning"] = result.get("reasoning")
+                log.debug("LLM reasoning: %s", result.get('reasoning'))
+            
+            # Check if we have proper event start/end times from LLM
+            if result.get("event_start") and result.get("event_end"):
+                log.debug("Using LLM scheduled time: %s to %s", result.get('event_start'), result.get('event_end'))
+                
+                # Use LLM results directly
+                llm_result = {
+                    "event_start": result.get("event_start"),
+                    "event_end": result.get("event_end"),
+                    "duration_mins": result.get("duration_mins", data.get('Duration_mins', '30')),
+                    "reasoning": result.get("reasoning", "LLM successfully scheduled the meeting")
+                }
+                
+                # Update metadata with extraction details
+                processing_metadata["date_extraction"] = f"LLM extracted from email content"
+                processing_metadata["time_extraction"] = f"LLM optimized timing"
+                
+            # Check if LLM provided a complete response structure
+            elif "response" in result and isinstance(result["response"], dict):
+                log.debug("LLM provided complete response structure")
+                complete_response = result["response"]
+                
+                # Add reasoning to metadata
+                if complete_response.get("MetaData"):
+                    complete_response["MetaData"].update(processing_metadata)
+                else:
+                    complete_response["MetaData"] = processing_metadata
+                    
+                return complete_response
+                
+        else:
+            log.warning("LLM processing failed: %s", result.get('error', 'Unknown error'))
+            processing_metadata["fallback_used"] = True
+            processing_metadata["reasoning"] = f"LLM failed: {result.get('error', 'Unknown error')}"
+            log.debug("Falling back to rule-based processing...")
+            
+    except Exception as e:
+        log.warning("LLM integration error: %s", e)
+        processing_metadata["fallback_used"] = True
+        processing_metadata["reasoning"] = f"LLM error: {str(e)}"
+        log.debug("Proceeding with rule-based fallback scheduling...")
+    
+    # STEP 4: USE LLM RESULTS IF AVAILABLE
+    meeting_start = None
+    meeting_end = None
+    duration_mins = int(data.get('Duration_mins', 30))
+    
+    if llm_result:
+        tracing.step("STEP 4: USING LLM SCHEDULED TIME")
+        log.debug("STEP 4: USING LLM SCHEDULED TIME")
+        log.debug("LLM provided optimal time: %s to %s", llm_result['event_start'], llm_result['event_end'])
+        
+        # Parse LLM provided times
+        try:
+            meeting_start_str = llm_result['event_start']
+            meeting_end_str = llm_result['event_end']
+            
+            # Parse the datetime strings (handle timezone)
+            if '+05:30' in meeting_start_str:
+                meeting_start = datetime.fromisoformat(meeting_start_str.replace('+05:30', ''))
+                meeting_start = pytz.timezone('Asia/Kolkata').localize(meeting_start)
+            else:
+                meeting_start = datetime.fromisoformat(meeting_start_str)
+                
+            if '+05:30' in meeting_end_str:
+                meeting_end = datetime.fromisoformat(meeting_end_str.replace('+05:30', ''))
+                meeting_end = pytz.timezone('Asia/Kolkata').localize(meeting_end)
+            else:
+                meeting_end = datetime.fromisoformat(meeting_end_str)
+            
+            duration_mins = int(llm_result.get('duration_mins', duration_mins))
+            
+            log.debug("Meeting Details (from LLM):")
+            log.debug("   Start: %s", meeting_start)
+            log.debug("   End: %s", meeting_end)
+            log.debug("   Duration: %s minutes", duration_mins)
+            
+            processing_metadata["processing_method"] = "LLM_Success"
+            processing_metadata["reasoning"] = llm_result.get('reasoning', 'LLM successfully parsed and scheduled the meeting')
+            
+            # LLM succeeded - skip all fallback processing and go directly to response creation
+            log.debug("LLM SUCCESS: Using LLM scheduled time, skipping fallback processing")
+            
+        except Exception as e:
+            log.warning("Error parsing LLM times: %s", e)
+            meeting_start = None  # Reset to trigger fallback
+            meeting_end = None
+            processing_metadata["fallback_used"] = True
+            processing_metadata["reasoning"] = f"LLM time parsing failed: {str(e)}"
+    
+    # STEP 5: FALLBACK RULE-BASED PROCESSING (only if LLM failed)
+    if meeting_start is None or meeting_end is None:
+        tracing.step("STEP 5: RULE-BASED FALLBACK PROCESSING")
+        log.debug("STEP 5: RULE-BASED FALLBACK PROCESSING")
+        
+        try:
+            from scheduling_meeting_utils import process_meeting_request
+            log.debug("Loading fallback meeting scheduler...")
+            
+            result = await asyncio.to_thread(process_meeting_request, data)
+            log.debug("Fallback scheduler result type: %s", type(result))
+            log.debug("Fallback scheduler keys: %s", result.keys() if isinstance(result, dict) else 'Not a dict')
+            
+            if "error" in result:
+                log.info("Fallback scheduling failed: %s", result['error'])
+                log.debug("Using simplified slot assignment...")
+                processing_metadata["processing_method"] = "Simplified_Assignment"
+                processing_metadata["reasoning"] = f"Fallback failed: {result['error']}, using simplified assignment"
+            else:
+                log.debug("Fallback scheduling completed successfully")
+                processing_metadata["processing_method"] = "Rule_Based_Success"
+                processing_metadata["reasoning"] = "Rule-based scheduler found optimal time"
+                
+                # Add metadata to result and return
+                if result.get("MetaData"):
+                    result["MetaData"].update(processing_metadata)
+                else:
+                    result["MetaData"] = processing_metadata
+                # create_meeting_response puts the scheduled event last in every attendee's list
+                if result.get("Attendees"):
+                    await create_calendar_events(data, result["Attendees"][0]["events"][-1], result["MetaData"])
+                return result
+                
+        except Exception as e:
+            log.warning("Fallback processing error: %s", e)
+            processing_metadata["processing_method"] = "Error_Fallback"
+            processing_metadata["reasoning"] = f"All methods failed: {str(e)}"
+            log.debug("Creating simplified response...")
+        
+        # STEP 6: SIMPLIFIED MEETING SLOT ASSIGNMENT (only as last resort)
+        tracing.step("STEP 6: SIMPLIFIED MEETING SLOT ASSIGNMENT")
+        log.debug("STEP 6: SIMPLIFIED MEETING SLOT ASSIGNMENT")
+        
+        # Auto-generate date range if missing and no LLM result
+        if not data.get('Start') or not data.get('End'):
+            log.debug("Parsing date range from email content...")
+            
+            # Parse the email content for date mentions
+            email_content = data.get('EmailContent', '').lower()
+            
+            current_date = datetime.now(pytz.timezone('Asia/Kolkata'))
+            
+            # Determine target date based on email content
+            if 'tuesday' in email_content:
+                # Find next Tuesday
+                days_ahead = (1 - current_date.weekday()) % 7
+                if days_ahead == 0:  # If today is Tuesday, get next Tuesday  
+                    days_ahead = 7
+                target_date = current_date + timedelta(days=days_ahead)
+                log.debug("Target Tuesday: %s (%s days ahead)", target_date.date(), days_ahead)
+                processing_metadata["date_extraction"] = f"Extracted 'Tuesday' from email content"
+            elif 'thursday' in email_content:
+                # Find next Thursday
+                days_ahead = (3 - current_date.weekday()) % 7
+                if days_ahead == 0:  # If today is Thursday, get next Thursday
+                    days_ahead = 7
+                target_date = current_date + timedelta(days=days_ahead)
+                log.debug("Target Thursday: %s (%s days ahead)", target_date.date(), days_ahead)
+                processing_metadata["date_extraction"] = f"Extracted 'Thursday' from email content"
+            else:
+                # Default to next business day
+                days_ahead = 1
+                target_date = current_date + timedelta(days=days_ahead)
+                while target_date.weekday() >= 5:  # Skip weekends
+                    target_date += timedelta(days=1)
+                    days_ahead += 1
+                log.debug("Target next business day: %s (%s days ahead)", target_date.date(), days_ahead)
+                processing_metadata["date_extraction"] = f"Used next business day (no specific day mentioned)"
+            
+            # Set date range for that day
+            start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
+            end_of_day = target_date.replace(hour=23, minute=59, second=59, microsecond=0)
+            
+            data['Start'] = start_of_day.strftime("%Y-%m-%dT%H:%M:%S+05:30")
+            data['End'] = end_of_day.strftime("%Y-%m-%dT%H:%M:%S+05:30")
+            log.debug("Generated date range: %s to %s", data['Start'], data['End'])
+        
+        # Parse the date range we set up
+        start_date = datetime.fromisoformat(data['Start'].replace('+05:30', ''))
+        start_date = pytz.timezone('Asia/Kolkata').localize(start_date)
+        
+        # Extract time from email content
+        email_content = data.get('EmailContent', '').lower()
+        meeting_hour = 10
+        meeting_minute = 30
+        
+        if '2 pm' in email_content or '2:00 pm' in email_content or '14:00' in email_content:
+            meeting_hour = 14
+            meeting_minute = 0
+            processing_metadata["time_extraction"] = "Extracted '2 PM' from email content"
+        elif '10 am' in email_content or '10:00 am' in email_content:
+            meeting_hour = 10
+            meeting_minute = 0
+            processing_metadata["time_extraction"] = "Extracted '10 AM' from email content"
+        elif 'morning' in email_content:
+            meeting_hour = 10
+            meeting_minute = 0
+            processing_metadata["time_extraction"] = "Extracted 'morning' from email content"
+        elif 'afternoon' in email_content:
+            meeting_hour = 14
+            meeting_minute = 0
+            processing_metadata["time_extraction"] = "Extracted 'afternoon' from email content"
+        else:
+            processing_metadata["time_extraction"] = "Used default time (10:30 AM)"
+        
+        # Set meeting time
+        meeting_start = start_date.replace(hour=meeting_hour, minute=meeting_minute, second=0)
+        duration_mins = int(data.get('Duration_mins', 30))
+        meeting_end = meeting_start + timedelta(minutes=duration_mins)
+        
+        log.debug("Meeting Details (Simplified):")
+        log.debug("   Start: %s", meeting_start)
+        log.debug("   End: %s", meeting_end)
+        log.debug("   Duration: %s minutes", duration_mins)
+        
+        processing_metadata["processing_method"] = "Simplified_Success"
+        processing_metadata["reasoning"] = f"Used simplified parsing: {processing_metadata['date_extraction']}, {processing_metadata['time_extraction']}"
+    else:
+        log.debug("USING LLM RESULTS: Skipping all fallback processing")
+        log.debug("   LLM provided meeting time will be used in final response")
+    
+    # STEP 7: ATTENDEE LIST COMPILATION
+    tracing.step("STEP 7: ATTENDEE LIST COMPILATION")
+    log.debug("STEP 7: ATTENDEE LIST COMPILATION")
+    attendee_emails = [data.get("From", "")]  # Include organizer (use .get() for safety)
+    for attendee in data.get("Attendees", []):
+        if attendee.get("email"):
+            attendee_emails.append(attendee["email"])
+    
+    log.debug("Complete attendee list (%s people):", len(attendee_emails))
+    for i, email in enumerate(attendee_emails, 1):
+        log.debug("   %s. %s", i, email)
+    
+    # STEP 8: MEETING EVENT CREATION (using global meeting_start and meeting_end)
+    tracing.step("STEP 8: MEETING EVENT CREATION")
+    if meeting_start is None or meeting_end is None:
+        log.error("meeting_start or meeting_end is None - this should not happen")
+        # Emergency fallback
+        current_date = datetime.now(pytz.timezone('Asia/Kolkata'))
+        meeting_start = current_date + timedelta(days=1)
+        meeting_start = meeting_start.replace(hour=10, minute=30, second=0, microsecond=0)
+        meeting_end = meeting_start + timedelta(minutes=duration_mins)
+        processing_metadata["reasoning"] = "Emergency fallback - used current date + 1 day"
+    
+    new_event = {
+        "StartTime": meeting_start.strftime("%Y-%m-%dT%H:%M:%S+05:30"),
+        "EndTime": meeting_end.strftime("%Y-%m-%dT%H:%M:%S+05:30"),
+        "NumAttendees": len(attendee_emails),
+        "Attendees": attendee_emails,
+        "Summary": data.get("Subject", "Team Meeting")
+    }
+    
+    log.debug("STEP 8: MEETING EVENT CREATION")
+    log.debug("New meeting event created:")
+    log.debug("   Start: %s", new_event['StartTime'])
+    log.debug("   End: %s", new_event['EndTime'])
+    log.debug("   Attendees: %s", new_event['NumAttendees'])
+    log.debug("   Subject: %s", new_event['Summary'])
+    log.debug("   Source: %s", processing_metadata.get('processing_method', 'Unknown'))
+    
+    # STEP 9: RESPONSE FORMATTING (exact format as 3_Output_Event.json)
+    tracing.step("STEP 9: RESPONSE FORMATTING")
+    response = {
+        "Request_id": data.get("Request_id", "unknown"),
+        "Datetime": data.get("Datetime", ""),
+        "Location": data.get("Location", ""),
+        "From": data.get("From", ""),
+        "Attendees": [],
+        "Subject": data.get("Subject", ""),
+        "EmailContent": data.get("EmailContent", ""),
+        "EventStart": new_event["StartTime"],
+        "EventEnd": new_event["EndTime"],
+        "Duration_mins": data.get("Duration_mins", "30"),
+        "MetaData": processing_metadata
+    }
+    
+    log.debug("STEP 9: RESPONSE FORMATTING")
+    log.debug("Building response in required JSON format...")
+    
+    # Fetch existing calendar events for every attendee concurrently, unless the
+    # response leaves them out
+    if response_builder.wants_existing_events():
+        calendar_results = await asyncio.gather(
+            *[fetch_attendee_events(email, data) for email in attendee_emails],
+            return_exceptions=True
+        )
+    else:
+        log.debug("Response events mode 'none': skipping calendar fetch")
+        calendar_results = [None] * len(attendee_emails)
+    
+    existing_by_email = {}
+    for email, existing_events in zip(attendee_emails, calendar_results):
+        if isinstance(existing_events, Exception):
+            log.warning("Could not retrieve calendar for %s: %s", email, existing_events)
+        elif isinstance(existing_events, list):
+            existing_by_email[email] = existing_events
+            log.debug("   Existing events for %s: %s", email, len(existing_events))
+    
+    # Add events for each attendee (as shown in 3_Output_Event.json): the new scheduled
+    # event, shared by all attendees, then their existing events in the response window
+    response["Attendees"] = response_builder.build_attendees(
+        attendee_emails, existing_by_email, new_event, scheduled_first=True
+    )
+    for i, attendee in enumerate(response["Attendees"], 1):
+        log.debug("   %s. Added %s events for: %s", i, len(attendee["events"]), attendee["email"])
+    
+    log.debug("PROCESSING COMPLETE!")
+    log.debug("Meeting scheduled: %s to %s", response['EventStart'], response['EventEnd'])
+    log.debug("Processing method: %s", processing_metadata['processing_method'])
+    log.debug("Reasoning: %s", processing_metadata['reasoning'])
+    log.debug("Response includes all required fields:")
+    log.debug("   - Request_id: %s", response['Request_id'])
+    log.debug("   - Subject: %s", response['Subject'])
+    log.debug("   - EventStart: %s", response['EventStart'])
+    log.debug("   - EventEnd: %s", response['EventEnd'])
+    log.debug("   - Duration_mins: %s", response['Duration_mins'])
+    log.debug("   - Attendees: %s people with events", len(response['Attendees']))
+    log.debug("   - MetaData: %s", response['MetaData'].keys())
+    
+    await create_calendar_events(data, new_event, processing_metadata)
+    
+    return response
+
+
+def your_meeting_assistant(data):
+    """Synchronous wrapper used by the threaded Flask endpoint."""
+    try:
+        loop = asyncio.get_event_loop()
+        if loop.is_closed():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    
+    return loop.run_until_complete(your_meeting_assistant_async(data))
@@ -0,0 +1,285 @@
+"""Prometheus metrics for the scheduler, rendered in the text exposition format.
+
+Metrics live in the process that records them. Under server.py every worker
+is its own process, so when METRICS_DIR is set each process periodically
+writes its samples to ``METRICS_DIR/<pid>.json`` and ``render()`` merges all
+of them: counters and histograms are summed over every file, gauges only
+over processes that are still alive.
+"""
+import bisect
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from structured_logging import get_logger
+import tracing
+
+log = get_logger("metrics")
+
+METRICS_DIR = os.environ.get("METRICS_DIR") or None
+
+# Seconds; tuned for a pipeline whose stages range from sub-millisecond to multi-second LLM calls
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_registry: List["Metric"] = []
+_collectors: List[Callable[[], None]] = []
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[list]:
+        with self._lock:
+            return [[list(key), value if not isinstance(value, list) else list(value)]
+                    for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """``merge=False`` for gauges read from state all workers share (e.g. the job queue
+    file): the scraped process reports it alone instead of summing every worker's copy."""
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), merge: bool = True):
+        super().__init__(name, documentation, labelnames)
+        self.merge = merge
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    @contextlib.contextmanager
+    def track_in_progress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram; each value is [bucket counts..., +Inf count, sum]."""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+STAGE_SECONDS = Histogram(
+    "meeting_scheduler_stage_duration_seconds", "Time spent in each pipeline stage.", ("stage",)
+)
+HTTP_SECONDS = Histogram(
+    "meeting_scheduler_http_request_duration_seconds", "HTTP request latency by route.", ("route", "status")
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "meeting_scheduler_admission_wait_seconds", "Time spent waiting in the admission queue.", ("priority",)
+)
+REQUESTS_TOTAL = Counter(
+    "meeting_scheduler_requests_total", "Scheduled requests by MetaData.processing_method.", ("processing_method",)
+)
+CALENDAR_CALLS = Counter(
+    "meeting_scheduler_calendar_calls_total",
+    "Calendar lookups per attendee; source is backend for real fetches, cache for shared-cache or batch hits,"
+    " prefetch for lookups answered from prefetched days.",
+    ("attendee", "source")
+)
+PREFETCH_LOOKUPS = Counter(
+    "meeting_scheduler_prefetch_lookups_total",
+    "Calendar cache misses checked against the prefetched availability cache, by outcome (hit, miss).",
+    ("outcome",)
+)
+PREFETCH_FETCHES = Counter(
+    "meeting_scheduler_prefetch_fetches_total",
+    "Background prefetch attempts per attendee by outcome (ok, error, fresh, over_budget).",
+    ("outcome",)
+)
+CALENDAR_WRITES = Counter(
+    "meeting_scheduler_calendar_writes_total",
+    "Calendar event writes by operation (insert, delete) and outcome (ok, retried, failed).",
+    ("operation", "outcome")
+)
+IN_FLIGHT = Gauge("meeting_scheduler_in_flight_requests", "HTTP requests currently being handled.", ("route",))
+PIPELINE_IN_FLIGHT = Gauge(
+    "meeting_scheduler_pipeline_in_flight", "Requests currently inside your_meeting_assistant."
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "meeting_scheduler_admission_queue_depth", "Requests waiting for an admission slot.", ("priority",)
+)
+PREFETCH_TRACKED = Gauge(
+    "meeting_scheduler_prefetch_tracked_attendees", "Attendees whose request frequency the prefetcher tracks."
+)
+JOBS = Gauge("meeting_scheduler_jobs", "Async jobs in the persistent queue by status.", ("status",), merge=False)
+
+
+@contextlib.contextmanager
+def time_stage(stage: str, **attrs):
+    """Time one pipeline stage into STAGE_SECONDS and record it as a span of the request's trace."""
+    with STAGE_SECONDS.time(stage=stage), tracing.span(stage, **attrs):
+        yield
+
+
+def on_collect(callback: Callable[[], None]):
+    """Run callback before every render/flush, e.g. to copy queue depths into gauges."""
+    _collectors.append(callback)
+
+
+def _collect():
+    for callback in _collectors:
+        try:
+            callback()
+        except Exception as e:
+            log.warning("Metrics collector failed: %s", e)
+
+
+def snapshot() -> Dict[str, dict]:
+    _collect()
+    return {
+        metric.name: {
+            "type": metric.type,
+            "help": metric.documentation,
+            "labelnames": list(metric.labelnames),
+            "buckets": list(getattr(metric, "buckets", [])),
+            "merge": getattr(metric, "merge", True),
+            "samples": metric.samples(),
+        }
+        for metric in _registry
+    }
+
+
+def flush():
+    """Write this process's samples to METRICS_DIR for the other workers to merge."""
+    if not METRICS_DIR:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f)
+    os.replace(path + ".tmp", path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _merged() -> Dict[str, dict]:
+    merged = snapshot()
+    if not METRICS_DIR or not os.path.isdir(METRICS_DIR):
+        return merged
+    for filename in os.listdir(METRICS_DIR):
+        if not filename.endswith(".json") or filename == f"{os.getpid()}.json":
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, filename), encoding="utf-8") as f:
+                other = json.load(f)
+        except (OSError, ValueError):
+            continue
+        alive = _pid_alive(int(filename[:-len(".json")]))
+        for name, family in other.items():
+            target = merged.get(name)
+            if target is None or not family["merge"] or (family["type"] == "gauge" and not alive):
+                continue
+            values = {tuple(labels): value for labels, value in target["samples"]}
+            for labels, value in family["samples"]:
+                current = values.get(tuple(labels))
+                if current is None:
+                    values[tuple(labels)] = value
+                elif isinstance(value, list):
+                    values[tuple(labels)] = [a + b for a, b in zip(current, value)]
+                else:
+                    values[tuple(labels)] = current + value
+            target["samples"] = [[list(labels), value] for labels, value in values.items()]
+    return merged
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra: Tuple[str, str] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render() -> str:
+    """All metrics (merged across worker processes) in Prometheus text format."""
+    lines = []
+    for name, family in _merged().items():
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        labelnames = family["labelnames"]
+        for labels, value in sorted(family["samples"]):
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+                continue
+            cumulative = 0.0
+            for bound, count in zip(family["buckets"] + ["+Inf"], value[:-1]):
+                cumulative += count
+                le = bound if bound == "+Inf" else _format_value(bound)
+                lines.append(f"{name}_bucket{_format_labels(labelnames, labels, ('le', le))} {_format_value(cumulative)}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(value[-1])}")
+            lines.append(f"{name}_count{_format_labels(labelnames, labels)} {_format_value(cumulative)}")
+    return "\n".join(lines) + "\n"
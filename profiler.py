@@ -0,0 +1,123 @@
+"""Sampling profiler for a single traced request.
+
+A background thread snapshots ``sys._current_frames()`` every
+PROFILE_INTERVAL_MS and keeps the stacks that belong to the profiled
+request. On the event loop thread, only stacks running the request's own
+task count. Other requests share that thread and are left out. On worker
+threads, stacks count while one of the request's trace spans is open there,
+e.g. a calendar fetch or the slot search. Results are collapsed stacks
+(``frame;frame;frame count``, readable by flamegraph.pl and speedscope) plus
+the functions with the most samples.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict
+
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+
+# Thread-pool and event-loop plumbing below the interesting frames
+_SKIPPED_FILES = (
+    os.path.join("concurrent", "futures", "thread.py"),
+    "threading.py",
+)
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the threads working on ``trace``'s request until stopped."""
+
+    def __init__(self, trace, interval: float = None, max_depth: int = 64):
+        self.trace = trace
+        self.interval = (interval if interval is not None else PROFILE_INTERVAL_MS) / 1000
+        self.max_depth = max_depth
+        self.samples = 0
+        self.stacks = Counter()
+        self._loop_thread = threading.get_ident()
+        task = asyncio.current_task() if self._in_loop() else None
+        # The request's outermost coroutine frame, present in every stack that runs this request
+        self._root_frame = task.get_coro().cr_frame if task is not None else None
+        self._stopped = threading.Event()
+        self._thread = None
+        self._started = None
+        self._elapsed = 0.0
+
+    @staticmethod
+    def _in_loop() -> bool:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self._elapsed = time.perf_counter() - self._started
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._sample()
+
+    def _stack(self, frame, root) -> list:
+        labels = []
+        found = root is None
+        while frame is not None and len(labels) < self.max_depth:
+            if frame is root:
+                found = True
+                labels.append(_label(frame))
+                break
+            if not frame.f_code.co_filename.endswith(_SKIPPED_FILES):
+                labels.append(_label(frame))
+            frame = frame.f_back
+        return labels[::-1] if found else []
+
+    def _sample(self):
+        with self.trace._lock:
+            threads = set(self.trace.active_threads)
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self._loop_thread:
+                if self._root_frame is None:
+                    continue
+                stack = self._stack(frame, self._root_frame)
+            elif thread_id in threads:
+                stack = self._stack(frame, None)
+            else:
+                continue
+            if stack:
+                self.stacks[";".join(stack)] += 1
+                self.samples += 1
+
+    def to_json(self, top: int = 20) -> Dict[str, Any]:
+        self_samples = Counter()
+        total_samples = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_samples[frames[-1]] += count
+            for label in set(frames):
+                total_samples[label] += count
+        return {
+            "format": "collapsed",
+            "interval_ms": self.interval * 1000,
+            "duration_ms": round(self._elapsed * 1000, 3),
+            "samples": self.samples,
+            "stacks": dict(self.stacks.most_common()),
+            "top": [
+                {"function": label, "self": count, "total": total_samples[label]}
+                for label, count in self_samples.most_common(top)
+            ],
+        }
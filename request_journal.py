@@ -0,0 +1,135 @@
+import fcntl
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def _local_naive(value: datetime) -> datetime:
+    """Aware datetimes as naive local time, comparable with the stored timestamps."""
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
+
+class RequestJournal:
+    """Recent /receive requests in a bounded ring buffer, optionally journaled to disk.
+
+    Replaces the unbounded ``received_data`` list: only the last ``capacity``
+    entries stay in memory. When ``path`` is set every entry is also appended
+    to an NDJSON file that rotates at ``max_bytes`` (``path.1`` .. ``path.N``).
+    Appends and rotation take an exclusive lock on ``path.lock``, so all
+    worker processes of server.py can share one journal.
+    """
+
+    def __init__(self, capacity: int = 100, path: str = None,
+                 max_bytes: int = 50 * 1024 * 1024, backups: int = 5):
+        self.capacity = capacity
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.total = 0
+        self._recent = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RequestJournal":
+        return cls(
+            capacity=int(os.environ.get("REQUEST_JOURNAL_CAPACITY", "100")),
+            path=os.environ.get("REQUEST_JOURNAL_PATH") or None,
+            max_bytes=int(os.environ.get("REQUEST_JOURNAL_MAX_BYTES", str(50 * 1024 * 1024))),
+            backups=int(os.environ.get("REQUEST_JOURNAL_BACKUPS", "5")),
+        )
+
+    def record(self, original_request: Dict[str, Any], processed_response: Dict[str, Any],
+               trace: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Store a processed request, with its trace spans if any, and return the journal entry."""
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "original_request": original_request,
+            "processed_response": processed_response
+        }
+        if trace is not None:
+            entry["trace"] = trace
+        with self._lock:
+            self._recent.append(entry)
+            self.total += 1
+        if self.path:
+            self._append(json.dumps(entry, default=str) + "\n")
+        return entry
+
+    def recent(self, n: int = 5) -> List[Dict[str, Any]]:
+        """Return the last n entries, oldest first, without their traces (see /debug/trace)."""
+        with self._lock:
+            entries = list(self._recent)[-n:] if n else []
+        return [{key: value for key, value in entry.items() if key != "trace"} for entry in entries]
+
+    def _append(self, line: str):
+        data = line.encode("utf-8")
+        with open(self.path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_bytes:
+                    self._rotate()
+                with open(self.path, "ab") as f:
+                    f.write(data)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _rotate(self):
+        oldest = f"{self.path}.{self.backups}"
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def journal_files(self) -> List[str]:
+        """Journal files from oldest to newest."""
+        if not self.path:
+            return []
+        files = [f"{self.path}.{index}" for index in range(self.backups, 0, -1)] + [self.path]
+        return [f for f in files if os.path.exists(f)]
+
+    def _entries(self) -> Iterator[Dict[str, Any]]:
+        if not self.path:
+            with self._lock:
+                entries = list(self._recent)
+            yield from entries
+            return
+        for journal_file in self.journal_files():
+            with open(journal_file, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
+    def query(self, request_id: str = None, since: str = None, until: str = None,
+              limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """Find entries by Request_id and/or an ISO timestamp range [since, until].
+
+        Reads the on-disk journal line by line when one is configured, the
+        in-memory ring buffer otherwise. Entries carry naive local timestamps,
+        so bounds with a UTC offset are converted to local time first.
+        """
+        since_dt = _local_naive(datetime.fromisoformat(since)) if since else None
+        until_dt = _local_naive(datetime.fromisoformat(until)) if until else None
+
+        matches = deque(maxlen=limit) if limit else []
+        for entry in self._entries():
+            if request_id is not None and entry.get("original_request", {}).get("Request_id") != request_id:
+                continue
+            if since_dt or until_dt:
+                timestamp = datetime.fromisoformat(entry["timestamp"])
+                if since_dt and timestamp < since_dt:
+                    continue
+                if until_dt and timestamp > until_dt:
+                    continue
+            matches.append(entry)
+        return list(matches)
@@ -0,0 +1,151 @@
+"""Assembly and encoding of /receive responses.
+
+Every attendee's ``events`` list holds references to the one scheduled-event
+dict plus their existing calendar events; nothing is copied. How many
+existing events go into the response is the request's *response events*
+mode:
+
+* ``all``    - every existing event in the requested range (the default,
+               the format of 3_Output_Event.json),
+* ``window`` - only existing events on the day(s) of the scheduled meeting,
+* ``none``   - no existing events, just the scheduled meeting.
+
+``RESPONSE_EVENTS`` sets the default; ``response_events(mode)`` overrides it
+for the request handled inside the block (the servers take it from the
+``X-Response-Events`` header or ``?response-events=``). Responses are encoded
+with orjson when it is installed and with the json module otherwise; both
+give sorted, compact JSON like Flask's jsonify.
+"""
+import contextlib
+import contextvars
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+RESPONSE_EVENTS_MODES = ("all", "window", "none")
+RESPONSE_EVENTS = os.environ.get("RESPONSE_EVENTS", "all").lower()
+if RESPONSE_EVENTS not in RESPONSE_EVENTS_MODES:
+    raise ValueError(f"RESPONSE_EVENTS must be one of {', '.join(RESPONSE_EVENTS_MODES)}, got {RESPONSE_EVENTS!r}")
+
+_response_events = contextvars.ContextVar("response_events", default=None)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+@contextlib.contextmanager
+def response_events(mode: Optional[str]):
+    """Build responses inside this block in ``mode``; None keeps the current mode."""
+    if mode is None:
+        yield
+        return
+    mode = mode.lower()
+    if mode not in RESPONSE_EVENTS_MODES:
+        raise ValueError(f"response events must be one of {', '.join(RESPONSE_EVENTS_MODES)}, got {mode!r}")
+    token = _response_events.set(mode)
+    try:
+        yield
+    finally:
+        _response_events.reset(token)
+
+
+def current_mode() -> str:
+    return _response_events.get() or RESPONSE_EVENTS
+
+
+def wants_existing_events() -> bool:
+    """False when existing events are left out, so callers can skip fetching them."""
+    return current_mode() != "none"
+
+
+def _parse_time(value: str) -> datetime:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=IST)
+
+
+class _Window:
+    """The calendar day(s) of the scheduled meeting, [start, end) in the meeting's timezone.
+
+    Event times written in the same format and offset as the meeting (the
+    usual case) are compared as strings; others are parsed.
+    """
+
+    def __init__(self, scheduled_event: Dict[str, Any]):
+        start = _parse_time(scheduled_event["StartTime"])
+        end = _parse_time(scheduled_event["EndTime"]).astimezone(start.tzinfo)
+        self.start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.end = end.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        self.start_text = self.start.isoformat()
+        self.end_text = self.end.isoformat()
+        self.offset = self.start_text[19:]
+
+    def overlaps(self, event: Dict[str, Any]) -> bool:
+        try:
+            start, end = event["StartTime"], event["EndTime"]
+            if len(start) == len(end) == len(self.start_text) and start[19:] == end[19:] == self.offset:
+                return start < self.end_text and end > self.start_text
+            return _parse_time(start) < self.end and _parse_time(end) > self.start
+        except (KeyError, TypeError, ValueError):
+            # Keep events we cannot place rather than silently dropping them
+            return True
+
+
+def attendee_events(existing: Any, scheduled_event: Dict[str, Any], scheduled_first: bool = False,
+                    window=None) -> List[Dict[str, Any]]:
+    """One attendee's ``events`` list: their existing events (per the current mode) and the scheduled one.
+
+    ``existing`` may be a fetch error (an exception or ``{"error": ...}``),
+    which contributes no events.
+    """
+    mode = current_mode()
+    events = []
+    if mode != "none" and isinstance(existing, list):
+        if mode == "window":
+            window = window or _Window(scheduled_event)
+            events = [event for event in existing if window.overlaps(event)]
+        else:
+            events = list(existing)
+    if scheduled_first:
+        events.insert(0, scheduled_event)
+    else:
+        events.append(scheduled_event)
+    return events
+
+
+def build_attendees(emails: Iterable[str], existing_by_email: Dict[str, Any], scheduled_event: Dict[str, Any],
+                    scheduled_first: bool = False) -> List[Dict[str, Any]]:
+    """The response's ``Attendees`` list, every entry sharing ``scheduled_event``."""
+    window = _Window(scheduled_event) if current_mode() == "window" else None
+    return [
+        {"email": email,
+         "events": attendee_events(existing_by_email.get(email), scheduled_event, scheduled_first, window)}
+        for email in emails
+    ]
+
+
+def _dumps_json(payload: Any) -> bytes:
+    return (json.dumps(payload, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _dumps_orjson(payload: Any) -> bytes:
+    try:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+                            | orjson.OPT_APPEND_NEWLINE)
+    except TypeError:
+        # e.g. integers beyond 64 bits, which the json module still handles
+        return _dumps_json(payload)
+
+
+ENCODERS = {"json": _dumps_json}
+if orjson is not None:
+    ENCODERS["orjson"] = _dumps_orjson
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode a response body: sorted keys, compact, trailing newline."""
+    return (_dumps_orjson if orjson is not None else _dumps_json)(payload)
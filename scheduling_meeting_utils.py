@@ -1,8 +1,28 @@
 import json
+import os
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import pytz
-from calendar_events_fetch import retrive_calendar_events
+from calendar_events_fetch import fetch_calendar_events
+import metrics
+import response_builder
+import scoring_profiles
+from structured_logging import get_logger
+import tracing
+
+log = get_logger("scheduling_meeting_utils")
+
+# When nobody is free in the requested range, look this many days ahead from its start (0 disables)
+SCHEDULING_HORIZON_DAYS = int(os.environ.get("SCHEDULING_HORIZON_DAYS", "14"))
+
+def parse_priority(email_content: str) -> str:
+    """Classify a request as high, medium or low priority from urgency keywords."""
+    email_lower = email_content.lower()
+    if any(word in email_lower for word in ["urgent", "asap", "immediately", "critical"]):
+        return "high"
+    elif any(word in email_lower for word in ["when convenient", "flexible", "no rush"]):
+        return "low"
+    return "medium"
 
 class MeetingScheduler:
     def __init__(self):
@@ -47,7 +67,7 @@ class MeetingScheduler:
                 # Fallback to current time if parsing fails
                 current_dt = datetime.now()
         except (ValueError, IndexError) as e:
-            print(f"Date parsing warning: {e}, using current time")
+            log.warning("Date parsing warning: %s, using current time", e)
             current_dt = datetime.now()
         preferred_day = None
         
@@ -67,11 +87,7 @@ class MeetingScheduler:
             preferred_day = current_dt
         
         # Extract urgency/priority
-        priority = "medium"
-        if any(word in email_lower for word in ["urgent", "asap", "immediately", "critical"]):
-            priority = "high"
-        elif any(word in email_lower for word in ["when convenient", "flexible", "no rush"]):
-            priority = "low"
+        priority = parse_priority(email_content)
         
         return {
             "duration_minutes": duration,
@@ -94,7 +110,7 @@ class MeetingScheduler:
         
         for attendee in attendees:
             try:
-                events = retrive_calendar_events(attendee, start_time, end_time)
+                events = fetch_calendar_events(attendee, start_time, end_time)
                 all_events[attendee] = events
                 
                 # Calculate busy hours
@@ -133,7 +149,7 @@ class MeetingScheduler:
             start_dt = self._parse_flexible_datetime(start_range)
             end_dt = self._parse_flexible_datetime(end_range)
         except Exception as e:
-            print(f"Date parsing error: {e}")
+            log.warning("Date parsing error: %s", e)
             # Fallback to next day if parsing fails
             start_dt = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
             end_dt = start_dt + timedelta(days=1)
@@ -227,53 +243,37 @@ class MeetingScheduler:
         return available_slots[:5]  # Return top 5 options
     
     def _calculate_slot_score(self, slot_time: datetime, all_available: bool, conflicts: List) -> float:
-        """Calculate a score for the time slot based on various factors."""
-        score = 0.0
-        
-        # Base score for availability
-        if all_available:
-            score += 100
-        else:
-            score -= len(conflicts) * 20
-        
-        # Time preference scoring
-        hour = slot_time.hour
-        if 9 <= hour <= 11:  # Morning preferred
-            score += 20
-        elif 14 <= hour <= 16:  # Early afternoon
-            score += 15
-        elif 11 <= hour <= 12:  # Late morning
-            score += 10
-        elif 16 <= hour <= 17:  # Late afternoon
-            score += 5
-        else:  # Less preferred times
-            score -= 10
-        
-        # Day preference (Tuesday-Thursday preferred)
-        weekday = slot_time.weekday()
-        if weekday in [1, 2, 3]:  # Tue, Wed, Thu
-            score += 10
-        elif weekday in [0, 4]:  # Mon, Fri
-            score += 5
-        
-        # Avoid lunch time
-        if 12 <= hour <= 13:
-            score -= 15
-        
-        return score
+        """Score a slot with the default profile's (weekday, slot of day) table.
+        
+        Hour bands (mornings first), Tue-Thu over Mon/Fri and the lunch penalty
+        are in scoring_profiles.PROFILE_DEFAULTS.
+        """
+        return scoring_profiles.get_profile("default").slot_score(slot_time, 0 if all_available else len(conflicts))
     
     def _get_time_preference(self, hour: int) -> str:
         """Get time preference label."""
-        if 9 <= hour <= 11:
-            return "morning_preferred"
-        elif 11 <= hour <= 13:
-            return "late_morning"
-        elif 13 <= hour <= 15:
-            return "early_afternoon"
-        elif 15 <= hour <= 17:
-            return "late_afternoon"
-        else:
-            return "non_business_hours"
+        return scoring_profiles.time_preference(hour)
+    
+    def rank_time_slots(self, attendees_availability: Dict[str, Any], duration_minutes: int,
+                        start_range: str, end_range: str, preferred_day: Optional[str] = None,
+                        profile: Optional[scoring_profiles.ScoringProfile] = None,
+                        requested_end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Best slots in the range under a scoring profile, in find_best_time_slots' format.
+        
+        Unlike find_best_time_slots, ``preferred_day`` ranks slots rather than
+        narrowing the range, so a free slot on another day beats a conflicting
+        one on the preferred day. Slots after ``requested_end`` rank below
+        those before it.
+        """
+        return scoring_profiles.rank_slots(
+            attendees_availability.get("detailed_events", {}),
+            duration_minutes,
+            self._parse_flexible_datetime(start_range),
+            self._parse_flexible_datetime(end_range),
+            profile,
+            preferred_day,
+            requested_end=self._parse_flexible_datetime(requested_end) if requested_end else None
+        )
     
     def create_meeting_response(self, request_data: Dict[str, Any], 
                               best_slot: Dict[str, Any], 
@@ -313,23 +313,11 @@ class MeetingScheduler:
             "Summary": subject
         }
         
-        # Add events for each attendee
-        for attendee_email in attendee_emails:
-            attendee_events = []
-            
-            # Add existing events from their calendar
-            if attendee_email in all_availability.get("detailed_events", {}):
-                existing_events = all_availability["detailed_events"][attendee_email]
-                if not isinstance(existing_events, dict) or "error" not in existing_events:
-                    attendee_events.extend(existing_events)
-            
-            # Add the new scheduled meeting
-            attendee_events.append(scheduled_event)
-            
-            response["Attendees"].append({
-                "email": attendee_email,
-                "events": attendee_events
-            })
+        # Existing events from each attendee's calendar (trimmed per the response events
+        # mode), then the new meeting; every attendee shares the one scheduled_event
+        response["Attendees"] = response_builder.build_attendees(
+            attendee_emails, all_availability.get("detailed_events", {}), scheduled_event
+        )
         
         return response
 
@@ -377,9 +365,10 @@ class MeetingScheduler:
             pass
         
         # Fallback to current time
-        print(f"Warning: Could not parse datetime '{datetime_str}', using current time")
+        log.warning("Could not parse datetime '%s', using current time", datetime_str)
         return datetime.now()
 
+@tracing.traced("rule_based_scheduler")
 def process_meeting_request(request_data: Dict[str, Any]) -> Dict[str, Any]:
     """Main function to process a meeting request and return the scheduled meeting."""
     scheduler = MeetingScheduler()
@@ -403,28 +392,69 @@ def process_meeting_request(request_data: Dict[str, Any]) -> Dict[str, Any]:
         start_time = request_data.get("Start")
         end_time = request_data.get("End")
         
-        # If no time range provided, create a default range for next week
+        # If no time range provided, default to the week from when the request was sent,
+        # which is also what weekdays in the email ("Monday") are resolved against
         if not start_time or not end_time:
-            now = datetime.now()
-            next_week = now + timedelta(days=7)
-            start_time = now.replace(hour=0, minute=0, second=0).isoformat()
-            end_time = next_week.replace(hour=23, minute=59, second=59).isoformat()
-        
-        # Get availability for all attendees
-        availability = scheduler.get_availability_for_all(
-            attendee_emails,
-            start_time,
-            end_time
+            requested_at = scheduler._parse_flexible_datetime(request_data.get("Datetime", ""))
+            next_week = requested_at + timedelta(days=7)
+            start_time = requested_at.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+            end_time = next_week.replace(hour=23, minute=59, second=59, microsecond=0).isoformat()
+        preferred_day = email_analysis.get("preferred_day")
+        preferred_day_in_range = not preferred_day or (
+            scheduler._parse_flexible_datetime(start_time).date()
+            <= datetime.fromisoformat(preferred_day).date()
+            <= scheduler._parse_flexible_datetime(end_time).date()
         )
+        if not preferred_day_in_range:
+            log.info("Preferred day %s is outside the requested range %s - %s", preferred_day, start_time, end_time)
         
-        # Find best time slots
-        time_slots = scheduler.find_best_time_slots(
-            availability,
-            duration,
-            start_time,
-            end_time,
-            email_analysis.get("preferred_day")
-        )
+        # Get availability for all attendees
+        with metrics.time_stage("get_availability_for_all"):
+            availability = scheduler.get_availability_for_all(
+                attendee_emails,
+                start_time,
+                end_time
+            )
+        
+        # Find best time slots under the request's (or its organization's) scoring profile
+        profile = scoring_profiles.profile_for_request(request_data)
+        with metrics.time_stage("find_best_time_slots"):
+            time_slots = scheduler.rank_time_slots(
+                availability,
+                duration,
+                start_time,
+                end_time,
+                email_analysis.get("preferred_day"),
+                profile
+            )
+        
+        # Nobody is free in the requested range: look further ahead
+        horizon_extended = False
+        if SCHEDULING_HORIZON_DAYS and not any(slot["all_available"] for slot in time_slots):
+            horizon_end = scheduler._parse_flexible_datetime(start_time).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            ) + timedelta(days=SCHEDULING_HORIZON_DAYS)
+            if horizon_end > scheduler._parse_flexible_datetime(end_time):
+                horizon_end = scheduler.timezone.localize(horizon_end).isoformat()
+                with metrics.time_stage("get_availability_for_all"):
+                    later = scheduler.get_availability_for_all(attendee_emails, end_time, horizon_end)
+                combined = {}
+                for email, events in availability["detailed_events"].items():
+                    later_events = later["detailed_events"].get(email)
+                    combined[email] = (events + later_events if isinstance(events, list) and isinstance(later_events, list)
+                                       else {"error": "calendar unavailable"})
+                with metrics.time_stage("find_best_time_slots"):
+                    later_slots = scheduler.rank_time_slots(
+                        {"detailed_events": combined},
+                        duration,
+                        start_time,
+                        horizon_end,
+                        email_analysis.get("preferred_day"),
+                        profile,
+                        requested_end=end_time
+                    )
+                if any(slot["all_available"] for slot in later_slots):
+                    time_slots, horizon_extended = later_slots, True
         
         if not time_slots:
             # No available slots found
@@ -445,6 +475,9 @@ def process_meeting_request(request_data: Dict[str, Any]) -> Dict[str, Any]:
             "slot_score": best_slot["score"],
             "conflicts_resolved": not best_slot["all_available"],
             "alternative_slots": len([s for s in time_slots if s["all_available"]]),
+            "scoring_profile": profile.name,
+            "horizon_extended": horizon_extended,
+            "preferred_day_in_range": preferred_day_in_range,
             "processing_timestamp": datetime.now().isoformat()
         }
         
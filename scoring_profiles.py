@@ -0,0 +1,307 @@
+"""Slot scoring profiles, compiled into lookup tables, and slot ranking over a horizon.
+
+A ``ScoringProfile`` says where meetings should go: points per hour band and
+weekday, adjustments such as a lunch penalty, and how much to care about
+back-to-back meetings and about chopping attendees' free time into gaps too
+short to use. Creating a profile compiles the time-of-day and weekday part
+into ``table``, 7 x 96 points indexed by (weekday, 15-minute slot of the
+day), so scoring a slot is one lookup plus the busy-interval factors.
+
+``rank_slots`` merges each attendee's busy events into sorted, disjoint
+intervals once and walks every candidate slot in time order with a cursor
+per attendee, so conflicts, back-to-back meetings and fragmentation cost
+O(attendees) per slot however busy the calendars are. That keeps ranking a
+multi-week horizon cheap.
+
+Profiles are chosen per request (a ``ScoringProfile`` field naming a profile,
+or an object overriding fields of one, e.g. ``{"base": "default",
+"back_to_back": -20}``), else per organization (the organizer's email
+domain, mapped in SCORING_PROFILES_FILE), else SCORING_PROFILE. The
+``default`` profile scores exactly like the original hour-band scorer.
+"""
+import heapq
+import json
+import os
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from structured_logging import get_logger
+
+log = get_logger("scoring_profiles")
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+# Field defaults of every profile; the default profile is the original hour-band scorer
+PROFILE_DEFAULTS = {
+    "business_hours": [9, 18],
+    "workdays": [0, 1, 2, 3, 4],
+    # [from_hour, to_hour, points]: the first band containing the slot's start counts
+    "hour_bands": [[9, 12, 20], [14, 17, 15], [12, 13, 10], [17, 18, 5]],
+    "other_hours": -10,
+    # Monday..Sunday
+    "weekday_scores": [5, 10, 10, 10, 5, 0, 0],
+    # [from_hour, to_hour, points]: every adjustment containing the slot's start counts (lunch)
+    "adjustments": [[12, 14, -15]],
+    "available": 100,
+    # Per attendee with a conflicting event
+    "conflict": -20,
+    # Per attendee with another meeting within buffer_minutes before or after the slot
+    "back_to_back": 0,
+    "buffer_minutes": 0,
+    # Per gap shorter than min_gap_minutes the slot leaves in an attendee's free time
+    "fragmentation": 0,
+    "min_gap_minutes": 30,
+}
+
+BUILTIN_PROFILES = {
+    "default": {},
+    # Leave room between meetings
+    "buffered": {"back_to_back": -25, "buffer_minutes": 15, "fragmentation": -10},
+    # Keep long stretches free: meetings next to meetings are fine, slivers of free time are not
+    "focus_time": {"back_to_back": 5, "fragmentation": -20, "min_gap_minutes": 60},
+}
+
+SCORING_PROFILE = os.environ.get("SCORING_PROFILE", "default")
+SCORING_PROFILES_FILE = os.environ.get("SCORING_PROFILES_FILE")
+
+
+def time_preference(hour: int) -> str:
+    """Label for the part of the day a slot starts in."""
+    if 9 <= hour <= 11:
+        return "morning_preferred"
+    elif 11 <= hour <= 13:
+        return "late_morning"
+    elif 13 <= hour <= 15:
+        return "early_afternoon"
+    elif 15 <= hour <= 17:
+        return "late_afternoon"
+    else:
+        return "non_business_hours"
+
+
+class ScoringProfile:
+    """A named set of scoring preferences; see PROFILE_DEFAULTS for the fields."""
+
+    def __init__(self, name: str, **fields):
+        unknown = set(fields) - set(PROFILE_DEFAULTS)
+        if unknown:
+            raise ValueError(f"unknown scoring profile fields: {', '.join(sorted(unknown))}")
+        self.name = name
+        self.fields = {**PROFILE_DEFAULTS, **fields}
+        for key, value in self.fields.items():
+            setattr(self, key, value)
+        self.table = self._compile()
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"name": self.name, **self.fields}
+
+    def _compile(self) -> List[List[float]]:
+        """Points per (weekday, slot of day) from hour bands, weekday scores and adjustments."""
+        table = []
+        for weekday in range(7):
+            row = []
+            for slot in range(SLOTS_PER_DAY):
+                hour = slot * SLOT_MINUTES / 60
+                points = next((points for start, end, points in self.hour_bands if start <= hour < end),
+                              self.other_hours)
+                points += sum(points for start, end, points in self.adjustments if start <= hour < end)
+                row.append(points + self.weekday_scores[weekday])
+            table.append(row)
+        return table
+
+    def slot_score(self, slot_time: datetime, conflicts: int) -> float:
+        """Score of a slot from the table and its conflict count alone (no busy-interval factors)."""
+        points = self.table[slot_time.weekday()][(slot_time.hour * 60 + slot_time.minute) // SLOT_MINUTES]
+        return points + (self.available if conflicts == 0 else self.conflict * conflicts)
+
+
+def _load_file() -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    if not SCORING_PROFILES_FILE:
+        return {}, {}
+    with open(SCORING_PROFILES_FILE, encoding="utf-8") as f:
+        config = json.load(f)
+    return config.get("profiles", {}), {domain.lower(): name for domain, name in config.get("organizations", {}).items()}
+
+
+_profile_fields, _organizations = _load_file()
+_profiles: Dict[str, ScoringProfile] = {}
+
+
+def get_profile(name: str) -> ScoringProfile:
+    """A built-in or SCORING_PROFILES_FILE profile by name, compiled once."""
+    profile = _profiles.get(name)
+    if profile is None:
+        if name in _profile_fields:
+            fields = dict(_profile_fields[name])
+            base = fields.pop("base", "default")
+            # A file profile may refine the built-in profile of the same name
+            base_fields = BUILTIN_PROFILES.get(base, {}) if base == name else get_profile(base).fields
+            fields = {**base_fields, **fields}
+        elif name in BUILTIN_PROFILES:
+            fields = BUILTIN_PROFILES[name]
+        else:
+            raise KeyError(f"unknown scoring profile {name!r}")
+        profile = _profiles[name] = ScoringProfile(name, **fields)
+    return profile
+
+
+def profile_names() -> List[str]:
+    return list(dict.fromkeys([*BUILTIN_PROFILES, *_profile_fields]))
+
+
+def profile_for_request(request_data: Dict[str, Any]) -> ScoringProfile:
+    """The request's ``ScoringProfile``, else its organization's, else SCORING_PROFILE.
+
+    An unknown or invalid request profile falls back to the next choice
+    rather than failing the request.
+    """
+    requested = request_data.get("ScoringProfile")
+    try:
+        if isinstance(requested, str):
+            return get_profile(requested)
+        if isinstance(requested, dict):
+            fields = dict(requested)
+            base = get_profile(fields.pop("base", SCORING_PROFILE))
+            return ScoringProfile(f"{base.name}+request", **{**base.fields, **fields})
+    except (IndexError, KeyError, TypeError, ValueError) as e:
+        log.warning("Ignoring the request's scoring profile: %s", e)
+
+    domain = str(request_data.get("From", "")).rpartition("@")[2].lower()
+    if domain in _organizations:
+        try:
+            return get_profile(_organizations[domain])
+        except (IndexError, KeyError, TypeError, ValueError) as e:
+            log.warning("Ignoring the scoring profile of %s: %s", domain, e)
+    return get_profile(SCORING_PROFILE)
+
+
+def _naive(value: str) -> datetime:
+    dt = datetime.fromisoformat(value)
+    return dt.replace(tzinfo=None) if dt.tzinfo else dt
+
+
+class _Busy:
+    """One attendee's events as minutes from the origin, plus their merged busy intervals."""
+
+    __slots__ = ("events", "starts", "ends")
+
+    def __init__(self, events: List[Dict[str, Any]], origin: datetime):
+        self.events = [
+            ((_naive(event["StartTime"]) - origin).total_seconds() / 60,
+             (_naive(event["EndTime"]) - origin).total_seconds() / 60,
+             event)
+            for event in events
+        ]
+        self.events.sort(key=lambda item: item[:2])
+        self.starts, self.ends = [], []
+        for start, end, _ in self.events:
+            if end <= start:
+                continue
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def first_conflict(self, start: float, end: float) -> Optional[Dict[str, Any]]:
+        return next((event for event_start, event_end, event in self.events
+                     if event_start < end and event_end > start), None)
+
+
+def rank_slots(detailed_events: Dict[str, Any], duration_minutes: int, start: datetime, end: datetime,
+               profile: ScoringProfile = None, preferred_day: Optional[str] = None,
+               requested_end: Optional[datetime] = None, limit: int = 5) -> List[Dict[str, Any]]:
+    """The ``limit`` best slots starting in [start, end] on the profile's workdays and business hours.
+
+    Slots rank by being free for everyone, then by falling on
+    ``preferred_day``, then by starting before ``requested_end`` (when the
+    search runs past the requested range), then by score; ties go to the
+    earlier slot. Attendees whose events could not be fetched (an
+    ``{"error": ...}`` entry) are left out, as in find_best_time_slots.
+    """
+    profile = profile or get_profile(SCORING_PROFILE)
+    table = profile.table
+    origin = datetime.combine(start.date(), time())
+    attendees = [(attendee, _Busy(events, origin)) for attendee, events in detailed_events.items()
+                 if isinstance(events, list)]
+    cursors = [0] * len(attendees)
+    preferred = datetime.fromisoformat(preferred_day).date() if preferred_day else None
+    start_minute = (start - origin).total_seconds() / 60
+    end_minute = (end - origin).total_seconds() / 60
+    requested_end_minute = (requested_end - origin).total_seconds() / 60 if requested_end else end_minute
+    business_start, business_end = (int(hour * 60) for hour in profile.business_hours)
+    first_slot = -(-business_start // SLOT_MINUTES)
+    last_slot = (business_end - duration_minutes) // SLOT_MINUTES
+    weigh_back_to_back, weigh_fragmentation = profile.back_to_back != 0, profile.fragmentation != 0
+    buffer, min_gap = profile.buffer_minutes, profile.min_gap_minutes
+    workdays = set(profile.workdays)
+
+    best = []
+    for day in range(int(end_minute // 1440) + 1):
+        date = origin + timedelta(days=day)
+        weekday = date.weekday()
+        if weekday not in workdays:
+            continue
+        row = table[weekday]
+        day_minute = day * 1440
+        on_preferred_day = date.date() == preferred if preferred else True
+        for slot in range(first_slot, last_slot + 1):
+            slot_start = day_minute + slot * SLOT_MINUTES
+            if slot_start < start_minute:
+                continue
+            if slot_start > end_minute:
+                break
+            slot_end = slot_start + duration_minutes
+            conflicts = back_to_back = fragments = 0
+            for index, (_, busy) in enumerate(attendees):
+                starts, ends = busy.starts, busy.ends
+                cursor = cursors[index]
+                while cursor < len(ends) and ends[cursor] <= slot_start:
+                    cursor += 1
+                cursors[index] = cursor
+                if cursor < len(starts) and starts[cursor] < slot_end:
+                    conflicts += 1
+                    continue
+                if weigh_back_to_back or weigh_fragmentation:
+                    previous_end = ends[cursor - 1] if cursor else float("-inf")
+                    next_start = starts[cursor] if cursor < len(starts) else float("inf")
+                    if weigh_back_to_back and (slot_start - previous_end <= buffer or next_start - slot_end <= buffer):
+                        back_to_back += 1
+                    if weigh_fragmentation:
+                        before = slot_start - max(previous_end, day_minute + business_start)
+                        after = min(next_start, day_minute + business_end) - slot_end
+                        fragments += (0 < before < min_gap) + (0 < after < min_gap)
+            score = (row[slot] + (profile.available if conflicts == 0 else profile.conflict * conflicts)
+                     + profile.back_to_back * back_to_back + profile.fragmentation * fragments)
+            key = (conflicts == 0, on_preferred_day, slot_start < requested_end_minute, score, -slot_start)
+            if len(best) < limit:
+                heapq.heappush(best, key)
+            elif key > best[0]:
+                heapq.heapreplace(best, key)
+
+    slots = []
+    for all_available, _, _, score, negative_start in sorted(best, reverse=True):
+        slot_start = origin + timedelta(minutes=-negative_start)
+        slot_end = slot_start + timedelta(minutes=duration_minutes)
+        conflicts = []
+        if not all_available:
+            for attendee, busy in attendees:
+                event = busy.first_conflict(-negative_start, -negative_start + duration_minutes)
+                if event is not None:
+                    conflicts.append({
+                        "attendee": attendee,
+                        "conflicting_event": event["Summary"],
+                        "event_time": f"{event['StartTime']} - {event['EndTime']}"
+                    })
+        slots.append({
+            "start_time": slot_start.isoformat(),
+            "end_time": slot_end.isoformat(),
+            "all_available": all_available,
+            "conflicts": conflicts,
+            "score": score,
+            "day_of_week": slot_start.strftime("%A"),
+            "time_preference": time_preference(slot_start.hour),
+            "profile": profile.name,
+        })
+    return slots
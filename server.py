@@ -0,0 +1,165 @@
+"""Production launcher for the AI Meeting Scheduler.
+
+Binds one listening socket and runs N uvicorn worker processes of
+``asgi_server:app`` on it, so CPU-heavy work such as slot search uses every
+core instead of one GIL. Calendar and LLM caches live in the SQLite file at
+``SHARED_CACHE_PATH`` and are shared by all workers. Workers publish their
+metrics to ``METRICS_DIR`` so ``GET /metrics`` on any of them covers all.
+
+    python server.py --workers 4 --port 5000
+    kill -HUP <pid>     # graceful reload: start fresh workers, then drain the old ones
+    kill -TERM <pid>    # graceful shutdown
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import tempfile
+import threading
+import time
+from typing import List
+
+from shared_cache import SHARED_CACHE_PATH
+
+APP = "asgi_server:app"
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Create the listening socket shared by all workers."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def watch_parent(parent_pid: int):
+    """Shut the worker down gracefully if the supervisor dies without stopping it."""
+    while os.getppid() == parent_pid:
+        time.sleep(1)
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+def run_worker(sock: socket.socket, app: str, graceful_timeout: float, log_level: str, parent_pid: int):
+    """Worker process entry point: serve the ASGI app on the inherited socket."""
+    import uvicorn
+
+    threading.Thread(target=watch_parent, args=(parent_pid,), daemon=True).start()
+    config = uvicorn.Config(app, log_level=log_level, timeout_graceful_shutdown=graceful_timeout)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class WorkerSupervisor:
+    """Keep N worker processes running and replace them on reload."""
+
+    def __init__(self, sock: socket.socket, workers: int, app: str = APP,
+                 graceful_timeout: float = 30.0, log_level: str = "warning"):
+        self.sock = sock
+        self.num_workers = workers
+        self.app = app
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        # spawn (not fork) so a reload imports the current code
+        self.context = multiprocessing.get_context("spawn")
+        self.workers: List[multiprocessing.Process] = []
+        self._reload_requested = False
+        self._stop_requested = False
+
+    def spawn_worker(self) -> multiprocessing.Process:
+        process = self.context.Process(
+            target=run_worker,
+            args=(self.sock, self.app, self.graceful_timeout, self.log_level, os.getpid()),
+            name="meeting-scheduler-worker",
+        )
+        process.start()
+        print(f"Started worker pid {process.pid}")
+        return process
+
+    def stop_workers(self, workers: List[multiprocessing.Process]):
+        """SIGTERM lets uvicorn stop accepting and finish in-flight requests."""
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.time() + self.graceful_timeout + 5
+        for process in workers:
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                print(f"Worker pid {process.pid} did not drain in time, killing")
+                process.kill()
+                process.join()
+
+    def reload(self):
+        print(f"Reloading {self.num_workers} workers...")
+        old_workers = self.workers
+        self.workers = [self.spawn_worker() for _ in range(self.num_workers)]
+        self.stop_workers(old_workers)
+        print("Reload complete")
+
+    def _on_reload(self, signum, frame):
+        self._reload_requested = True
+
+    def _on_stop(self, signum, frame):
+        self._stop_requested = True
+
+    def run(self):
+        signal.signal(signal.SIGHUP, self._on_reload)
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+
+        self.workers = [self.spawn_worker() for _ in range(self.num_workers)]
+        try:
+            while not self._stop_requested:
+                if self._reload_requested:
+                    self._reload_requested = False
+                    self.reload()
+                for index, process in enumerate(self.workers):
+                    if not process.is_alive():
+                        print(f"Worker pid {process.pid} exited with {process.exitcode}, restarting")
+                        self.workers[index] = self.spawn_worker()
+                time.sleep(0.5)
+        finally:
+            print("Shutting down workers...")
+            self.stop_workers(self.workers)
+            self.sock.close()
+
+
+def serve(host: str = "0.0.0.0", port: int = 5000, workers: int = None, app: str = APP,
+          graceful_timeout: float = 30.0, log_level: str = "warning"):
+    """Run the scheduler with N worker processes behind one port until SIGTERM/SIGINT."""
+    workers = workers or os.cpu_count() or 1
+    sock = bind_socket(host, port)
+
+    # Inherited by the spawned workers; start from empty counters
+    metrics_dir = os.environ.setdefault("METRICS_DIR", tempfile.mkdtemp(prefix="meeting-scheduler-metrics-"))
+    os.makedirs(metrics_dir, exist_ok=True)
+    for filename in os.listdir(metrics_dir):
+        if filename.endswith(".json"):
+            os.remove(os.path.join(metrics_dir, filename))
+
+    print("Starting AI Meeting Scheduler Server...")
+    print(f"   Workers: {workers} ({app})")
+    print(f"   Shared cache: {SHARED_CACHE_PATH}")
+    print(f"   Metrics: {metrics_dir}")
+    print(f"Server running on http://{host}:{port} (pid {os.getpid()}, SIGHUP reloads)")
+    WorkerSupervisor(sock, workers, app, graceful_timeout, log_level).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI Meeting Scheduler production server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--app", default=APP, help="ASGI app import string")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="seconds a worker may take to finish in-flight requests on reload/shutdown")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.workers, args.app, args.graceful_timeout, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Optional
+
+# All worker processes started by server.py point at the same file
+SHARED_CACHE_PATH = os.environ.get(
+    "SHARED_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "ai_meeting_scheduler_cache.sqlite3")
+)
+
+_MISSING = object()
+
+
+class SharedCache:
+    """TTL key/value cache in a local SQLite file, shared by every worker process.
+
+    Values are stored as JSON. Each thread gets its own connection and the
+    database runs in WAL mode, so readers in one worker never block writers in
+    another. A ``ttl`` of 0 disables the cache (every lookup misses).
+    """
+
+    def __init__(self, namespace: str, ttl: float, path: str = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.path = path or SHARED_CACHE_PATH
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if not self.enabled:
+            self.misses += 1
+            return default
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (self.namespace, key, time.time())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        if not self.enabled:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (self.namespace, key, json.dumps(value), time.time() + ttl)
+        )
+        self._writes += 1
+        if self._writes % 500 == 0:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, key: str):
+        if not self.enabled:
+            return
+        self._connection().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        self.set(key, value)
+        return value
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+
+def cache_key(*parts: Optional[str]) -> str:
+    """Build a fixed-size cache key from request fields or prompts."""
+    return hashlib.sha256(json.dumps(parts, separators=(",", ":")).encode("utf-8")).hexdigest()
@@ -0,0 +1,174 @@
+"""Structured, leveled logging for the scheduler.
+
+Records carry the current ``Request_id`` (from a context variable that
+follows the request into tasks and worker threads) and are written as JSON
+lines, or plain text, by a background thread: the request path only fills in
+the message and puts the record on a bounded queue. Messages use ``%``-style arguments, so a debug line
+that is not emitted costs a level check and nothing else.
+
+The step-by-step pipeline trace is logged at DEBUG. It is off in production
+(LOG_LEVEL=INFO) but can be switched on for a single request with
+``request_context(request_id, debug=True)``.
+"""
+import contextlib
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+request_debug_var = contextvars.ContextVar("request_debug", default=False)
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_listener = None
+_exception_formatter = logging.Formatter()
+
+
+class SchedulerLogger(logging.LoggerAdapter):
+    """Logger that also emits DEBUG records for requests flagged with debug=True."""
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level) or (level >= logging.DEBUG and request_debug_var.get())
+
+    def log(self, level, msg, *args, **kwargs):
+        if self.isEnabledFor(level):
+            # Bypass the wrapped logger's own level check, isEnabledFor above already decided
+            kwargs.setdefault("stacklevel", 2)
+            self.logger._log(level, msg, args, **kwargs)
+
+    def debug(self, msg, *args, **kwargs):
+        kwargs.setdefault("stacklevel", 3)
+        self.log(logging.DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        kwargs.setdefault("stacklevel", 3)
+        self.log(logging.INFO, msg, *args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        kwargs.setdefault("stacklevel", 3)
+        self.log(logging.WARNING, msg, *args, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        kwargs.setdefault("stacklevel", 3)
+        self.log(logging.ERROR, msg, *args, **kwargs)
+
+
+def get_logger(name: str) -> SchedulerLogger:
+    """Logger under the ``meeting_scheduler`` hierarchy configured by configure_logging."""
+    return SchedulerLogger(logging.getLogger(f"meeting_scheduler.{name}"), {})
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp every record with the Request_id of the request that logged it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", None),
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the writer falls behind.
+
+    The message is interpolated (and a traceback rendered) in the logging
+    thread, so arguments that change afterwards are logged as they were.
+    Only the record's final formatting, e.g. the JSON encoding, is left to
+    the writer thread. Records are already stamped with their Request_id by
+    RequestContextFilter.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike QueueHandler.prepare, leave the formatter to the writer thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+@contextlib.contextmanager
+def request_context(request_id: str = None, debug: bool = False):
+    """Tag log records in this block (and tasks/threads it starts) with request_id."""
+    id_token = request_id_var.set(request_id)
+    debug_token = request_debug_var.set(debug or request_debug_var.get())
+    try:
+        yield
+    finally:
+        request_debug_var.reset(debug_token)
+        request_id_var.reset(id_token)
+
+
+def configure_logging(level: str = None, fmt: str = None, stream=None, queue_size: int = 10000):
+    """Route the scheduler's loggers through a bounded queue to a background writer.
+
+    ``level`` defaults to LOG_LEVEL (INFO) and ``fmt`` to LOG_FORMAT ("json"
+    or "text"). Calling it again replaces the previous configuration.
+    """
+    global _listener
+    level = (level or os.environ.get("LOG_LEVEL", "INFO")).upper()
+    fmt = fmt or os.environ.get("LOG_FORMAT", "json")
+
+    if _listener is not None:
+        _listener.stop()
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    if fmt == "json":
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(request_id)s] %(message)s"))
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger("meeting_scheduler")
+    root.handlers = [handler]
+    root.setLevel(level)
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+    return handler
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
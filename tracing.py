@@ -0,0 +1,254 @@
+"""Per-request trace spans, exportable as JSON or Chrome trace format.
+
+``trace_request`` starts a trace for one request; ``span``, ``traced`` and
+``metrics.time_stage`` record spans into it from the event loop and from the
+worker threads ``asyncio.to_thread`` hands work to (the trace follows the
+request through context variables). Outside a traced request every helper is
+a no-op, so library code can call them unconditionally.
+
+The JSON form is what the request journal stores; ``to_chrome`` converts it
+for chrome://tracing or https://ui.perfetto.dev.
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import itertools
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Trace every request; the journal keeps the spans next to the response
+TRACING_ENABLED = os.environ.get("REQUEST_TRACING", "1").lower() not in ("0", "false", "no", "off")
+TRACE_MAX_SPANS = int(os.environ.get("TRACE_MAX_SPANS", "2000"))
+
+_trace = contextvars.ContextVar("trace", default=None)
+_parent = contextvars.ContextVar("trace_parent", default=None)
+_steps = contextvars.ContextVar("trace_steps", default=None)
+
+
+class Trace:
+    """Spans recorded for one request, timed relative to the start of the trace."""
+
+    def __init__(self, request_id: str = None, max_spans: int = TRACE_MAX_SPANS):
+        self.request_id = request_id
+        self.max_spans = max_spans
+        self.started_at = datetime.now().isoformat()
+        self.profiler = None
+        self.profile = None
+        self.dropped = 0
+        # Threads currently inside one of this trace's spans, for the profiler
+        self.active_threads = Counter()
+        self._origin = time.perf_counter()
+        self._spans: List[Dict[str, Any]] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _start(self, name: str, attrs: Dict[str, Any], parent: Optional[int]) -> Dict[str, Any]:
+        thread = threading.current_thread()
+        span = {
+            "id": next(self._ids),
+            "parent": parent,
+            "name": name,
+            "start_ms": (time.perf_counter() - self._origin) * 1000,
+            "duration_ms": None,
+            "thread": thread.name,
+            "thread_id": thread.ident,
+            "attrs": dict(attrs),
+        }
+        with self._lock:
+            if len(self._spans) < self.max_spans:
+                self._spans.append(span)
+            else:
+                self.dropped += 1
+            self.active_threads[thread.ident] += 1
+        return span
+
+    def _end(self, span: Dict[str, Any]):
+        if span["duration_ms"] is not None:
+            return
+        span["duration_ms"] = (time.perf_counter() - self._origin) * 1000 - span["start_ms"]
+        with self._lock:
+            self.active_threads[span["thread_id"]] -= 1
+            if self.active_threads[span["thread_id"]] <= 0:
+                del self.active_threads[span["thread_id"]]
+
+    def stop_profiler(self):
+        if self.profiler is not None:
+            self.profiler.stop()
+            self.profile = self.profiler.to_json()
+            self.profiler = None
+
+    def to_json(self) -> Dict[str, Any]:
+        """Spans so far; spans still open report their duration up to now."""
+        now_ms = (time.perf_counter() - self._origin) * 1000
+        with self._lock:
+            spans = [dict(span) for span in self._spans]
+        for span in spans:
+            if span["duration_ms"] is None:
+                span["duration_ms"] = now_ms - span["start_ms"]
+                span["attrs"] = {**span["attrs"], "unfinished": True}
+            span["start_ms"] = round(span["start_ms"], 3)
+            span["duration_ms"] = round(span["duration_ms"], 3)
+        trace = {
+            "request_id": self.request_id,
+            "started_at": self.started_at,
+            "duration_ms": round(now_ms, 3),
+            "pid": os.getpid(),
+            "spans": spans,
+            "dropped_spans": self.dropped,
+        }
+        if self.profile is not None:
+            trace["profile"] = self.profile
+        return trace
+
+
+@contextlib.contextmanager
+def trace_request(request_id: str = None, enabled: bool = None, profile: bool = False):
+    """Trace the request handled inside this block; yields the Trace, or None when disabled.
+
+    ``profile`` also runs the block under the sampling profiler (see
+    profiler.py); its result lands in ``trace.profile``.
+    """
+    if not (TRACING_ENABLED if enabled is None else enabled) and not profile:
+        yield None
+        return
+    trace = Trace(request_id)
+    trace_token = _trace.set(trace)
+    parent_token = _parent.set(None)
+    if profile:
+        from profiler import SamplingProfiler
+        trace.profiler = SamplingProfiler(trace)
+        trace.profiler.start()
+    try:
+        yield trace
+    finally:
+        trace.stop_profiler()
+        _parent.reset(parent_token)
+        _trace.reset(trace_token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs):
+    """Record the enclosed block as a span of the current trace, if there is one."""
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    record = trace._start(name, attrs, _parent.get())
+    token = _parent.set(record["id"])
+    try:
+        yield record
+    finally:
+        _parent.reset(token)
+        trace._end(record)
+
+
+def annotate(**attrs):
+    """Add attributes to the innermost open span."""
+    trace = _trace.get()
+    parent = _parent.get()
+    if trace is None or parent is None:
+        return
+    with trace._lock:
+        for record in reversed(trace._spans):
+            if record["id"] == parent:
+                record["attrs"].update(attrs)
+                return
+
+
+def traced(name: str):
+    """Decorator recording every call of a function, sync or async, as a span."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _StepState:
+    def __init__(self, parent: Optional[int]):
+        self.parent = parent
+        self.span = None
+
+
+def stepped(func):
+    """Decorator for an async function that marks its phases with ``step()``.
+
+    Each step span runs until the next ``step()`` call or until the function
+    returns, so long linear functions need no extra nesting.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        trace = _trace.get()
+        if trace is None:
+            return await func(*args, **kwargs)
+        state = _StepState(_parent.get())
+        steps_token = _steps.set(state)
+        parent_token = _parent.set(state.parent)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            if state.span is not None:
+                trace._end(state.span)
+            _parent.reset(parent_token)
+            _steps.reset(steps_token)
+    return wrapper
+
+
+def step(name: str, **attrs):
+    """End the current step of a ``@stepped`` function and start the next one."""
+    trace = _trace.get()
+    state = _steps.get()
+    if trace is None or state is None:
+        return
+    if state.span is not None:
+        trace._end(state.span)
+    state.span = trace._start(name, attrs, state.parent)
+    _parent.set(state.span["id"])
+
+
+def to_chrome(trace: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a trace from ``Trace.to_json`` to the Chrome trace event format."""
+    pid = trace.get("pid", 0)
+    tids = {}
+    events = []
+    for record in trace["spans"]:
+        tid = tids.setdefault(record["thread_id"], len(tids) + 1)
+        events.append({
+            "name": record["name"],
+            "cat": "scheduler",
+            "ph": "X",
+            "ts": round(record["start_ms"] * 1000, 1),
+            "dur": round(record["duration_ms"] * 1000, 1),
+            "pid": pid,
+            "tid": tid,
+            "args": {"span_id": record["id"], "parent": record["parent"], **record["attrs"]},
+        })
+    threads = {record["thread_id"]: record["thread"] for record in trace["spans"]}
+    for thread_id, tid in tids.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                       "args": {"name": threads[thread_id]}})
+    events.append({"name": "process_name", "ph": "M", "pid": pid,
+                   "args": {"name": f"request {trace.get('request_id')}"}})
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"request_id": trace.get("request_id"), "started_at": trace.get("started_at")},
+    }